@@ -0,0 +1,188 @@
+"""Compares the receipt_ai backends of the Donut model on receipt images: the
+time to load each backend, its seconds per image, and how much of the json
+it parses agrees with that of the (full precision) torch backend.
+
+Run with:
+python -m benchmarks.compare_donut_backends --onnx-model-dir models/donut-onnx
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.receipts_to_objects.ai_based.donut import DonutAI
+
+DEFAULT_RECEIPT_IMAGES: List[str] = ["test/fixtures/receipts/dummy_receipt.jpg"]
+
+
+@dataclass(frozen=True)
+class BackendResult:
+    backend: str
+    load_seconds: float
+    seconds_per_image: float
+    # Share of the images with the same json as the torch backend.
+    exact_match: float
+    # Share of the (key path, value) pairs of the json that both have.
+    field_agreement: float
+
+
+@typechecked
+def get_json_fields(
+    *, json_object: Any, path: str = ""
+) -> Set[Tuple[str, str]]:
+    """Returns the (key path, value) pairs of the leaves of the json."""
+    if isinstance(json_object, dict):
+        return {
+            json_field
+            for key, value in json_object.items()
+            for json_field in get_json_fields(
+                json_object=value, path=f"{path}/{key}"
+            )
+        }
+    if isinstance(json_object, list):
+        return {
+            json_field
+            for index, value in enumerate(json_object)
+            for json_field in get_json_fields(
+                json_object=value, path=f"{path}/{index}"
+            )
+        }
+    return {(path, str(json_object))}
+
+
+@typechecked
+def get_field_agreement(*, json_object: Any, reference: Any) -> float:
+    fields: Set[Tuple[str, str]] = get_json_fields(json_object=json_object)
+    reference_fields: Set[Tuple[str, str]] = get_json_fields(
+        json_object=reference
+    )
+    if not fields | reference_fields:
+        return 1.0
+    return len(fields & reference_fields) / len(fields | reference_fields)
+
+
+@typechecked
+def run_backend(
+    *,
+    backend: str,
+    model_dir: Optional[str],
+    receipt_filepaths: List[str],
+    greedy: bool,
+    batch_size: int,
+) -> Tuple[float, float, List[Any]]:
+    """Returns the load seconds, the seconds per image and the json per image
+    of the backend. The first image is parsed once before timing, to leave
+    out the one-off setup of the first call."""
+    start: float = time.perf_counter()
+    donut = DonutAI(greedy=greedy, backend=backend, model_dir=model_dir)
+    load_seconds: float = time.perf_counter() - start
+
+    donut.images_to_receipts(receipt_filepaths=receipt_filepaths[:1])
+    start = time.perf_counter()
+    json_objects: List[Any] = [
+        json_object
+        for json_object, _ in donut.images_to_receipts(
+            receipt_filepaths=receipt_filepaths, batch_size=batch_size
+        )
+    ]
+    seconds_per_image: float = (time.perf_counter() - start) / len(
+        receipt_filepaths
+    )
+    return load_seconds, seconds_per_image, json_objects
+
+
+@typechecked
+def compare_backends(
+    *,
+    model_dir_per_backend: Dict[str, Optional[str]],
+    receipt_filepaths: List[str],
+    greedy: bool,
+    batch_size: int,
+) -> List[BackendResult]:
+    """Runs each backend, and compares its json to that of the first."""
+    results: List[BackendResult] = []
+    reference: Optional[List[Any]] = None
+    for backend, model_dir in model_dir_per_backend.items():
+        load_seconds, seconds_per_image, json_objects = run_backend(
+            backend=backend,
+            model_dir=model_dir,
+            receipt_filepaths=receipt_filepaths,
+            greedy=greedy,
+            batch_size=batch_size,
+        )
+        if reference is None:
+            reference = json_objects
+        results.append(
+            BackendResult(
+                backend=backend,
+                load_seconds=load_seconds,
+                seconds_per_image=seconds_per_image,
+                exact_match=sum(
+                    json_object == expected
+                    for json_object, expected in zip(json_objects, reference)
+                )
+                / len(reference),
+                field_agreement=sum(
+                    get_field_agreement(
+                        json_object=json_object, reference=expected
+                    )
+                    for json_object, expected in zip(json_objects, reference)
+                )
+                / len(reference),
+            )
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", nargs="+", default=DEFAULT_RECEIPT_IMAGES)
+    parser.add_argument(
+        "--model-dir",
+        default=None,
+        help="Local dir of the model, otherwise it is loaded from the hub.",
+    )
+    parser.add_argument(
+        "--onnx-model-dir",
+        default=None,
+        help="Dir with the ONNX export, the onnx backend is skipped without.",
+    )
+    parser.add_argument("--greedy", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--output", default=None, help="Json results file.")
+    args = parser.parse_args()
+
+    model_dir_per_backend: Dict[str, Optional[str]] = {
+        "torch": args.model_dir,
+        "quantized": args.model_dir,
+    }
+    if args.onnx_model_dir is not None:
+        model_dir_per_backend["onnx"] = args.onnx_model_dir
+
+    results: List[BackendResult] = compare_backends(
+        model_dir_per_backend=model_dir_per_backend,
+        receipt_filepaths=args.images,
+        greedy=args.greedy,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"{'backend':<10} {'load [s]':>9} {'s/image':>9} {'exact':>6}"
+        f" {'fields':>7}"
+    )
+    for result in results:
+        print(
+            f"{result.backend:<10} {result.load_seconds:>9.2f}"
+            f" {result.seconds_per_image:>9.3f} {result.exact_match:>6.0%}"
+            f" {result.field_agreement:>7.0%}"
+        )
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([result.__dict__ for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import json
+import platform
+from dataclasses import asdict
+from typing import List
+
+import pytest
+
+from benchmarks.measure import BenchmarkResult
+from benchmarks.synthetic_data import (
+    BENCHMARK_SCALES,
+    BenchmarkScale,
+    build_synthetic_finance_root,
+)
+
+_benchmark_results: List[BenchmarkResult] = []
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-scale",
+        choices=sorted(BENCHMARK_SCALES),
+        default="small",
+        help=(
+            "small: 1k csv rows and 100 receipts, medium: 10k and 1k, large:"
+            " 100k and 10k."
+        ),
+    )
+    parser.addoption(
+        "--benchmark-output",
+        default=None,
+        help="Write the benchmark results as json to this file.",
+    )
+
+
+@pytest.fixture(scope="session")
+def benchmark_scale(request) -> BenchmarkScale:
+    return BENCHMARK_SCALES[request.config.getoption("--benchmark-scale")]
+
+
+@pytest.fixture(scope="session")
+def synthetic_config(tmp_path_factory, benchmark_scale):
+    return build_synthetic_finance_root(
+        root=tmp_path_factory.mktemp(f"finance_root_{benchmark_scale.name}"),
+        benchmark_scale=benchmark_scale,
+    )
+
+
+@pytest.fixture
+def record_benchmark():
+    return _benchmark_results.append
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _benchmark_results:
+        return
+    terminalreporter.section("benchmark results")
+    terminalreporter.write_line(
+        f"{'stage':<24} {'scale':<8} {'time[s]':>10} {'peak mem[MiB]':>14}"
+    )
+    for result in _benchmark_results:
+        terminalreporter.write_line(
+            f"{result.stage:<24} {result.scale:<8} {result.seconds:>10.3f}"
+            f" {result.peak_memory_bytes / 2**20:>14.2f}"
+        )
+
+    output_filepath = config.getoption("--benchmark-output")
+    if output_filepath is not None:
+        with open(output_filepath, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": [asdict(r) for r in _benchmark_results],
+                },
+                f,
+                indent=2,
+            )
+        terminalreporter.write_line(f"Wrote results to:{output_filepath}")
@@ -0,0 +1,49 @@
+"""Measures the wall time and peak memory of a benchmark stage."""
+
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from typeguard import typechecked
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    stage: str
+    scale: str
+    seconds: float
+    peak_memory_bytes: int
+
+
+@typechecked
+def measure(
+    *, stage: str, scale: str, setup: Callable[[], Callable[[], Any]]
+) -> BenchmarkResult:
+    """Runs the stage twice: once timed, and once traced by tracemalloc to get
+    its peak memory, as tracing slows down the run. setup is called (without
+    being measured) before each run and returns the stage to run, such that
+    stages that modify their inputs start from the same state."""
+    run_stage: Callable[[], Any] = setup()
+    with redirect_stdout(io.StringIO()):
+        start: float = time.perf_counter()
+        run_stage()
+        seconds: float = time.perf_counter() - start
+
+    run_stage = setup()
+    tracemalloc.start()
+    try:
+        with redirect_stdout(io.StringIO()):
+            run_stage()
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        stage=stage,
+        scale=scale,
+        seconds=seconds,
+        peak_memory_bytes=peak_memory_bytes,
+    )
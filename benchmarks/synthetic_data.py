@@ -0,0 +1,243 @@
+"""Builds reproducible synthetic finance roots for the benchmarks.
+
+Each root contains a Triodos-style bank csv and a receipt label directory in
+the layout of test/conftest.py. Half of the receipts are card payments that
+match exactly one bank csv row, the other half are cash payments from the
+wallet, such that both the matching and the asset export have work to do."""
+
+import csv
+import io
+import json
+import random
+import textwrap
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from test.helpers import generate_random_category, seed_receipts_into_root
+from typing import Any, Dict, List
+
+import yaml
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.load_config import load_config
+
+FIXTURES_DIR: Path = Path(__file__).parent.parent / "test" / "fixtures"
+FIRST_DATE: datetime = datetime(2025, 1, 1, 10, 30)
+
+
+@dataclass(frozen=True)
+class BenchmarkScale:
+    name: str
+    nr_of_csv_rows: int
+    nr_of_receipts: int
+
+
+BENCHMARK_SCALES: Dict[str, BenchmarkScale] = {
+    "small": BenchmarkScale(
+        name="small", nr_of_csv_rows=1_000, nr_of_receipts=100
+    ),
+    "medium": BenchmarkScale(
+        name="medium", nr_of_csv_rows=10_000, nr_of_receipts=1_000
+    ),
+    "large": BenchmarkScale(
+        name="large", nr_of_csv_rows=100_000, nr_of_receipts=10_000
+    ),
+}
+
+
+@typechecked
+def get_card_payment_amount(*, receipt_nr: int) -> float:
+    """Returns an amount that no random bank csv row has, such that each card
+    receipt matches exactly one csv row."""
+    return round(1000 + receipt_nr * 0.01, 2)
+
+
+@typechecked
+def get_receipt_date(*, receipt_nr: int, nr_of_receipts: int) -> datetime:
+    return FIRST_DATE + timedelta(
+        minutes=int(receipt_nr * 360 * 24 * 60 / nr_of_receipts)
+    )
+
+
+@typechecked
+def format_triodos_amount(*, amount: float) -> str:
+    """Formats an amount like the Triodos export does, e.g. 1.000,32."""
+    return (
+        f"{amount:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    )
+
+
+@typechecked
+def write_triodos_csv(
+    *,
+    filepath: Path,
+    nr_of_rows: int,
+    card_receipt_nrs: List[int],
+    nr_of_receipts: int,
+) -> None:
+    """Writes nr_of_rows Triodos-style rows (in the column order of the
+    1_bank_1_wallet.yaml config), including one row per card receipt."""
+    rows: List[List[str]] = []
+    for receipt_nr in card_receipt_nrs:
+        the_date: datetime = get_receipt_date(
+            receipt_nr=receipt_nr, nr_of_receipts=nr_of_receipts
+        )
+        rows.append(
+            [
+                the_date.strftime("%d-%m-%Y"),
+                "NL123",
+                format_triodos_amount(
+                    amount=get_card_payment_amount(receipt_nr=receipt_nr)
+                ),
+                "debit",
+                "Eko Plaza",
+                "NL456",
+                "IC",
+                "groceries:ekoplaza",
+                format_triodos_amount(amount=1000.0),
+            ]
+        )
+    for row_nr in range(nr_of_rows - len(rows)):
+        the_date = FIRST_DATE + timedelta(days=random.randint(0, 364))
+        rows.append(
+            [
+                the_date.strftime("%d-%m-%Y"),
+                "NL123",
+                format_triodos_amount(amount=random.uniform(1, 999)),
+                "debit",
+                # Only use the other parties of the public example rules, such
+                # that classifying does not depend on the private user rules.
+                random.choice(["Eko Plaza", "IKEA BV"]),
+                f"NL{row_nr % 500:03d}",
+                random.choice(["IC", "BA", "OV"]),
+                generate_random_category(),
+                format_triodos_amount(amount=random.uniform(0, 5000)),
+            ]
+        )
+    random.shuffle(rows)
+    with open(filepath, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, quoting=csv.QUOTE_ALL).writerows(rows)
+
+
+@typechecked
+def get_receipt_label(
+    *, template: Dict[str, Any], receipt_nr: int, nr_of_receipts: int
+) -> Dict[str, Any]:
+    label: Dict[str, Any] = json.loads(json.dumps(template))
+    the_date: str = get_receipt_date(
+        receipt_nr=receipt_nr, nr_of_receipts=nr_of_receipts
+    ).isoformat()
+    label["the_date"] = the_date
+    label["net_bought_items"]["the_date"] = the_date
+    label["raw_img_filepath"] = f"/tmp/receipt_{receipt_nr:05d}.jpg"
+    account_transaction: Dict[str, Any] = label["net_bought_items"][
+        "account_transactions"
+    ][0]
+    if account_transaction["account"]["bank"] == "triodos":
+        account_transaction["tendered_amount_out"] = get_card_payment_amount(
+            receipt_nr=receipt_nr
+        )
+    else:
+        account_transaction["tendered_amount_out"] = 20.0 + receipt_nr % 50
+    return label
+
+
+@typechecked
+def build_synthetic_finance_root(
+    *, root: Path, benchmark_scale: BenchmarkScale, seed: int = 42
+) -> Config:
+    """Creates the directories, config, categories, bank csv and receipt
+    labels (with images) of a finance root and returns its loaded config."""
+    random.seed(seed)
+
+    config_dict: Dict[str, Any] = yaml.safe_load(
+        (FIXTURES_DIR / "config_templates" / "1_bank_1_wallet.yaml").read_text()
+    )
+    config_dict["dir_paths"]["root_finance_path"] = str(root)
+    config_path: Path = root / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config_dict))
+
+    for dirname in [
+        "receipt_images_input",
+        "receipt_images_processed",
+        "receipt_images",
+        "asset_transaction_csvs",
+        "receipt_labels",
+        "hledger_plots",
+        "start_pos",
+    ]:
+        (root / dirname).mkdir(parents=True, exist_ok=True)
+    for account_type_path in ["at/triodos/checking", "at/wallet/physical"]:
+        for subdir in ["1-in", "2-csv", "3-journal"]:
+            (
+                root
+                / "test_working_dir"
+                / "import"
+                / account_type_path
+                / subdir
+            ).mkdir(parents=True, exist_ok=True)
+
+    (root / "categories.yaml").write_text(textwrap.dedent("""\
+            groceries:
+              ekoplaza: {}
+              supermarket: {}
+            repairs:
+              bike: {}
+            house:
+              furniture:
+                ikea: {}
+            """))
+    (root / "start_pos" / "2024_complete.journal").write_text(
+        "2024/01/01 Opening Balances\n    Assets:Checking  €1000.00\n"
+        "    Equity:Opening Balances\n"
+    )
+
+    nr_of_receipts: int = benchmark_scale.nr_of_receipts
+    card_receipt_nrs: List[int] = list(range(0, nr_of_receipts, 2))
+    write_triodos_csv(
+        filepath=root / "triodos_2025.csv",
+        nr_of_rows=benchmark_scale.nr_of_csv_rows,
+        card_receipt_nrs=card_receipt_nrs,
+        nr_of_receipts=nr_of_receipts,
+    )
+
+    config: Config = load_config(
+        config_path=str(config_path), pre_processed_output_dir=None
+    )
+
+    templates: Dict[str, Dict[str, Any]] = {
+        "card": json.loads(
+            (
+                FIXTURES_DIR / "receipts" / "groceries_ekoplaza_card.json"
+            ).read_text()
+        ),
+        "cash": json.loads(
+            (FIXTURES_DIR / "receipts" / "repairs_bike.json").read_text()
+        ),
+    }
+    source_dir: Path = root / "synthetic_labels"
+    source_dir.mkdir()
+    source_json_paths: List[Path] = []
+    for receipt_nr in range(nr_of_receipts):
+        source_json_path: Path = source_dir / f"receipt_{receipt_nr:05d}.json"
+        source_json_path.write_text(
+            json.dumps(
+                get_receipt_label(
+                    template=templates[
+                        "card" if receipt_nr % 2 == 0 else "cash"
+                    ],
+                    receipt_nr=receipt_nr,
+                    nr_of_receipts=nr_of_receipts,
+                )
+            )
+        )
+        source_json_paths.append(source_json_path)
+
+    # The seeder prints every receipt it writes.
+    with redirect_stdout(io.StringIO()):
+        seed_receipts_into_root(
+            config=config, source_json_paths=source_json_paths
+        )
+    return config
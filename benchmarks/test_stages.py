@@ -0,0 +1,227 @@
+"""Times the main pipeline stages on a synthetic finance root.
+
+Run with: python -m pytest benchmarks --benchmark-scale=small
+"""
+
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from benchmarks.measure import measure
+from hledger_preprocessor.categorisation.categoriser import (
+    classify_transactions,
+)
+from hledger_preprocessor.config.AccountConfig import AccountConfig
+from hledger_preprocessor.csv_parsing.csv_to_transactions import (
+    csv_to_transactions,
+)
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.get_models import get_models
+from hledger_preprocessor.management.main_manager import (
+    manage_generating_rules,
+    manage_preprocessing_assets,
+)
+from hledger_preprocessor.matching.ask_user_action import ActionDataset
+from hledger_preprocessor.matching.helper import (
+    get_transactions_in_date_range,
+    prepare_transactions_per_account,
+)
+from hledger_preprocessor.matching.searching.helper import (
+    filter_transactions_by_amount,
+)
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    load_receipts_from_dir,
+)
+from hledger_preprocessor.TransactionObjects.AccountTransaction import (
+    AccountTransaction,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+
+def _fail_on_prompt(prompt: str = "") -> str:
+    raise AssertionError(f"Benchmark stage asked for user input:{prompt}")
+
+
+@pytest.fixture(autouse=True)
+def no_user_input(monkeypatch):
+    """The synthetic receipts match exactly one csv row, so a stage that asks
+    for input indicates a broken dataset rather than hanging forever."""
+    monkeypatch.setattr("builtins.input", _fail_on_prompt)
+
+
+@pytest.fixture(scope="module")
+def models() -> Dict[ClassifierType, Dict[LogicType, Any]]:
+    return get_models(quick_categorisation=True)
+
+
+def get_bank_account_config(*, config) -> AccountConfig:
+    return next(a for a in config.accounts if a.has_input_csv())
+
+
+def parse_bank_csv(*, config, labelled_receipts) -> List[Transaction]:
+    account_config: AccountConfig = get_bank_account_config(config=config)
+    transactions_per_year: Dict[int, List[Transaction]] = csv_to_transactions(
+        config=config,
+        labelled_receipts=labelled_receipts,
+        input_csv_filepath=account_config.get_abs_csv_filepath(
+            dir_paths_config=config.dir_paths
+        ),
+        csv_encoding=config.csv_encoding,
+        account_config=account_config,
+    )
+    return [
+        t
+        for transactions in transactions_per_year.values()
+        for t in transactions
+    ]
+
+
+def test_csv_parse(synthetic_config, benchmark_scale, record_benchmark):
+    labelled_receipts: List[Receipt] = load_receipts_from_dir(
+        config=synthetic_config
+    )
+
+    def setup() -> Callable[[], Any]:
+        return lambda: parse_bank_csv(
+            config=synthetic_config, labelled_receipts=labelled_receipts
+        )
+
+    record_benchmark(
+        measure(stage="csv_parse", scale=benchmark_scale.name, setup=setup)
+    )
+    assert (
+        len(setup()()) == benchmark_scale.nr_of_csv_rows
+    ), "Not all synthetic csv rows were parsed."
+
+
+def test_classify(synthetic_config, benchmark_scale, models, record_benchmark):
+    labelled_receipts: List[Receipt] = load_receipts_from_dir(
+        config=synthetic_config
+    )
+    transactions: List[Transaction] = parse_bank_csv(
+        config=synthetic_config, labelled_receipts=labelled_receipts
+    )
+
+    def setup() -> Callable[[], Any]:
+        return lambda: classify_transactions(
+            transactions=transactions,
+            labelled_receipts=labelled_receipts,
+            ai_models_tnx_classification=models[
+                ClassifierType.TRANSACTION_CATEGORY
+            ][LogicType.AI],
+            rule_based_models_tnx_classification=models[
+                ClassifierType.TRANSACTION_CATEGORY
+            ][LogicType.RULE_BASED],
+            category_namespace=synthetic_config.category_namespace,
+        )
+
+    record_benchmark(
+        measure(stage="classify", scale=benchmark_scale.name, setup=setup)
+    )
+
+
+def test_receipt_load(synthetic_config, benchmark_scale, record_benchmark):
+    def setup() -> Callable[[], Any]:
+        return lambda: load_receipts_from_dir(config=synthetic_config)
+
+    record_benchmark(
+        measure(stage="receipt_load", scale=benchmark_scale.name, setup=setup)
+    )
+    assert (
+        len(setup()()) == benchmark_scale.nr_of_receipts
+    ), "Not all synthetic receipts were loaded."
+
+
+def test_asset_export(
+    synthetic_config, benchmark_scale, models, record_benchmark
+):
+    labelled_receipts: List[Receipt] = load_receipts_from_dir(
+        config=synthetic_config
+    )
+
+    def setup() -> Callable[[], Any]:
+        return lambda: manage_preprocessing_assets(
+            config=synthetic_config,
+            models=models,
+            labelled_receipts=labelled_receipts,
+        )
+
+    record_benchmark(
+        measure(stage="asset_export", scale=benchmark_scale.name, setup=setup)
+    )
+
+
+def test_rules_generation(synthetic_config, benchmark_scale, record_benchmark):
+    def setup() -> Callable[[], Any]:
+        return lambda: manage_generating_rules(config=synthetic_config)
+
+    record_benchmark(
+        measure(
+            stage="rules_generation", scale=benchmark_scale.name, setup=setup
+        )
+    )
+
+
+def test_matching(synthetic_config, benchmark_scale, models, record_benchmark):
+    """Times the date and amount search for the bank csv transaction of each
+    card receipt. The linking that follows a search asks the user for input
+    when it is not unique, so it is not part of the benchmark."""
+    labelled_receipts: List[Receipt] = load_receipts_from_dir(
+        config=synthetic_config
+    )
+    csv_transactions_per_account = prepare_transactions_per_account(
+        config=synthetic_config, labelled_receipts=labelled_receipts
+    )
+    bank_account_config: AccountConfig = get_bank_account_config(
+        config=synthetic_config
+    )
+    action_datasets: List[ActionDataset] = []
+    for receipt in labelled_receipts:
+        for transaction in receipt.get_both_item_types():
+            if transaction.account == bank_account_config.account:
+                action_datasets.append(
+                    ActionDataset(
+                        receipt=receipt,
+                        account=transaction.account,
+                        labelled_receipts=labelled_receipts,
+                        search_receipt_account_transaction=AccountTransaction(
+                            account=transaction.account,
+                            the_date=receipt.the_date,
+                            tendered_amount_out=transaction.tendered_amount_out,
+                        ),
+                        config=synthetic_config,
+                        csv_transactions_per_account=csv_transactions_per_account,
+                        ai_models_tnx_classification=models[
+                            ClassifierType.TRANSACTION_CATEGORY
+                        ][LogicType.AI],
+                        rule_based_models_tnx_classification=models[
+                            ClassifierType.TRANSACTION_CATEGORY
+                        ][LogicType.RULE_BASED],
+                    )
+                )
+
+    def search_matches(action_dataset: ActionDataset) -> List[Transaction]:
+        return filter_transactions_by_amount(
+            yearly_transactions=get_transactions_in_date_range(
+                transactions_per_year=csv_transactions_per_account[
+                    bank_account_config
+                ],
+                target_date=action_dataset.receipt.the_date,
+                date_margin=timedelta(days=synthetic_config.matching_algo.days),
+            ),
+            action_dataset=action_dataset,
+        )
+
+    def setup() -> Callable[[], Any]:
+        return lambda: [
+            search_matches(action_dataset) for action_dataset in action_datasets
+        ]
+
+    record_benchmark(
+        measure(stage="matching", scale=benchmark_scale.name, setup=setup)
+    )
+    assert all(
+        len(matches) == 1 for matches in setup()()
+    ), "Each synthetic card receipt should match exactly one csv row."
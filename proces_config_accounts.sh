@@ -1,6 +1,6 @@
 #!/bin/bash
 
-# Reusable function to process any array of accounts from YAML
+# Reusable function to verify any array of accounts from YAML.
 process_accounts() {
     local config_filepath="$1"
     local working_subdir="$2"
@@ -38,20 +38,10 @@ process_accounts() {
             continue
         fi
 
-        echo "Processing: $csv_filepath"
+        echo "Found: $csv_filepath"
         echo "   ACCOUNT_HOLDER=$account_holder, BANK_OR_WALLET=$bank_or_wallet, ACCOUNT_TYPE=$account_type"
         echo "   BASE_CURRENCY=$base_currency, WORKING_SUBDIR=$working_subdir"
         echo ""
-
-        # Run preprocessor
-        if ! hledger_preprocessor --config "$config_filepath" --new-setup; then
-            echo "Error: hledger_preprocessor --new-setup failed for '$csv_filepath'."
-            exit 1
-        fi
-
-        echo "PWD=$PWD"
-        echo "PREPROCESS_COMMAND=hledger_preprocessor --config $config_filepath --new-setup"
-        echo ""
     done
 }
 
@@ -81,6 +71,13 @@ proces_config_accounts() {
         local bank_json
         bank_json=$(yq e -o=json '.account_configs' "$config_filepath")
         process_accounts "$config_filepath" "$working_subdir" "$finance_dir" "$bank_json"
+
+        # Build the hledger-flow tree for all accounts in a single call.
+        echo "PREPROCESS_COMMAND=hledger_preprocessor --config $config_filepath --new-setup $INCREMENTAL_ARG"
+        if ! hledger_preprocessor --config "$config_filepath" --new-setup $INCREMENTAL_ARG; then
+            echo "Error: hledger_preprocessor --new-setup failed."
+            exit 1
+        fi
     else
         echo "No 'accounts' found or empty in '$config_filepath'. Skipping bank processing."
     fi
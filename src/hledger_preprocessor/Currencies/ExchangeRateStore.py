@@ -0,0 +1,204 @@
+"""Stores the exchange rates per currency and day in SQLite, such that the
+rate of a currency on a date, or on the last earlier day that has one, is a
+single lookup in the primary key index, also offline.
+
+A rate_to_base is the amount of the base currency that one unit of the
+currency is worth. A later rate of the same currency and day replaces the
+earlier one."""
+
+import csv
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.DirPathsConfig import DirPathsConfig
+from hledger_preprocessor.profiling.Profiler import count
+
+EXCHANGE_RATES_DB_FILENAME: str = "exchange_rates.sqlite"
+DEFAULT_BASE_CURRENCY: str = "EUR"
+SCHEMA_VERSION: int = 1
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS rates (
+    base_currency TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    the_date TEXT NOT NULL,
+    rate_to_base REAL NOT NULL,
+    source TEXT,
+    PRIMARY KEY (base_currency, currency, the_date)
+) WITHOUT ROWID;
+"""
+# The csv dumps that fetch_exchange_rates appended to, before the rates were
+# stored in SQLite, have the rates of the Frankfurter /latest endpoint in
+# units per base instead. The rates that FrankfurterFetcher stores have the
+# api url as source, and are already inverted.
+_PER_BASE_CSV_SOURCES: Tuple[str, ...] = ("api.frankfurter.app/latest",)
+
+
+@typechecked
+def get_exchange_rate_store_filepath(*, dir_paths: DirPathsConfig) -> str:
+    return os.path.abspath(
+        os.path.join(
+            dir_paths.root_finance_path,
+            dir_paths.working_subdir,
+            EXCHANGE_RATES_DB_FILENAME,
+        )
+    )
+
+
+@dataclass
+class ExchangeRateStore:
+    db_filepath: str
+    connection: sqlite3.Connection
+
+    @staticmethod
+    @typechecked
+    def open(*, db_filepath: str) -> "ExchangeRateStore":
+        """Opens (and if needed creates) the exchange rate database."""
+        os.makedirs(os.path.dirname(db_filepath), exist_ok=True)
+        connection: sqlite3.Connection = sqlite3.connect(db_filepath)
+        version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            connection.close()
+            raise ValueError(
+                f"Unsupported exchange rate store schema version:{version} in"
+                f" {db_filepath}, expected:{SCHEMA_VERSION}."
+            )
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return ExchangeRateStore(db_filepath=db_filepath, connection=connection)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @typechecked
+    def put_rates(
+        self,
+        *,
+        base_currency: str,
+        the_date: date,
+        rates: Dict[str, float],
+        source: str,
+    ) -> None:
+        """Stores the rate_to_base of each currency on the_date."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO rates (base_currency, currency,"
+                " the_date, rate_to_base, source) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        base_currency,
+                        currency,
+                        the_date.isoformat(),
+                        rate,
+                        source,
+                    )
+                    for currency, rate in rates.items()
+                ],
+            )
+
+    @typechecked
+    def import_csv(
+        self,
+        *,
+        csv_filepath: str,
+        base_currency: str = DEFAULT_BASE_CURRENCY,
+    ) -> int:
+        """Imports a csv dump with a datetime (or date), currency and
+        rate_to_base column, and optionally a source column, in one
+        transaction. Returns the number of imported rows."""
+        rows: List[Tuple[str, str, str, float, str]] = []
+        with open(csv_filepath, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                moment: str = row.get("datetime") or row["date"]
+                source: str = row.get("source") or csv_filepath
+                rate: float = float(row["rate_to_base"])
+                if rate <= 0:
+                    continue
+                if any(s in source for s in _PER_BASE_CSV_SOURCES):
+                    rate = 1 / rate
+                rows.append(
+                    (
+                        moment,
+                        row["currency"],
+                        datetime.fromisoformat(moment).date().isoformat(),
+                        rate,
+                        source,
+                    )
+                )
+        # The last rate of a day is kept.
+        rows.sort(key=lambda row: row[0])
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO rates (base_currency, currency,"
+                " the_date, rate_to_base, source) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (base_currency, currency, the_date, rate, source)
+                    for _, currency, the_date, rate, source in rows
+                ],
+            )
+        return len(rows)
+
+    @typechecked
+    def get_rate(
+        self,
+        *,
+        currency: str,
+        the_date: date,
+        base_currency: str = DEFAULT_BASE_CURRENCY,
+    ) -> Optional[float]:
+        """Returns the rate_to_base of the currency on the_date, or on the
+        last earlier day that has one, or None if there is none."""
+        if currency == base_currency:
+            return 1.0
+        count("exchange_rate_lookups")
+        row: Optional[Tuple[float]] = self.connection.execute(
+            "SELECT rate_to_base FROM rates WHERE base_currency = ? AND"
+            " currency = ? AND the_date <= ? ORDER BY the_date DESC LIMIT 1",
+            (base_currency, currency, the_date.isoformat()),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    @typechecked
+    def get_conversion_ratio(
+        self,
+        *,
+        from_currency: str,
+        to_currency: str,
+        the_date: date,
+        base_currency: str = DEFAULT_BASE_CURRENCY,
+    ) -> Optional[float]:
+        """Returns X in 1 from_currency = X to_currency on the_date, or None
+        if either rate is unknown."""
+        from_rate: Optional[float] = self.get_rate(
+            currency=from_currency,
+            the_date=the_date,
+            base_currency=base_currency,
+        )
+        to_rate: Optional[float] = self.get_rate(
+            currency=to_currency, the_date=the_date, base_currency=base_currency
+        )
+        if from_rate is None or to_rate is None:
+            return None
+        return from_rate / to_rate
+
+    @typechecked
+    def get_latest_rates(
+        self, *, base_currency: str = DEFAULT_BASE_CURRENCY
+    ) -> Dict[str, float]:
+        """Returns the last known rate_to_base of each currency."""
+        latest_rates: Dict[str, float] = dict(
+            self.connection.execute(
+                "SELECT currency, rate_to_base FROM rates AS r WHERE"
+                " base_currency = ? AND the_date = (SELECT MAX(the_date) FROM"
+                " rates WHERE base_currency = r.base_currency AND currency ="
+                " r.currency)",
+                (base_currency,),
+            ).fetchall()
+        )
+        latest_rates[base_currency] = 1.0
+        return latest_rates
@@ -0,0 +1,103 @@
+"""Gets json from HTTP APIs with a timeout, retries with exponential backoff
+and an optional on-disk cache with a time to live, such that an endpoint
+that hangs or fails does not stall the run, and repeated runs do not fetch
+the same rates again."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+from typeguard import typechecked
+
+from hledger_preprocessor.profiling.Profiler import count
+
+EXCHANGE_RATE_HTTP_CACHE_DIRNAME: str = ".exchange_rate_http_cache"
+# Status codes after which the request is retried, the others raise at once.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class JsonHttpClient:
+    timeout_seconds: float = 10.0
+    retries: int = 2
+    backoff_seconds: float = 0.5
+    cache_dir: Optional[str] = None
+    ttl_seconds: float = 3600.0
+
+    @typechecked
+    def get_cache_filepath(
+        self, *, url: str, params: Optional[Dict[str, str]]
+    ) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        key: str = hashlib.sha256(
+            json.dumps([url, params or {}], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _get_cached(self, *, cache_filepath: str) -> Optional[Any]:
+        try:
+            with open(cache_filepath, encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["fetched_at"] > self.ttl_seconds:
+            return None
+        return entry["data"]
+
+    def _put_cached(self, *, cache_filepath: str, data: Any) -> None:
+        os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+        # Per process and thread, as the same url can be fetched at once.
+        tmp_filepath: str = (
+            f"{cache_filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "data": data}, f)
+        os.replace(tmp_filepath, cache_filepath)
+
+    @typechecked
+    def get_json(
+        self, *, url: str, params: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """Returns the json of the url, from the cache if it is younger than
+        ttl_seconds. Timeouts, connection errors and the RETRY_STATUS_CODES
+        are retried, waiting backoff_seconds, then twice as long, etc."""
+        cache_filepath: Optional[str] = self.get_cache_filepath(
+            url=url, params=params
+        )
+        if cache_filepath is not None:
+            cached: Optional[Any] = self._get_cached(
+                cache_filepath=cache_filepath
+            )
+            if cached is not None:
+                count("exchange_rate_http_cache_hits")
+                return cached
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            count("exchange_rate_http_requests")
+            try:
+                response = requests.get(
+                    url, params=params, timeout=self.timeout_seconds
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                continue
+            if (
+                response.status_code in RETRY_STATUS_CODES
+                and attempt < self.retries
+            ):
+                continue
+            response.raise_for_status()
+            data: Any = response.json()
+            if cache_filepath is not None:
+                self._put_cached(cache_filepath=cache_filepath, data=data)
+            return data
+        raise AssertionError("Unreachable, the last attempt returns or raises.")
@@ -1,115 +1,181 @@
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
 
-import pandas as pd
-import requests
 from typeguard import typechecked
 
-from hledger_preprocessor.config.load_config import Config, load_config
-from hledger_preprocessor.Currency import Currency
+from hledger_preprocessor.Currencies.ExchangeRateStore import (
+    DEFAULT_BASE_CURRENCY,
+    ExchangeRateStore,
+)
+from hledger_preprocessor.Currencies.JsonHttpClient import JsonHttpClient
+from hledger_preprocessor.generics.RateFetcher import RateFetcher
 
+FRANKFURTER_API: str = "https://api.frankfurter.app"
+COINGECKO_API: str = "https://api.coingecko.com/api/v3"
 
-@typechecked
-def fetch_exchange_rates(*, base_currency: str = "EUR"):
-    rates = {}
-    sources = {}
-    now = datetime.now().isoformat()
-
-    # Define CoinGecko IDs for cryptocurrencies
-    crypto_ids = {
-        "BTC": "bitcoin",
-        "XMR": "monero",
-        "ZCASH": "zcash",
-        "ETH": "ethereum",
-        "WBTC": "wrapped-bitcoin",
-        "LINK": "chainlink",
-        "RVN": "ravencoin",
-    }
-
-    # Get fiat currencies: combine Enum fiat with dynamically fetched ones
-    fiat_currencies = [c.value for c in Currency.get_fiat()]
-    try:
-        # Fetch supported currencies from Frankfurter API
-        currencies_api = "https://api.frankfurter.app/currencies"
-        response = requests.get(currencies_api)
-        if response.status_code == 200:
-            data = response.json()
-            # Add all fiat currencies from API that aren't already in Enum
-            api_fiat_currencies = list(data.keys())
-            fiat_currencies = list(set(fiat_currencies + api_fiat_currencies))
-    except Exception as e:
-        print(f"Error fetching fiat currency list: {e}")
-
-    # Get crypto currencies (all non-fiat, non-commodity currencies from Enum)
-    crypto_currencies = [
-        c.value
-        for c in Currency
-        if c not in Currency.get_fiat() and c.value not in ["GRAMS", "LITER"]
-    ]
-
-    # Fetch fiat currency rates using Frankfurter API
-    try:
-        fiat_api = f"https://api.frankfurter.app/latest?base={base_currency}"
-        response = requests.get(fiat_api)
-        if response.status_code == 200:
-            data = response.json()
-            if "rates" in data:
-                for curr in fiat_currencies:
-                    if curr != base_currency and curr in data["rates"]:
-                        rates[curr] = data["rates"][curr]
-                        sources[curr] = fiat_api
-            else:
-                print(f"Error: No 'rates' in Frankfurter API response: {data}")
-    except Exception as e:
-        print(f"Error fetching fiat rates: {e}")
-
-    # Fetch crypto currency rates using CoinGecko
-    try:
-        crypto_api = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            "ids": ",".join(
-                [
-                    crypto_ids.get(c, "")
-                    for c in crypto_currencies
-                    if crypto_ids.get(c)
-                ]
-            ),
-            "vs_currencies": base_currency.lower(),
+# Define CoinGecko IDs for cryptocurrencies
+CRYPTO_IDS: Dict[str, str] = {
+    "BTC": "bitcoin",
+    "XMR": "monero",
+    "ZCASH": "zcash",
+    "ETH": "ethereum",
+    "WBTC": "wrapped-bitcoin",
+    "LINK": "chainlink",
+    "RVN": "ravencoin",
+}
+
+
+@dataclass(frozen=True)
+class FrankfurterFetcher:
+    """Fetches the fiat rates of the ECB, of the_date or else the last
+    earlier working day."""
+
+    client: JsonHttpClient = field(default_factory=JsonHttpClient)
+    api_url: str = FRANKFURTER_API
+
+    @typechecked
+    def fetch_rates(
+        self, *, base_currency: str, the_date: date
+    ) -> Dict[str, float]:
+        day: str = (
+            "latest" if the_date >= date.today() else the_date.isoformat()
+        )
+        data = self.client.get_json(
+            url=f"{self.api_url}/{day}", params={"base": base_currency}
+        )
+        if "rates" not in data:
+            raise ValueError(f"No 'rates' in Frankfurter API response: {data}")
+        # Frankfurter returns the units of the currency per base.
+        return {
+            currency: 1 / rate
+            for currency, rate in data["rates"].items()
+            if rate > 0
+        }
+
+    def get_name(self) -> str:
+        return self.api_url
+
+
+@dataclass(frozen=True)
+class CoinGeckoFetcher:
+    """Fetches the crypto prices of CoinGecko, in one call for today, or in
+    one concurrent call per coin for an earlier day."""
+
+    client: JsonHttpClient = field(default_factory=JsonHttpClient)
+    api_url: str = COINGECKO_API
+
+    @typechecked
+    def fetch_rates(
+        self, *, base_currency: str, the_date: date
+    ) -> Dict[str, float]:
+        vs_currency: str = base_currency.lower()
+        if the_date >= date.today():
+            data = self.client.get_json(
+                url=f"{self.api_url}/simple/price",
+                params={
+                    "ids": ",".join(CRYPTO_IDS.values()),
+                    "vs_currencies": vs_currency,
+                },
+            )
+            prices_per_id: Dict[str, Dict[str, float]] = data
+        else:
+            with ThreadPoolExecutor(max_workers=len(CRYPTO_IDS)) as executor:
+                histories = executor.map(
+                    lambda cg_id: self.client.get_json(
+                        url=f"{self.api_url}/coins/{cg_id}/history",
+                        params={"date": the_date.strftime("%d-%m-%Y")},
+                    ),
+                    CRYPTO_IDS.values(),
+                )
+                prices_per_id = {
+                    cg_id: history.get("market_data", {}).get(
+                        "current_price", {}
+                    )
+                    for cg_id, history in zip(CRYPTO_IDS.values(), histories)
+                }
+
+        return {
+            symbol: prices_per_id[cg_id][vs_currency]
+            for symbol, cg_id in CRYPTO_IDS.items()
+            if vs_currency in prices_per_id.get(cg_id, {})
         }
-        response = requests.get(crypto_api, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            for symbol, cg_id in crypto_ids.items():
-                if cg_id in data and base_currency.lower() in data[cg_id]:
-                    rates[symbol] = data[cg_id][base_currency.lower()]
-                    sources[symbol] = crypto_api
-    except Exception as e:
-        print(f"Error fetching crypto rates: {e}")
+
+    def get_name(self) -> str:
+        return self.api_url
+
+
+@dataclass(frozen=True)
+class StaticRateFetcher:
+    """Returns fixed rates, e.g. to work offline or in tests."""
+
+    rates: Dict[str, float]
+    name: str = "static"
+
+    @typechecked
+    def fetch_rates(
+        self, *, base_currency: str, the_date: date
+    ) -> Dict[str, float]:
+        return dict(self.rates)
+
+    def get_name(self) -> str:
+        return self.name
+
+
+@typechecked
+def get_default_rate_fetchers(
+    *, client: Optional[JsonHttpClient] = None
+) -> List[RateFetcher]:
+    if client is None:
+        client = JsonHttpClient()
+    return [FrankfurterFetcher(client=client), CoinGeckoFetcher(client=client)]
+
+
+@typechecked
+def fetch_exchange_rates(
+    *,
+    store: ExchangeRateStore,
+    base_currency: str = DEFAULT_BASE_CURRENCY,
+    the_date: Optional[date] = None,
+    fetchers: Optional[List[RateFetcher]] = None,
+) -> Dict[str, float]:
+    """Fetches the rates of the_date (default today) with the fetchers at
+    once, stores them, and returns them. A fetcher that fails, e.g. after
+    its client timed out, is skipped."""
+    if the_date is None:
+        the_date = date.today()
+    if fetchers is None:
+        fetchers = get_default_rate_fetchers()
+
+    with ThreadPoolExecutor(max_workers=max(len(fetchers), 1)) as executor:
+        futures: List["Future[Dict[str, float]]"] = [
+            executor.submit(
+                fetcher.fetch_rates,
+                base_currency=base_currency,
+                the_date=the_date,
+            )
+            for fetcher in fetchers
+        ]
+
+    # The store is written from this thread only, as SQLite connections can
+    # not be shared between threads.
+    rates: Dict[str, float] = {}
+    for fetcher, future in zip(fetchers, futures):
+        try:
+            fetched_rates: Dict[str, float] = future.result()
+        except Exception as e:
+            print(f"Error fetching rates from {fetcher.get_name()}: {e}")
+            continue
+        fetched_rates.pop(base_currency, None)
+        store.put_rates(
+            base_currency=base_currency,
+            the_date=the_date,
+            rates=fetched_rates,
+            source=fetcher.get_name(),
+        )
+        rates.update(fetched_rates)
 
     # Add base currency rate (always 1)
     rates[base_currency] = 1.0
-    sources[base_currency] = "Base"
-
-    # Store to CSV (append mode to keep history)
-    df_rates = pd.DataFrame(
-        {
-            "datetime": [now] * len(rates),
-            "source": list(sources.values()),
-            "currency": list(rates.keys()),
-            "rate_to_base": list(rates.values()),
-        }
-    )
-
-    config: Config = load_config(
-        config_path="/home/a/finance/config.yaml",
-        pre_processed_output_dir="TODO: replace this with a decent solution",
-    )
-    csv_path = f"{config.get_working_subdir_path(assert_exists=True)}/exchange_rates.csv"
-
-    df_rates.to_csv(
-        csv_path,
-        mode="a",
-        header=not pd.io.common.file_exists(csv_path),
-        index=False,
-    )
-
-    return rates, now
+    return rates
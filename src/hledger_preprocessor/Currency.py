@@ -1,9 +1,11 @@
+import os
 from enum import Enum
-from typing import List
+from typing import Dict, List
 
-import pandas as pd
 from typeguard import typechecked
 
+from hledger_preprocessor.Currencies.ExchangeRateStore import ExchangeRateStore
+
 
 class Currency(Enum):
     # Cryptocurrencies
@@ -57,19 +59,15 @@ class DirectAssetPurchases(Enum):
     # Add other asset categories as needed
 
 
-# Function to load latest rates from CSV
-def load_latest_rates(base_currency="EUR"):
-    csv_path = "exchange_rates.csv"
-    if not pd.io.common.file_exists(csv_path):
-        return {}
-
-    df = pd.read_csv(csv_path)
-    df["datetime"] = pd.to_datetime(df["datetime"])
-    # Get latest per currency
-    latest = df.sort_values("datetime", ascending=False).drop_duplicates(
-        "currency"
-    )
-    rates = dict(zip(latest["currency"], latest["rate_to_base"]))
-    # Ensure base is 1
-    rates[base_currency] = 1.0
-    return rates
+@typechecked
+def load_latest_rates(
+    *, db_filepath: str, base_currency: str = "EUR"
+) -> Dict[str, float]:
+    """Returns the last stored rate_to_base of each currency."""
+    if not os.path.isfile(db_filepath):
+        return {base_currency: 1.0}
+    store = ExchangeRateStore.open(db_filepath=db_filepath)
+    try:
+        return store.get_latest_rates(base_currency=base_currency)
+    finally:
+        store.close()
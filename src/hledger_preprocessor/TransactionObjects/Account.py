@@ -8,7 +8,7 @@ from hledger_preprocessor.Currency import Currency
 
 
 @typechecked
-@dataclass(frozen=True)  # Make immutable
+@dataclass(frozen=True, slots=True)  # Make immutable
 class Account:
     base_currency: Currency
     account_holder: str
@@ -44,3 +44,14 @@ class Account:
     @typechecked
     def to_dict(self) -> Dict[str, str]:
         return to_dict(self)
+
+
+# The few distinct accounts, shared by the (many) transactions that use them.
+_interned_accounts: Dict[Account, Account] = {}
+
+
+@typechecked
+def intern_account(*, account: Account) -> Account:
+    """Returns the shared instance of the accounts that are equal to account,
+    such that parsed transactions do not each hold their own copy."""
+    return _interned_accounts.setdefault(account, account)
@@ -2,12 +2,16 @@ import hashlib
 from dataclasses import dataclass
 from datetime import datetime
 from pprint import pprint
-from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, Optional, Union
 
-from typeguard import typechecked
+from typeguard import typechecked, typeguard_ignore
 
 from hledger_preprocessor.config.CsvColumnMapping import CsvColumnMapping
-from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.generics.Transaction import (
+    Transaction,
+    get_cached_hash,
+)
+from hledger_preprocessor.profiling.Profiler import count
 from hledger_preprocessor.TransactionObjects.Account import Account
 
 # from hledger_preprocessor.triodos_logic import TriodosTransaction
@@ -18,8 +22,19 @@ if TYPE_CHECKING:
 
 
 @typechecked
-@dataclass(frozen=True, unsafe_hash=True)
+@dataclass(frozen=True, eq=False, slots=True)
 class AccountTransaction(Transaction):
+    # Shared by all instances: the hledger fields of the account transactions.
+    csv_column_mapping: ClassVar[CsvColumnMapping] = CsvColumnMapping(
+        csv_column_mapping=(
+            ("currency", "currency"),
+            ("account_holder", "account_holder"),
+            ("bank", "bank"),
+            ("account_type", "account_type"),
+            ("the_date", "date"),
+            ("tendered_amount_out", "amount"),
+        )
+    )
     # TODO: include date.
     account: Account
     the_date: datetime
@@ -33,7 +48,7 @@ class AccountTransaction(Transaction):
     def __post_init__(self):
 
         if self.tendered_amount_out < 0 and self.change_returned != -0:
-            pprint(self.__dict__)
+            pprint(self)
             raise ValueError(
                 f"tendered_amount_out:{self.tendered_amount_out} cannot be"
                 f" negative with change_returned:{self.change_returned}"
@@ -53,30 +68,17 @@ class AccountTransaction(Transaction):
                 f" got:{self.the_date}"
             )
 
-        # Store hledger field mapping values.
-        # tendered_amount_out: float = (
-        #     self.tendered_amount_out - self.change_returned
-        # )
-        # object.__setattr__(self, "tendered_amount_out", tendered_amount_out)
-
-        account_holder: str = self.account.account_holder
-        object.__setattr__(self, "account_holder", account_holder)
-        bank: str = self.account.bank
-        object.__setattr__(self, "bank", bank)
-        account_type: str = self.account.account_type
-        object.__setattr__(self, "account_type", account_type)
-        csv_column_mapping: CsvColumnMapping = CsvColumnMapping(
-            csv_column_mapping=(
-                ("currency", "currency"),
-                ("account_holder", "account_holder"),
-                ("bank", "bank"),
-                ("account_type", "account_type"),
-                ("the_date", "date"),
-                ("tendered_amount_out", "amount"),
-            )
-        )
-        object.__setattr__(self, "csv_column_mapping", csv_column_mapping)
-        # ai_classification, logic_classification
+    @property
+    def account_holder(self) -> str:
+        return self.account.account_holder
+
+    @property
+    def bank(self) -> str:
+        return self.account.bank
+
+    @property
+    def account_type(self) -> str:
+        return self.account.account_type
 
     @typechecked
     def set_parent_receipt_category(self, parent_receipt_category: str) -> None:
@@ -149,8 +151,16 @@ class AccountTransaction(Transaction):
         else:
             raise ValueError("Did not create a filled hledger dict.")
 
-    @typechecked
+    @typeguard_ignore
     def get_hash(self) -> int:
+        return get_cached_hash(
+            transaction=self,
+            slot_name="_identity_hash",
+            compute_hash=self._compute_identity_hash,
+        )
+
+    def _compute_identity_hash(self) -> int:
+        count("transaction_hashes_computed")
         m = hashlib.sha256()
         m.update(self.account.to_string().encode())
 
@@ -161,12 +171,5 @@ class AccountTransaction(Transaction):
         m.update(f"{self.tendered_amount_out:.2f}".encode())
         m.update(f"{self.change_returned:.2f}".encode())
 
-        # 3. Optional strings: handle None safely and consistently
-        description = self.description or ""
-        other_party_name = self.other_party_name or ""
-
-        m.update(description.encode("utf-8"))
-        m.update(other_party_name.encode("utf-8"))
-
         # Return first 8 bytes (64 bits) as integer — sufficient for hashing/deduplication
         return int(m.hexdigest()[:16], 16)
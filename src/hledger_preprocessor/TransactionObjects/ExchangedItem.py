@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import FrozenSet, List, Optional, Union
 
 from typeguard import typechecked
 
@@ -12,6 +12,11 @@ from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
 
+# Looked up once, as get_2_digit_rounded is called for every loaded item.
+_2_DIGIT_ROUNDED_CURRENCIES: FrozenSet[Currency] = frozenset(
+    Currency.get_2_digit_rounded()
+)
+
 
 @typechecked
 @dataclass
@@ -56,7 +61,7 @@ class ExchangedItem:
                 currency = transaction.account.base_currency
 
             # TODO: change to rounding depth per currency, none if not specified.
-            if currency in Currency.get_2_digit_rounded():
+            if currency in _2_DIGIT_ROUNDED_CURRENCIES:
                 self.payed_for_item_rounded += round(net_amount, 2)
             elif self.round_amount:
                 try:
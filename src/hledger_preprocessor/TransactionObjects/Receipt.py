@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from pprint import pprint
@@ -33,7 +33,6 @@ from hledger_preprocessor.TransactionObjects.TransactedItemType import (
 @typechecked
 @dataclass
 class Receipt:
-    config: Config
     raw_img_filepath: str
     the_date: datetime
     shop_identifier: ShopId
@@ -45,8 +44,11 @@ class Receipt:
     ai_receipt_categorisation: Optional[Dict[str, str]] = None
     transaction_hash: Optional[str] = None
     receipt_category: Optional[str] = None
+    # Only needed to convert the items if they are passed as dicts, and not
+    # kept, such that receipts are cheap to copy, compare and pickle.
+    config: InitVar[Optional[Config]] = None
 
-    def __post_init__(self):
+    def __post_init__(self, config: Optional[Config]):
 
         if isinstance(self.the_date, str):
             try:
@@ -70,15 +72,18 @@ class Receipt:
             )
         if not self.net_bought_items and not self.net_returned_items:
             raise ValueError("At least one bought or returned item is required")
-        if self.net_bought_items:
-            if not isinstance(self.net_bought_items, ExchangedItem):
-                self.net_bought_items: ExchangedItem = convert_exchanged_item(
-                    config=self.config, item=self.net_bought_items
-                )
-        if self.net_returned_items:
-            if not isinstance(self.net_returned_items, ExchangedItem):
-                self.net_returned_items: ExchangedItem = convert_exchanged_item(
-                    config=self.config, item=self.net_returned_items
+        for items_name in ["net_bought_items", "net_returned_items"]:
+            items = getattr(self, items_name)
+            if items and not isinstance(items, ExchangedItem):
+                if config is None:
+                    raise ValueError(
+                        f"The {items_name} of a receipt can only be passed as"
+                        " dicts together with the config."
+                    )
+                setattr(
+                    self,
+                    items_name,
+                    convert_exchanged_item(config=config, item=items),
                 )
         if not isinstance(self.shop_identifier, ShopId):
             self.shop_identifier: ShopId = convert_shop_id(
@@ -186,7 +191,7 @@ class Receipt:
 
     @typechecked
     def pretty_print_receipt_without_config(self) -> None:
-        pprint({k: v for k, v in self.__dict__.items() if k != "config"})
+        pprint(self.__dict__)
 
 
 def initialize_account_transaction(
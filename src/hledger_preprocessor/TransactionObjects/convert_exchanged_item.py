@@ -9,7 +9,10 @@ from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.generics.GenericTransactionWithCsv import (
     GenericCsvTransaction,
 )
-from hledger_preprocessor.TransactionObjects.Account import Account
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
@@ -24,44 +27,10 @@ def convert_exchanged_item(
     *, config: Config, item: Union[dict, List[dict]]
 ) -> ExchangedItem:
     transactions = []
-    merged_item = {}
 
     # Handle list input by merging dictionaries
     if isinstance(item, list):
-        # Initialize merged_item with defaults
-        merged_item = {
-            "quantity": 1,
-            "description": "",
-            "the_date": None,
-            "account_transactions": [],
-            "tax_per_unit": None,
-            "group_discount": None,
-            "category": None,
-            "round_amount": None,
-            "unit_price": None,
-        }
-        for sub_item in item:
-            # Merge account_transactions
-            if "account_transactions" in sub_item:
-                merged_item["account_transactions"].extend(
-                    sub_item["account_transactions"]
-                )
-            # Use the first non-None value for other fields
-            for key in [
-                "quantity",
-                "description",
-                "the_date",
-                "tax_per_unit",
-                "group_discount",
-                "category",
-                "round_amount",
-                "unit_price",
-            ]:
-                if key in sub_item and sub_item[key] is not None:
-                    merged_item[key] = sub_item[key]
-        # Use the description from the first item if available
-        if not merged_item["description"] and item:
-            merged_item["description"] = item[0].get("description", "")
+        merged_item = merge_item_dicts(items=item)
     else:
         merged_item = item
 
@@ -87,11 +56,13 @@ def convert_exchanged_item(
                 )
         else:
             currency = currency_input
-        account = Account(
-            base_currency=currency,
-            account_holder=account_dict["account_holder"],
-            bank=account_dict["bank"],
-            account_type=account_dict["account_type"],
+        account = intern_account(
+            account=Account(
+                base_currency=currency,
+                account_holder=account_dict["account_holder"],
+                bank=account_dict["bank"],
+                account_type=account_dict["account_type"],
+            )
         )
 
         some_transaction: Union[AccountTransaction, GenericCsvTransaction] = (
@@ -118,3 +89,44 @@ def convert_exchanged_item(
         round_amount=merged_item.get("round_amount"),
         unit_price=merged_item.get("unit_price"),
     )
+
+
+@typechecked
+def merge_item_dicts(*, items: List[dict]) -> dict:
+    """Merges the exchanged items of a list into one item, with all their
+    account transactions."""
+    # Initialize merged_item with defaults
+    merged_item = {
+        "quantity": 1,
+        "description": "",
+        "the_date": None,
+        "account_transactions": [],
+        "tax_per_unit": None,
+        "group_discount": None,
+        "category": None,
+        "round_amount": None,
+        "unit_price": None,
+    }
+    for sub_item in items:
+        # Merge account_transactions
+        if "account_transactions" in sub_item:
+            merged_item["account_transactions"].extend(
+                sub_item["account_transactions"]
+            )
+        # Use the first non-None value for other fields
+        for key in [
+            "quantity",
+            "description",
+            "the_date",
+            "tax_per_unit",
+            "group_discount",
+            "category",
+            "round_amount",
+            "unit_price",
+        ]:
+            if key in sub_item and sub_item[key] is not None:
+                merged_item[key] = sub_item[key]
+    # Use the description from the first item if available
+    if not merged_item["description"] and items:
+        merged_item["description"] = items[0].get("description", "")
+    return merged_item
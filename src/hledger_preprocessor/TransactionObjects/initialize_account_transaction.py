@@ -9,6 +9,7 @@ from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.generics.GenericTransactionWithCsv import (
     GenericCsvTransaction,
 )
+from hledger_preprocessor.TransactionObjects.Account import intern_account
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     Account,
     AccountTransaction,
@@ -95,8 +96,10 @@ def initialize_account_transaction(
             transaction["account"]["base_currency"] = Currency(
                 transaction["account"]["base_currency"]
             )
-            transaction["account"] = Account(
-                **transaction["account"],
+            transaction["account"] = intern_account(
+                account=Account(
+                    **transaction["account"],
+                )
             )
         if (
             "transaction_code" in transaction.keys()
@@ -3,18 +3,23 @@ hledger."""
 
 import hashlib
 from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, is_dataclass
 from datetime import datetime
 from enum import Enum, EnumMeta
 from typing import Any, Dict, Optional, Union
 
 import iso8601
-from typeguard import typechecked
+from typeguard import typechecked, typeguard_ignore
 
+from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.generics.GenericTransactionWithCsv import (
     GenericCsvTransaction,
 )
-from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.generics.hashing import get_field_values
+from hledger_preprocessor.generics.Transaction import (
+    Transaction,
+    get_cached_hash,
+)
 from hledger_preprocessor.TransactionObjects.Account import Account
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
@@ -24,7 +29,7 @@ from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
 
 
 @typechecked
-@dataclass(frozen=True, unsafe_hash=True)
+@dataclass(frozen=True, eq=False, slots=True)
 class TriodosTransaction(Transaction):
     account: Account
     nr_in_batch: int
@@ -42,39 +47,51 @@ class TriodosTransaction(Transaction):
 
     def __post_init__(self):
 
-        ## TODO: convert to use account object directly.
-        self.account_holder: str = self.account.account_holder
-        self.bank: str = self.account.bank
-        self.account_type: str = self.account.account_type
-        self.account_type: str = self.account.account_type
-        self.currency: float = self.account.base_currency
         if not isinstance(self.transaction_code, TransactionCode):
-            self.transaction_code: TransactionCode = (
+            object.__setattr__(
+                self,
+                "transaction_code",
                 TransactionCode.normalize_transaction_code(
                     transaction_code=self.transaction_code
-                )
+                ),
             )
         if isinstance(self.the_date, str):
             try:
                 parsed_date = iso8601.parse_date(
                     self.the_date
                 )  # Handles ISO 8601 strings
-                self.the_date = parsed_date.replace(
-                    tzinfo=None
+                object.__setattr__(
+                    self, "the_date", parsed_date.replace(tzinfo=None)
                 )  # Ensure timezone-naive
             except iso8601.ParseError:
                 raise ValueError(
                     f"Invalid date format for the_date: {self.the_date}"
                 )
         elif isinstance(self.the_date, datetime):
-            self.the_date = self.the_date.replace(
-                tzinfo=None
+            object.__setattr__(
+                self, "the_date", self.the_date.replace(tzinfo=None)
             )  # Ensure timezone-naive
         else:
             raise ValueError(
                 f"Invalid type for the_date: {type(self.the_date)}"
             )
 
+    @property
+    def account_holder(self) -> str:
+        return self.account.account_holder
+
+    @property
+    def bank(self) -> str:
+        return self.account.bank
+
+    @property
+    def account_type(self) -> str:
+        return self.account.account_type
+
+    @property
+    def currency(self) -> Currency:
+        return self.account.base_currency
+
     @typechecked
     def to_dict(self) -> Dict[str, Union[int, float, str, datetime]]:
         base_dict: Dict[str, Union[int, float, str, datetime]] = (
@@ -170,6 +187,7 @@ class TriodosTransaction(Transaction):
     def get_year(self) -> int:
         return int(self.the_date.strftime("%Y"))
 
+    @typeguard_ignore
     def get_hash(self) -> str:
         """
         Generate a unique SHA-256 hash for the object based on its attributes.
@@ -177,6 +195,13 @@ class TriodosTransaction(Transaction):
         Returns:
             str: A hexadecimal string representing the object's hash.
         """
+        return get_cached_hash(
+            transaction=self,
+            slot_name="_identity_hash",
+            compute_hash=self._compute_identity_hash,
+        )
+
+    def _compute_identity_hash(self) -> str:
 
         def _serialize(obj: Any) -> bytes:
             """Recursively serialize object attributes to a consistent byte string."""
@@ -205,6 +230,8 @@ class TriodosTransaction(Transaction):
                 )  # Convert to ISO 8601 string
             elif hasattr(obj, "__dict__"):
                 return _serialize(obj.__dict__)
+            elif is_dataclass(obj):  # Slotted dataclasses have no __dict__.
+                return _serialize(get_field_values(obj=obj))
             elif obj is None:
                 return b"null"
             else:
@@ -216,7 +243,7 @@ class TriodosTransaction(Transaction):
         hasher = hashlib.sha256()
 
         # Serialize the object's attributes (sorted to ensure consistency)
-        serialized = _serialize(self.__dict__)
+        serialized = _serialize(get_field_values(obj=self))
 
         # Update the hasher with the serialized bytes
         hasher.update(serialized)
@@ -13,8 +13,9 @@ warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
 warnings.filterwarnings("ignore", category=FutureWarning, module="transformers")
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="runpy")
 
+import sys
 from argparse import Namespace
-from typing import Any, Dict, List
+from typing import List, Optional
 
 from typeguard import typechecked
 
@@ -22,22 +23,12 @@ from hledger_preprocessor.arg_parser import (
     assert_args_are_valid,
     create_arg_parser,
 )
-from hledger_preprocessor.config.load_config import Config, load_config
-from hledger_preprocessor.generics.enums import ClassifierType, LogicType
-from hledger_preprocessor.get_models import get_models
-from hledger_preprocessor.management.helper import edit_receipt
-from hledger_preprocessor.management.main_manager import (
-    manage_creating_new_setup,
-    manage_creating_receipt_img_labels_with_tui,
-    manage_generating_rules,
-    manage_matching_manual_receipt_objs_to_account_transactions,
-    manage_preprocessing_assets,
-    manage_preprocessing_csvs,
+from hledger_preprocessor.daemon.client import (
+    can_run_in_daemon,
+    forward_to_daemon,
+    stop_daemon,
 )
-from hledger_preprocessor.reading_history.load_receipts_from_dir import (
-    load_receipts_from_dir,
-)
-from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+from hledger_preprocessor.profiling.Profiler import profile_run
 
 
 @typechecked
@@ -48,61 +39,80 @@ def main() -> None:
     ## NEW
     args: Namespace = parser.parse_args()
     assert_args_are_valid(args=args)
+
+    if args.stop_daemon:
+        stop_daemon(socket_path=args.daemon_socket)
+        return
+
+    if args.serve:
+        from hledger_preprocessor.daemon.server import serve
+
+        serve(socket_path=args.daemon_socket)
+        return
+
+    # Let a running daemon perform the actions to skip the (model) loading.
+    if args.daemon_socket is not None and can_run_in_daemon(args=args):
+        exit_code: Optional[int] = forward_to_daemon(
+            socket_path=args.daemon_socket, argv=sys.argv[1:]
+        )
+        if exit_code is not None:
+            if exit_code != 0:
+                sys.exit(exit_code)
+            return
+
+    with profile_run(
+        enabled=args.profile,
+        output_format=args.profile_format,
+        output_filepath=args.profile_output,
+    ):
+        run_locally(args=args)
+
+
+@typechecked
+def run_locally(*, args: Namespace) -> None:
+    # Imported here such that daemon clients do not pay for these imports.
+    from hledger_preprocessor.config.load_config import Config, load_config
+    from hledger_preprocessor.get_models import get_models
+    from hledger_preprocessor.management.main_manager import (
+        manage_label_store,
+    )
+    from hledger_preprocessor.management.run_actions import run_actions
+    from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+        load_receipts_from_dir,
+    )
+    from hledger_preprocessor.receipts_to_objects.write_receipt_label import (
+        set_debug_label_writes,
+    )
+    from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+    set_debug_label_writes(enabled=args.debug_label_writes)
+
+    if args.watch:
+        from hledger_preprocessor.watch.watch_manager import manage_watching
+
+        manage_watching(args=args, models_loader=get_models)
+        return
+
     config: Config = load_config(
         config_path=args.config,
         pre_processed_output_dir=args.pre_processed_output_dir,
     )
 
-    labelled_receipts: List[Receipt] = load_receipts_from_dir(config=config)
-
-    if (
-        args.preprocess_csvs
-        or args.preprocess_assets
-        or args.link_receipts_to_transactions
-    ):
-        models: Dict[ClassifierType, Dict[LogicType, Any]] = get_models(
-            quick_categorisation=args.quick_categorisation
-        )
-
-        if args.preprocess_csvs:
-            manage_preprocessing_csvs(
-                config=config,
-                models=models,
-                labelled_receipts=labelled_receipts,
-            )
-
-        if args.preprocess_assets:
-            manage_preprocessing_assets(
-                config=config,
-                models=models,
-                labelled_receipts=labelled_receipts,
-            )
-
-        if args.link_receipts_to_transactions:
-            manage_matching_manual_receipt_objs_to_account_transactions(
-                config=config,
-                models=models,
-                labelled_receipts=labelled_receipts,
-            )
-
-    if args.edit_receipt:
-        edit_receipt(config=config, labelled_receipts=labelled_receipts)
-
-    if args.new_setup:
-        manage_creating_new_setup(
+    if args.import_label_store or args.export_label_store:
+        manage_label_store(
             config=config,
-            labelled_receipts=labelled_receipts,
+            import_labels=args.import_label_store,
+            export_labels=args.export_label_store,
         )
 
-    if args.generate_rules:
-        manage_generating_rules(
-            config=config,
-        )
+    labelled_receipts: List[Receipt] = load_receipts_from_dir(config=config)
 
-    if args.tui_label_receipts:
-        manage_creating_receipt_img_labels_with_tui(
-            config=config, verbose=False
-        )
+    run_actions(
+        args=args,
+        config=config,
+        labelled_receipts=labelled_receipts,
+        models_loader=get_models,
+    )
 
 
 if __name__ == "__main__":
@@ -5,6 +5,8 @@ import re
 
 from typeguard import typechecked
 
+from hledger_preprocessor.profiling.Profiler import PROFILE_FORMATS
+
 
 @typechecked
 def create_arg_parser() -> argparse.ArgumentParser:
@@ -49,6 +51,17 @@ def create_arg_parser() -> argparse.ArgumentParser:
             " book keeping."
         ),
     )
+    parser.add_argument(
+        "--account-filter",
+        type=str,
+        action="append",
+        required=False,
+        help=(
+            "Only run --new-setup for the account(s) formatted as"
+            " account_holder:bank:account_type. Can be passed multiple times."
+            " Defaults to all accounts in the config."
+        ),
+    )
 
     # Action 1.
     parser.add_argument(
@@ -82,6 +95,27 @@ def create_arg_parser() -> argparse.ArgumentParser:
         ),
     )
 
+    parser.add_argument(
+        "--apply-image-ops",
+        action="store_true",
+        required=False,
+        help=(
+            "Apply the rotate and crop operations that are stored next to the"
+            " processed receipt images to all raw receipt images again,"
+            " without asking for input, e.g. after moving the raw images or"
+            " changing the rotate_ext or crop_ext."
+        ),
+    )
+    parser.add_argument(
+        "--image-ops-workers",
+        type=int,
+        required=False,
+        help=(
+            "Number of processes for --apply-image-ops, defaults to the"
+            " number of CPUs."
+        ),
+    )
+
     # Action 3.b
     parser.add_argument(
         "-a",
@@ -127,7 +161,130 @@ def create_arg_parser() -> argparse.ArgumentParser:
         help="Make hledger-flow preprocess the exported asset csvs.",
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        required=False,
+        help=(
+            "Only regenerate the pre-processed csvs, asset csvs and rules"
+            " files whose inputs (bank csvs, receipt labels, categories.yaml,"
+            " config.yaml, rules scripts) changed since the last run."
+        ),
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        required=False,
+        help=(
+            "Keep running and redo the requested actions for the receipt"
+            " images, receipt labels and bank csvs that are added or changed."
+            " New receipt images are queued, and labelled if"
+            " --tui-label-receipts is passed."
+        ),
+    )
+
+    # Label store functionality.
+    parser.add_argument(
+        "--import-label-store",
+        action="store_true",
+        required=False,
+        help=(
+            "(Re)build the sqlite label store from the json receipt labels,"
+            " e.g. after editing them by hand."
+        ),
+    )
+    parser.add_argument(
+        "--export-label-store",
+        action="store_true",
+        required=False,
+        help=(
+            "Write the labels of the sqlite label store to the json receipt"
+            " labels dir."
+        ),
+    )
+
+    # Exchange rate functionality.
+    parser.add_argument(
+        "--import-exchange-rates",
+        type=str,
+        nargs="+",
+        required=False,
+        metavar="CSV",
+        help=(
+            "Import the exchange rates of csv dumps with a datetime (or date),"
+            " currency and rate_to_base column into the exchange rate store."
+        ),
+    )
+    parser.add_argument(
+        "--fetch-exchange-rates",
+        action="store_true",
+        required=False,
+        help="Fetch the exchange rates of today into the exchange rate store.",
+    )
+
+    # Daemon functionality.
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        required=False,
+        help=(
+            "Start a daemon that keeps the config, receipts, parsed csvs and"
+            " models in memory and listens on the --daemon-socket."
+        ),
+    )
+    parser.add_argument(
+        "--daemon-socket",
+        type=str,
+        required=False,
+        help=(
+            "Path to the Unix socket of the daemon. If given, non-interactive"
+            " actions are performed by the daemon listening on it."
+        ),
+    )
+    parser.add_argument(
+        "--stop-daemon",
+        action="store_true",
+        required=False,
+        help="Stop the daemon listening on the --daemon-socket.",
+    )
+
     # Debugging functionality.
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        required=False,
+        help=(
+            "Report the time spent per stage and counters such as the parsed"
+            " csv rows, loaded receipts and computed hashes."
+        ),
+    )
+    parser.add_argument(
+        "--profile-format",
+        type=str,
+        choices=PROFILE_FORMATS,
+        default="table",
+        required=False,
+        help=(
+            "Format of the --profile report. The chrome-trace can be opened in"
+            " chrome://tracing or https://ui.perfetto.dev."
+        ),
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        required=False,
+        help="Write the --profile report to this file instead of stdout.",
+    )
+    parser.add_argument(
+        "--debug-label-writes",
+        action="store_true",
+        required=False,
+        help=(
+            "Reload every updated receipt label and diff it field by field"
+            " against the updated and the original receipt."
+        ),
+    )
     parser.add_argument(
         "-q",
         "--quick-categorisation",
@@ -159,6 +316,65 @@ def assert_args_are_valid(*, args: argparse.Namespace) -> None:
                 " you need to include the --preprocess-csvs arg and the"
                 " --pre-processed-output-dir."
             )
+    if (args.serve or args.stop_daemon) and args.daemon_socket is None:
+        raise ValueError(
+            "The --serve and --stop-daemon args require the --daemon-socket"
+            " arg."
+        )
+    if args.watch:
+        if args.config is None:
+            raise ValueError("The --watch arg requires the --config arg.")
+        if (
+            args.serve
+            or args.edit_receipt
+            or args.link_receipts_to_transactions
+        ):
+            raise ValueError(
+                "The --watch arg can not be combined with --serve,"
+                " --edit-receipt or --link-receipts-to-transactions."
+            )
+    if args.import_label_store or args.export_label_store:
+        if args.config is None:
+            raise ValueError(
+                "The --import-label-store and --export-label-store args"
+                " require the --config arg."
+            )
+        if args.import_label_store and args.export_label_store:
+            raise ValueError(
+                "The --import-label-store and --export-label-store args can"
+                " not be combined."
+            )
+    if (
+        args.import_exchange_rates or args.fetch_exchange_rates
+    ) and args.config is None:
+        raise ValueError(
+            "The --import-exchange-rates and --fetch-exchange-rates args"
+            " require the --config arg."
+        )
+    if args.profile_output is not None and not args.profile:
+        raise ValueError("The --profile-output arg requires --profile.")
+    if args.apply_image_ops and args.config is None:
+        raise ValueError("The --apply-image-ops arg requires the --config arg.")
+    if args.image_ops_workers is not None:
+        if not args.apply_image_ops:
+            raise ValueError(
+                "The --image-ops-workers arg requires --apply-image-ops."
+            )
+        if args.image_ops_workers < 1:
+            raise ValueError(
+                "The --image-ops-workers arg must be a positive integer."
+            )
+    if args.incremental and args.config is None:
+        raise ValueError("The --incremental arg requires the --config arg.")
+    if args.account_filter and not args.new_setup:
+        raise ValueError("The --account-filter arg requires --new-setup.")
+    if args.account_filter:
+        for account_filter in args.account_filter:
+            if len(account_filter.split(":")) != 3:
+                raise ValueError(
+                    f"Invalid --account-filter:{account_filter}, expected"
+                    " account_holder:bank:account_type."
+                )
     if args.preprocess_csvs:
         if args.pre_processed_output_dir is None:
             raise ValueError(
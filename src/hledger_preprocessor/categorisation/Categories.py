@@ -1,18 +1,95 @@
 # category.py
-from __future__ import annotations
+"""The category hierarchy, compiled once into an immutable trie of interned
+Category nodes. Resolving category_namespace.house.furniture.ikea is then a
+dict lookup per level, and its parent, root and str are precomputed."""
 
-from typing import Any, Iterable
+from __future__ import annotations
 
-from typeguard import typechecked
+import threading
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
 
 # Generic type for better autocomplete in some editors
 # _T = TypeVar("_T")
 
+# The compiled root nodes per hierarchy, by id. The hierarchy is kept in the
+# value, such that its id is not reused. Hierarchies are not modified after
+# they are loaded.
+_tries: dict[int, tuple[dict[str, Any], Mapping[str, Category]]] = {}
+_tries_lock = threading.Lock()
+
+
+def _get_invalid_category_error(
+    *, parts: tuple[str, ...], index: int, node: Any
+) -> ValueError:
+    parent = ":".join(parts[:index]) or "<root>"
+    allowed = sorted(node.keys()) if isinstance(node, dict) else []
+    return ValueError(
+        f"Invalid category: '{parts[index]}' not allowed under '{parent}'\n"
+        f"  Path: {':'.join(parts)}\n"
+        f"  Allowed: {', '.join(allowed) or 'none'}"
+    )
+
+
+def _compile_nodes(
+    *,
+    node: Any,
+    parent: Category | None,
+    hierarchy: dict[str, Any],
+) -> Mapping[str, Category]:
+    """Returns the Category of each key of the node, with their children."""
+    if not isinstance(node, dict):
+        return MappingProxyType({})
+    children: dict[str, Category] = {}
+    for name, child_node in node.items():
+        category = Category._new_node(
+            name=str(name), node=child_node, parent=parent, hierarchy=hierarchy
+        )
+        children[category.name] = category
+    return MappingProxyType(children)
+
+
+def compile_category_trie(
+    *, hierarchy: dict[str, Any]
+) -> Mapping[str, Category]:
+    """Returns the root Category nodes of the hierarchy, compiled once per
+    hierarchy."""
+    trie = _tries.get(id(hierarchy))
+    if trie is None:
+        with _tries_lock:
+            trie = _tries.get(id(hierarchy))
+            if trie is None:
+                trie = (
+                    hierarchy,
+                    _compile_nodes(
+                        node=hierarchy, parent=None, hierarchy=hierarchy
+                    ),
+                )
+                _tries[id(hierarchy)] = trie
+    return trie[1]
+
 
 class Category:
-    def __init__(self, path: str | Iterable[str], hierarchy: dict[str, Any]):
-        self._hierarchy = hierarchy
+    """A node of the compiled category trie. Category(path, hierarchy)
+    returns the interned node of the path."""
 
+    # The children are also stored in the __dict__ of the node, such that
+    # category.child is a plain attribute lookup.
+    __slots__ = (
+        "__dict__",
+        "_hierarchy",
+        "_node",
+        "_path",
+        "_str",
+        "_hash",
+        "_parent",
+        "_children",
+        "_dir",
+    )
+
+    def __new__(
+        cls, path: str | Iterable[str], hierarchy: dict[str, Any]
+    ) -> Category:
         if isinstance(path, str):
             parts = [p.strip().lower() for p in path.split(":") if p.strip()]
         else:
@@ -21,20 +98,57 @@ class Category:
         if not parts:
             raise ValueError("Category path cannot be empty")
 
-        node = hierarchy
+        children = compile_category_trie(hierarchy=hierarchy)
+        node: Any = hierarchy
+        category: Category | None = None
         for i, part in enumerate(parts):
-            if not isinstance(node, dict) or part not in node:
-                parent = ":".join(parts[:i]) or "<root>"
-                allowed = sorted(node.keys()) if isinstance(node, dict) else []
-                raise ValueError(
-                    f"Invalid category: '{part}' not allowed under '{parent}'\n"
-                    f"  Path: {':'.join(parts)}\n"
-                    f"  Allowed: {', '.join(allowed) or 'none'}"
+            category = children.get(part)
+            if category is None:
+                raise _get_invalid_category_error(
+                    parts=tuple(parts), index=i, node=node
+                )
+            node = category._node
+            children = category._children
+        return category
+
+    @classmethod
+    def _new_node(
+        cls,
+        *,
+        name: str,
+        node: Any,
+        parent: Category | None,
+        hierarchy: dict[str, Any],
+    ) -> Category:
+        category = object.__new__(cls)
+        path = (name,) if parent is None else (*parent._path, name)
+        set_slot = object.__setattr__
+        set_slot(category, "_hierarchy", hierarchy)
+        set_slot(category, "_node", node)
+        set_slot(category, "_path", path)
+        set_slot(category, "_str", ":".join(path))
+        set_slot(category, "_hash", hash(path))
+        set_slot(category, "_parent", parent)
+        set_slot(
+            category,
+            "_dir",
+            (
+                sorted(
+                    k for k, v in node.items() if isinstance(v, dict) or v == {}
                 )
-            node = node[part]
+                if isinstance(node, dict)
+                else []
+            ),
+        )
+        children = _compile_nodes(
+            node=node, parent=category, hierarchy=hierarchy
+        )
+        set_slot(category, "_children", children)
+        category.__dict__.update(children)
+        return category
 
-        self._path = tuple(parts)
-        self._str = ":".join(parts)
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Category is immutable, can not set:{name}")
 
     @property
     def name(self) -> str:
@@ -42,11 +156,7 @@ class Category:
 
     @property
     def parent(self) -> Category | None:
-        return (
-            Category(":".join(self._path[:-1]), self._hierarchy)
-            if len(self._path) > 1
-            else None
-        )
+        return self._parent
 
     @property
     def root(self) -> str:
@@ -63,33 +173,60 @@ class Category:
         return f"Category('{self._str}')"
 
     def __hash__(self) -> int:
-        return hash(self._path)
+        return self._hash
 
     def __eq__(self, other: Any) -> bool:
-        return isinstance(other, Category) and self._path == other._path
+        return self is other or (
+            isinstance(other, Category) and self._path == other._path
+        )
+
+    def _get_child(self, name: str) -> Category:
+        child = self._children.get(name)
+        if child is None:
+            raise _get_invalid_category_error(
+                parts=(*self._path, name),
+                index=len(self._path),
+                node=self._node,
+            )
+        return child
 
     def __truediv__(self, child: str) -> Category:
-        return Category((*self._path, child.lower()), self._hierarchy)
+        return self._get_child(child.lower())
 
-    @typechecked
     def __getattr__(self, name: str) -> Category:
-        if name.startswith("__") and name.endswith("__"):
+        # Only called for names that are not children (in other case),
+        # slots, properties or methods. An unset slot is not a child.
+        if (name.startswith("__") and name.endswith("__")) or name in _SLOTS:
             raise AttributeError(name)
-        return Category((*self._path, name.lower()), self._hierarchy)
+        return self._get_child(name.lower())
 
     def __dir__(self) -> list[str]:
-        node = self._hierarchy
-        for p in self._path:
-            node = node[p]
-        return sorted(
-            k for k, v in node.items() if isinstance(v, dict) or v == {}
-        )
+        return list(self._dir)
+
+    # The nodes are immutable and interned, so copies are the node itself.
+    def __copy__(self) -> Category:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Category:
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (Category, (self._str, self._hierarchy))
+
+
+_SLOTS: frozenset[str] = frozenset(Category.__slots__) - {"__dict__"}
 
 
 # The typed namespace
 class CategoryNamespace:
     def __init__(self, hierarchy: dict[str, Any]):
         self._hierarchy = hierarchy
+        self._roots: Mapping[str, Category] = compile_category_trie(
+            hierarchy=hierarchy
+        )
+        # Such that category_namespace.root is a plain attribute lookup.
+        for name, root in self._roots.items():
+            self.__dict__.setdefault(name, root)
 
     # def __getattr__(self, name: str) -> Category:
     #     return Category(name.lower(), self._hierarchy)
@@ -98,11 +235,27 @@ class CategoryNamespace:
         # Skip all dunder (magic) attributes – let AttributeError propagate naturally
         if name.startswith("__") and name.endswith("__"):
             raise AttributeError(name)
+        if name in ("_hierarchy", "_roots"):  # Not set yet.
+            raise AttributeError(name)
 
-        return Category(name.lower(), self._hierarchy)
+        root = self._roots.get(name.lower())
+        if root is None:
+            raise _get_invalid_category_error(
+                parts=(name.lower(),), index=0, node=self._hierarchy
+            )
+        return root
 
     def __dir__(self) -> list[str]:
         return sorted(self._hierarchy.keys())
 
     def __repr__(self) -> str:
         return f"<CategoryNamespace roots: {', '.join(dir(self))}>"
+
+    def __copy__(self) -> CategoryNamespace:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> CategoryNamespace:
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (CategoryNamespace, (self._hierarchy,))
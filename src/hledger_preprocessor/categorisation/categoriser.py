@@ -7,6 +7,7 @@ from hledger_preprocessor.csv_parsing.get_asset_tnx_from_receipt import (
     get_receipt_that_contain_asset_txn,
 )
 from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.profiling.Profiler import count, profiled
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
@@ -17,6 +18,7 @@ from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
 
 # Function to classify transactions (AI and logic-based classifications)
+@profiled("classify_transactions")
 @typechecked
 def classify_transactions(
     *,
@@ -61,6 +63,7 @@ def classify_transaction(
     category_namespace: CategoryNamespace,
     parent_receipt: Optional["Receipt"] = None,
 ) -> ProcessedTransaction:
+    count("classifier_calls")
     ai_classifications: Dict[str, str] = {}
     for ai_model in ai_models_tnx_classification:
         # AI-based classification (replace `ai_model.predict` with your actual model logic)
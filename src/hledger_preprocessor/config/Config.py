@@ -1,5 +1,5 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
 from typeguard import typechecked
@@ -17,7 +17,9 @@ from hledger_preprocessor.config.CategorisationConfig import (
 )
 from hledger_preprocessor.config.DirPathsConfig import DirPathsConfig
 from hledger_preprocessor.config.Filenames import FileNames
+from hledger_preprocessor.config.LabelStoreConfig import LabelStoreConfig
 from hledger_preprocessor.config.MatchingAlgoConfig import MatchingAlgoConfig
+from hledger_preprocessor.config.ReceiptAiConfig import ReceiptAiConfig
 from hledger_preprocessor.config.ReceiptImgConfig import ReceiptImgConfig
 from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.TransactionObjects.Account import Account
@@ -31,6 +33,8 @@ class Config:
     categorisation: CategorisationConfig
     csv_encoding: str
     matching_algo: MatchingAlgoConfig
+    label_store: LabelStoreConfig = field(default_factory=LabelStoreConfig)
+    receipt_ai: ReceiptAiConfig = field(default_factory=ReceiptAiConfig)
 
     def __post_init__(self):
         self.category_namespace: CategoryNamespace = load_categories_from_yaml(
@@ -100,6 +104,9 @@ class Config:
             ],
         )
 
+        label_store = LabelStoreConfig(**config_dict.get("label_store", {}))
+        receipt_ai = ReceiptAiConfig(**config_dict.get("receipt_ai", {}))
+
         # Updated FileNames instantiation to include receipt_img
         abs_start_journal = os.path.join(
             config_dict["dir_paths"]["root_finance_path"],
@@ -134,6 +141,8 @@ class Config:
             categorisation=categorisation,
             csv_encoding=config_dict.get("csv_encoding", "utf-8"),
             matching_algo=matching_algo,
+            label_store=label_store,
+            receipt_ai=receipt_ai,
         )
 
         # NEW: Export ABS_ASSET_PATH immediately after config creation
@@ -0,0 +1,56 @@
+import os
+from dataclasses import dataclass
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.DirPathsConfig import DirPathsConfig
+
+LABEL_STORE_BACKENDS = ["json", "sqlite"]
+LABEL_LOAD_EXECUTORS = ["thread", "process"]
+
+
+@dataclass
+class LabelStoreConfig:
+    """Where the receipt labels are loaded from. The json backend walks the
+    receipt_labels_dir, the sqlite backend loads the labels from a database
+    that mirrors it."""
+
+    backend: str = "json"
+    sqlite_filename: str = "receipt_labels.sqlite"  # RELATIVE to working_subdir
+    # The json label files are read and parsed by this many workers, 1 reads
+    # them one at a time.
+    load_workers: int = 8
+    load_executor: str = "thread"  # thread, or process for very large labels
+    # Keep the decoded receipts in a snapshot in the working_subdir, such that
+    # only added or changed json labels are decoded on the next run.
+    snapshot: bool = True
+
+    def __post_init__(self):
+        if self.backend not in LABEL_STORE_BACKENDS:
+            raise ValueError(
+                f"label_store.backend must be one of {LABEL_STORE_BACKENDS},"
+                f" got:{self.backend}"
+            )
+        if not isinstance(self.load_workers, int) or self.load_workers < 1:
+            raise ValueError(
+                "label_store.load_workers must be a positive integer,"
+                f" got:{self.load_workers}"
+            )
+        if self.load_executor not in LABEL_LOAD_EXECUTORS:
+            raise ValueError(
+                "label_store.load_executor must be one of"
+                f" {LABEL_LOAD_EXECUTORS}, got:{self.load_executor}"
+            )
+
+    def uses_sqlite(self) -> bool:
+        return self.backend == "sqlite"
+
+    @typechecked
+    def get_sqlite_filepath(self, *, dir_paths: DirPathsConfig) -> str:
+        return os.path.abspath(
+            os.path.join(
+                dir_paths.root_finance_path,
+                dir_paths.working_subdir,
+                self.sqlite_filename,
+            )
+        )
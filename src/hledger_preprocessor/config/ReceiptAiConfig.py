@@ -0,0 +1,53 @@
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.DirPathsConfig import DirPathsConfig
+
+RECEIPT_AI_BACKENDS = ["torch", "quantized", "onnx"]
+
+
+@dataclass(frozen=True)
+class ReceiptAiConfig:
+    """How the Donut model that parses the receipt images is run. The torch
+    backend runs the model as published, the quantized backend runs its
+    linear layers in int8 on the CPU, and the onnx backend runs an ONNX
+    export of the model with ONNX Runtime."""
+
+    backend: str = "torch"
+    # Local dir with the model (and processor) files, RELATIVE to
+    # root_finance_path or absolute. Required for the onnx backend, which
+    # loads the export that optimum-cli wrote to it. Without it, the other
+    # backends download the model from the Hugging Face hub.
+    model_dir: Optional[str] = None
+    # Decode with a single beam instead of two: faster, but can parse some
+    # receipts less accurately.
+    greedy: bool = False
+
+    def __post_init__(self):
+        if self.backend not in RECEIPT_AI_BACKENDS:
+            raise ValueError(
+                f"receipt_ai.backend must be one of {RECEIPT_AI_BACKENDS},"
+                f" got:{self.backend}"
+            )
+        if self.backend == "onnx" and not self.model_dir:
+            raise ValueError(
+                "receipt_ai.model_dir must point to the ONNX export of the"
+                " model for the onnx backend."
+            )
+
+    @typechecked
+    def get_model_dir(self, *, dir_paths: DirPathsConfig) -> Optional[str]:
+        if self.model_dir is None:
+            return None
+        return os.path.abspath(
+            os.path.join(dir_paths.root_finance_path, self.model_dir)
+        )
+
+    @typechecked
+    def get_resolved(self, *, dir_paths: DirPathsConfig) -> "ReceiptAiConfig":
+        """Returns the config with its model_dir made absolute, such that it
+        identifies the model independent of the root_finance_path."""
+        return replace(self, model_dir=self.get_model_dir(dir_paths=dir_paths))
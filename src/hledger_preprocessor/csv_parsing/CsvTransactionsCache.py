@@ -0,0 +1,108 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.AccountConfig import AccountConfig
+from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.generics.TransactionBatch import TransactionBatch
+
+# (st_mtime_ns, st_size) of a file.
+FileFingerprint = Tuple[int, int]
+
+
+@dataclass
+class CsvTransactionsCache:
+    """Keeps the parsed transactions of bank csvs in memory for long running
+    processes. An entry is dropped as soon as the size or modification time of
+    its csv file changes. The bank csv transactions are kept as columnar
+    batches, which take a fraction of the memory of the transactions."""
+
+    entries: Dict[
+        Tuple[str, AccountConfig],
+        Tuple[
+            FileFingerprint,
+            Dict[int, Union[TransactionBatch, List[Transaction]]],
+        ],
+    ] = field(default_factory=dict)
+
+    @typechecked
+    def get(
+        self, *, input_csv_filepath: str, account_config: AccountConfig
+    ) -> Optional[Dict[int, List[Transaction]]]:
+        key = (os.path.abspath(input_csv_filepath), account_config)
+        if key not in self.entries:
+            return None
+        fingerprint, transactions_per_year = self.entries[key]
+        if fingerprint != get_file_fingerprint(filepath=input_csv_filepath):
+            self.entries.pop(key)
+            return None
+        # Return new lists such that callers can not modify the cached ones.
+        return {
+            year: (
+                transactions.to_transactions()
+                if isinstance(transactions, TransactionBatch)
+                else list(transactions)
+            )
+            for year, transactions in transactions_per_year.items()
+        }
+
+    @typechecked
+    def put(
+        self,
+        *,
+        input_csv_filepath: str,
+        account_config: AccountConfig,
+        transactions_per_year: Dict[int, List[Transaction]],
+    ) -> None:
+        self.entries[(os.path.abspath(input_csv_filepath), account_config)] = (
+            get_file_fingerprint(filepath=input_csv_filepath),
+            {
+                year: (
+                    TransactionBatch.from_transactions(
+                        transactions=transactions
+                    )
+                    if transactions
+                    and TransactionBatch.can_store(transactions=transactions)
+                    else list(transactions)
+                )
+                for year, transactions in transactions_per_year.items()
+            },
+        )
+
+
+@typechecked
+def get_file_fingerprint(*, filepath: str) -> FileFingerprint:
+    stat_result = os.stat(filepath)
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+@typechecked
+def get_file_fingerprints(
+    *, filepaths: List[str]
+) -> Dict[str, FileFingerprint]:
+    """Returns the fingerprint per file, without checking the types per file
+    as get_file_fingerprint does."""
+    fingerprints: Dict[str, FileFingerprint] = {}
+    for filepath in filepaths:
+        stat_result = os.stat(filepath)
+        fingerprints[filepath] = (stat_result.st_mtime_ns, stat_result.st_size)
+    return fingerprints
+
+
+# Only set by long running processes (the daemon), None for one-off CLI calls.
+_active_csv_transactions_cache: Optional[CsvTransactionsCache] = None
+
+
+@typechecked
+def set_csv_transactions_cache(
+    *, csv_transactions_cache: Optional[CsvTransactionsCache]
+) -> None:
+    global _active_csv_transactions_cache
+    _active_csv_transactions_cache = csv_transactions_cache
+
+
+@typechecked
+def get_csv_transactions_cache() -> Optional[CsvTransactionsCache]:
+    return _active_csv_transactions_cache
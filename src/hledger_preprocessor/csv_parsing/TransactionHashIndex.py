@@ -0,0 +1,209 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+    get_file_fingerprint,
+)
+from hledger_preprocessor.generics.Transaction import Transaction
+
+TRANSACTION_HASH_INDEX_FILENAME: str = ".hledger_preprocessor_hash_index.json"
+TRANSACTION_HASH_INDEX_VERSION: int = 1
+
+
+@dataclass(frozen=True)
+class TransactionLocation:
+    """The row of a bank csv that a transaction was parsed from."""
+
+    account: str
+    csv_filepath: str
+    # The detected encoding of the csv, to skip detecting it on a lookup.
+    encoding: str
+    row_index: int
+
+
+@dataclass
+class TransactionHashIndex:
+    """Maps the hashes of the bank csv transactions to the csv row they were
+    parsed from, such that a single transaction can be re-read without
+    parsing all csvs. The (st_mtime_ns, st_size) of each indexed csv is
+    stored, and a hash with a location in a changed csv is not returned.
+    A loaded index is kept in memory until its file changes."""
+
+    index_filepath: str
+    fingerprints: Dict[str, List[int]] = field(default_factory=dict)
+    locations_per_hash: Dict[str, List[TransactionLocation]] = field(
+        default_factory=dict
+    )
+
+    @staticmethod
+    @typechecked
+    def load(*, config: Config) -> "TransactionHashIndex":
+        """Loads the index from the working dir, or starts an empty one. The
+        file is only parsed again if it changed since it was last loaded."""
+        index_filepath: str = os.path.join(
+            config.get_working_subdir_path(assert_exists=False),
+            TRANSACTION_HASH_INDEX_FILENAME,
+        )
+        transaction_hash_index = TransactionHashIndex(
+            index_filepath=index_filepath
+        )
+        if os.path.isfile(index_filepath):
+            fingerprint: FileFingerprint = get_file_fingerprint(
+                filepath=index_filepath
+            )
+            loaded = _loaded_transaction_hash_indices.get(index_filepath)
+            if loaded is not None and loaded[0] == fingerprint:
+                return loaded[1]
+            with open(index_filepath, encoding="utf-8") as f:
+                content = json.load(f)
+            # An index of another version is rebuilt as the csvs are parsed.
+            if content.get("version") == TRANSACTION_HASH_INDEX_VERSION:
+                transaction_hash_index.fingerprints = content["fingerprints"]
+                transaction_hash_index.locations_per_hash = {
+                    some_hash: [
+                        TransactionLocation(**location)
+                        for location in locations
+                    ]
+                    for some_hash, locations in content["hashes"].items()
+                }
+            _loaded_transaction_hash_indices[index_filepath] = (
+                fingerprint,
+                transaction_hash_index,
+            )
+        return transaction_hash_index
+
+    @typechecked
+    def is_up_to_date(self, *, csv_filepath: str) -> bool:
+        return os.path.isfile(csv_filepath) and self.fingerprints.get(
+            csv_filepath
+        ) == list(get_file_fingerprint(filepath=csv_filepath))
+
+    @typechecked
+    def record_csv(
+        self,
+        *,
+        account: str,
+        csv_filepath: str,
+        encoding: str,
+        first_row_index: int,
+        transactions: List[Transaction],
+    ) -> None:
+        """Replaces the locations of a csv by those of its freshly parsed
+        transactions, which were parsed from consecutive rows."""
+        csv_filepath = os.path.abspath(csv_filepath)
+        for some_hash in list(self.locations_per_hash):
+            remaining_locations: List[TransactionLocation] = [
+                location
+                for location in self.locations_per_hash[some_hash]
+                if location.csv_filepath != csv_filepath
+            ]
+            if remaining_locations:
+                self.locations_per_hash[some_hash] = remaining_locations
+            else:
+                self.locations_per_hash.pop(some_hash)
+        for offset, transaction in enumerate(transactions):
+            self.locations_per_hash.setdefault(
+                str(transaction.get_hash()), []
+            ).append(
+                TransactionLocation(
+                    account=account,
+                    csv_filepath=csv_filepath,
+                    encoding=encoding,
+                    row_index=first_row_index + offset,
+                )
+            )
+        self.fingerprints[csv_filepath] = list(
+            get_file_fingerprint(filepath=csv_filepath)
+        )
+
+    @typechecked
+    def get_locations(
+        self, *, some_hash: int
+    ) -> Optional[List[TransactionLocation]]:
+        """Returns the locations of the hash, or None if it is not indexed or
+        if any of its csvs changed since, as the changed csv may have lost
+        or gained rows of the hash."""
+        locations: List[TransactionLocation] = self.locations_per_hash.get(
+            str(some_hash), []
+        )
+        if not locations or not all(
+            self.is_up_to_date(csv_filepath=location.csv_filepath)
+            for location in locations
+        ):
+            return None
+        return locations
+
+    @typechecked
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.index_filepath), exist_ok=True)
+        tmp_filepath: str = f"{self.index_filepath}.tmp"
+        locations_per_hash = self.locations_per_hash.items()
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": TRANSACTION_HASH_INDEX_VERSION,
+                    "fingerprints": self.fingerprints,
+                    "hashes": {
+                        some_hash: [location.__dict__ for location in locations]
+                        for some_hash, locations in locations_per_hash
+                    },
+                },
+                f,
+                sort_keys=True,
+            )
+        os.replace(tmp_filepath, self.index_filepath)
+        _loaded_transaction_hash_indices[self.index_filepath] = (
+            get_file_fingerprint(filepath=self.index_filepath),
+            self,
+        )
+
+
+# The loaded indices with the fingerprint of their file, such that the index
+# is not parsed again for every lookup and every parsed csv.
+_loaded_transaction_hash_indices: Dict[
+    str, Tuple[FileFingerprint, TransactionHashIndex]
+] = {}
+
+
+@typechecked
+def index_csv_transactions(
+    *,
+    config: Config,
+    account: str,
+    csv_filepath: str,
+    encoding: str,
+    first_row_index: int,
+    transactions: List[Transaction],
+) -> None:
+    """Stores the locations of the freshly parsed bank csv transactions,
+    unless the csv was already indexed in its current state."""
+    transaction_hash_index = TransactionHashIndex.load(config=config)
+    if transaction_hash_index.is_up_to_date(
+        csv_filepath=os.path.abspath(csv_filepath)
+    ):
+        return
+    transaction_hash_index.record_csv(
+        account=account,
+        csv_filepath=csv_filepath,
+        encoding=encoding,
+        first_row_index=first_row_index,
+        transactions=transactions,
+    )
+    transaction_hash_index.save()
+
+
+@typechecked
+def get_indexed_locations(
+    *, config: Config, some_hash: int
+) -> Optional[List[TransactionLocation]]:
+    """Returns the indexed locations of the hash, or None if the hash is not
+    in the index (or in a csv that changed since it was indexed)."""
+    return TransactionHashIndex.load(config=config).get_locations(
+        some_hash=some_hash
+    )
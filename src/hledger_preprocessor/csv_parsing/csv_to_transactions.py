@@ -1,5 +1,5 @@
 import csv
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from typeguard import typechecked
 
@@ -8,9 +8,16 @@ from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.csv_parsing.csv_has_header import (
     has_header0,
 )
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    CsvTransactionsCache,
+    get_csv_transactions_cache,
+)
 from hledger_preprocessor.csv_parsing.read_csv_asset_transactions import (
     read_csv_to_asset_transactions,
 )
+from hledger_preprocessor.csv_parsing.TransactionHashIndex import (
+    index_csv_transactions,
+)
 from hledger_preprocessor.file_reading_and_writing import (
     assert_file_exists,
     convert_input_csv_encoding,
@@ -23,6 +30,7 @@ from hledger_preprocessor.generics.parse_generic_tnx_with_csv import (
     parse_generic_bank_transaction,
 )
 from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.profiling.Profiler import count, profiled
 from hledger_preprocessor.TransactionObjects.ProcessedTransaction import (
     ProcessedTransaction,
 )
@@ -52,6 +60,7 @@ def load_csv_transactions_from_file_per_year(
     #     return {}
 
 
+@profiled("csv_to_transactions")
 @typechecked
 def csv_to_transactions(
     *,
@@ -77,6 +86,22 @@ def csv_to_transactions(
     # if os.path.isfile(input_csv_filepath):
     assert_file_exists(filepath=input_csv_filepath)
 
+    # Asset csvs depend on the labelled receipts, so only bank csvs are cached.
+    csv_transactions_cache: Optional[CsvTransactionsCache] = (
+        get_csv_transactions_cache() if account_config.has_input_csv() else None
+    )
+    if csv_transactions_cache is not None:
+        cached_transactions_per_year: Optional[Dict[int, List[Transaction]]] = (
+            csv_transactions_cache.get(
+                input_csv_filepath=input_csv_filepath,
+                account_config=account_config,
+            )
+        )
+        if cached_transactions_per_year is not None:
+            count("csv_cache_hits")
+            return cached_transactions_per_year
+        count("csv_cache_misses")
+
     convert_input_csv_encoding(
         input_csv_filepath=input_csv_filepath, output_encoding=csv_encoding
     )
@@ -92,6 +117,12 @@ def csv_to_transactions(
         sort_transactions_on_years(transactions=total_transactions)
     )
 
+    if csv_transactions_cache is not None:
+        csv_transactions_cache.put(
+            input_csv_filepath=input_csv_filepath,
+            account_config=account_config,
+            transactions_per_year=transactions_per_year,
+        )
     return transactions_per_year
     # else:
     #     return {}
@@ -125,6 +156,7 @@ def parse_encoded_input_csv(
     ) as infile:
         reader = csv.reader(infile)
         rows = list(reader)
+    count("csv_rows_parsed", len(rows))
 
     transactions: List[Transaction] = process_transactions(
         config=config,
@@ -134,6 +166,16 @@ def parse_encoded_input_csv(
         account_config=account_config,
     )
 
+    if account_config.has_input_csv():
+        # The bank transactions are parsed from the last consecutive rows.
+        index_csv_transactions(
+            config=config,
+            account=account_config.account.to_string(),
+            csv_filepath=input_csv_filepath,
+            encoding=updated_encoding,
+            first_row_index=len(rows) - len(transactions),
+            transactions=transactions,
+        )
     return transactions
 
 
@@ -19,6 +19,7 @@ from hledger_preprocessor.generics.GenericTransactionWithCsv import (
     GenericCsvTransaction,
 )
 from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.profiling.Profiler import profiled
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
@@ -57,6 +58,7 @@ def assert_uniform_tnx_types(
         )
 
 
+@profiled("write_processed_csv")
 @typechecked
 def write_processed_csv(
     *,
@@ -10,7 +10,10 @@ from hledger_preprocessor.config.load_receipt_from_img_filepath import (
 )
 from hledger_preprocessor.csv_parsing.helper import read_date
 from hledger_preprocessor.Currency import Currency
-from hledger_preprocessor.TransactionObjects.Account import Account
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
@@ -93,11 +96,13 @@ def read_csv_to_asset_transactions(
             currency = Currency(row["currency"])
 
             # Handle optional fields
-            asset_account: Account = Account(
-                base_currency=currency,
-                account_holder=row["account_holder"],
-                bank=row["bank"],
-                account_type=row["account_type"],
+            asset_account: Account = intern_account(
+                account=Account(
+                    base_currency=currency,
+                    account_holder=row["account_holder"],
+                    bank=row["bank"],
+                    account_type=row["account_type"],
+                )
             )
 
             tenderded_amount_out: float
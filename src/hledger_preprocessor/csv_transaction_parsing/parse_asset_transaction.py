@@ -7,7 +7,10 @@ from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.date_extractor import (
     get_date_from_bank_date_or_shop_date_description,
 )
-from hledger_preprocessor.TransactionObjects.Account import Account
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
@@ -46,14 +49,13 @@ def parse_asset_transaction(
             shop_account_nr=other_party_dict.get("shop_account_nr"),
         )
 
-        asset_account = Account(
-            base_currency=Currency(currency),
-            # asset_type=asset_account_dict["asset_type"],
-            # asset_type=AssetType.ASSET,
-            account_holder=account_holder,
-            bank=bank,
-            account_type=account_type,
-            # asset_category=asset_account_dict["asset_category"],
+        asset_account = intern_account(
+            account=Account(
+                base_currency=Currency(currency),
+                account_holder=account_holder,
+                bank=bank,
+                account_type=account_type,
+            )
         )
 
         # Parse amount as float
@@ -0,0 +1,77 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+    get_file_fingerprint,
+)
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    load_receipts_from_dir,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+
+@dataclass
+class DaemonState:
+    """The config and labelled receipts that the daemon keeps in memory for
+    one (config.yaml, pre_processed_output_dir) combination."""
+
+    config_path: str
+    pre_processed_output_dir: Optional[str]
+    config: Optional[Config] = None
+    labelled_receipts: List[Receipt] = field(default_factory=list)
+    file_fingerprints: Dict[str, FileFingerprint] = field(default_factory=dict)
+
+    @typechecked
+    def refresh(self) -> bool:
+        """(Re)loads the config and receipts if this is the first call or if
+        any of the files they are loaded from changed. Returns True if the
+        state was reloaded."""
+        if self.config is not None and (
+            self.file_fingerprints
+            == get_watched_file_fingerprints(
+                config=self.config, config_path=self.config_path
+            )
+        ):
+            return False
+
+        self.config = load_config(
+            config_path=self.config_path,
+            pre_processed_output_dir=self.pre_processed_output_dir,
+        )
+        self.labelled_receipts = load_receipts_from_dir(config=self.config)
+        self.file_fingerprints = get_watched_file_fingerprints(
+            config=self.config, config_path=self.config_path
+        )
+        return True
+
+
+@typechecked
+def get_watched_file_fingerprints(
+    *, config: Config, config_path: str
+) -> Dict[str, FileFingerprint]:
+    """Returns the (mtime, size) of config.yaml, categories.yaml and all files
+    in the receipt label and receipt image input directories."""
+    watched_filepaths: List[str] = [
+        config_path,
+        config.file_names.get_filepath(
+            dir_path_config=config.dir_paths,
+            filename="categories_filename",
+        ),
+    ]
+    for dir_name in ["receipt_labels_dir", "receipt_images_input_dir"]:
+        dirpath: str = config.dir_paths.get_path(dir_name, absolute=True)
+        for root, _, filenames in os.walk(dirpath):
+            for filename in filenames:
+                watched_filepaths.append(os.path.join(root, filename))
+
+    return {
+        filepath: get_file_fingerprint(filepath=filepath)
+        for filepath in watched_filepaths
+        if os.path.isfile(filepath)
+    }
@@ -0,0 +1,77 @@
+"""Forwards CLI calls to a running hledger_preprocessor daemon."""
+
+import os
+import socket
+from argparse import Namespace
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.daemon.protocol import receive_message, send_message
+
+# Actions that run without user interaction and can thus run in the daemon.
+DAEMON_ACTIONS: List[str] = [
+    "new_setup",
+    "preprocess_csvs",
+    "preprocess_assets",
+    "generate_rules",
+]
+# Actions that need the terminal of the user, or that rewrite the receipt
+# labels the daemon keeps in memory, and thus always run locally.
+INTERACTIVE_ACTIONS: List[str] = [
+    "edit_receipt",
+    "tui_label_receipts",
+    "link_receipts_to_transactions",
+    "import_label_store",
+    "export_label_store",
+]
+
+
+@typechecked
+def can_run_in_daemon(*, args: Namespace) -> bool:
+    return any(getattr(args, action) for action in DAEMON_ACTIONS) and not any(
+        getattr(args, action) for action in INTERACTIVE_ACTIONS
+    )
+
+
+@typechecked
+def request_daemon(
+    *, socket_path: str, message: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Sends a message to the daemon and returns its response, or None if no
+    daemon is listening on the socket_path."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        connection.close()
+        return None
+    with connection:
+        send_message(connection=connection, message=message)
+        return receive_message(connection=connection)
+
+
+@typechecked
+def forward_to_daemon(*, socket_path: str, argv: List[str]) -> Optional[int]:
+    """Lets the daemon perform the CLI actions in argv and prints its output.
+    Returns the exit code, or None if the daemon is not running."""
+    response: Optional[Dict[str, Any]] = request_daemon(
+        socket_path=socket_path,
+        message={"action": "run", "argv": argv, "cwd": os.getcwd()},
+    )
+    if response is None:
+        print(
+            f"WARNING: No daemon is listening on:{socket_path}, running"
+            " locally instead."
+        )
+        return None
+    print(response["output"], end="")
+    return int(response["exit_code"])
+
+
+@typechecked
+def stop_daemon(*, socket_path: str) -> None:
+    if request_daemon(socket_path=socket_path, message={"action": "shutdown"}):
+        print(f"Stopped the daemon listening on:{socket_path}")
+    else:
+        print(f"No daemon is listening on:{socket_path}")
@@ -0,0 +1,28 @@
+"""Newline delimited JSON messages over the local (Unix) daemon socket."""
+
+import json
+import socket
+from typing import Any, Dict
+
+from typeguard import typechecked
+
+
+@typechecked
+def send_message(*, connection: socket.socket, message: Dict[str, Any]) -> None:
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+@typechecked
+def receive_message(*, connection: socket.socket) -> Dict[str, Any]:
+    chunks: list[bytes] = []
+    while True:
+        chunk: bytes = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    data: bytes = b"".join(chunks)
+    if not data:
+        raise ConnectionError("Daemon connection closed without a message.")
+    return json.loads(data.decode("utf-8"))
@@ -0,0 +1,174 @@
+"""Long running process that keeps the config, receipts, parsed bank csvs and
+models in memory and performs the non-interactive CLI actions for clients
+that connect over a Unix socket."""
+
+import io
+import os
+import socket
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.arg_parser import (
+    assert_args_are_valid,
+    create_arg_parser,
+)
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.ReceiptAiConfig import ReceiptAiConfig
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    CsvTransactionsCache,
+    set_csv_transactions_cache,
+)
+from hledger_preprocessor.daemon.DaemonState import DaemonState
+from hledger_preprocessor.daemon.protocol import receive_message, send_message
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+from hledger_preprocessor.get_models import get_models
+from hledger_preprocessor.management.run_actions import run_actions
+from hledger_preprocessor.profiling.Profiler import profile_run
+
+
+class DaemonServer:
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path: str = os.path.abspath(socket_path)
+        self.states: Dict[Tuple[str, Optional[str]], DaemonState] = {}
+        self.models: Dict[
+            Tuple[bool, ReceiptAiConfig],
+            Dict[ClassifierType, Dict[LogicType, Any]],
+        ] = {}
+
+    @typechecked
+    def get_models(
+        self, *, quick_categorisation: bool, config: Config
+    ) -> Dict[ClassifierType, Dict[LogicType, Any]]:
+        """Loads the models once per quick_categorisation and receipt_ai
+        setting, with the model_dir resolved against the finance root."""
+        key = (
+            quick_categorisation,
+            config.receipt_ai.get_resolved(dir_paths=config.dir_paths),
+        )
+        if key not in self.models:
+            self.models[key] = get_models(
+                quick_categorisation=quick_categorisation, config=config
+            )
+        return self.models[key]
+
+    @typechecked
+    def handle_run_request(
+        self, *, argv: List[str], cwd: str
+    ) -> Dict[str, Any]:
+        """Performs the CLI actions in argv as if they were called from cwd and
+        returns their printed output and exit code."""
+        output = io.StringIO()
+        exit_code: int = 0
+        original_cwd: str = os.getcwd()
+        try:
+            with redirect_stdout(output), redirect_stderr(output):
+                os.chdir(cwd)
+                args = create_arg_parser().parse_args(argv)
+                assert_args_are_valid(args=args)
+                config_path: str = os.path.abspath(args.config)
+                key = (config_path, args.pre_processed_output_dir)
+                if key not in self.states:
+                    self.states[key] = DaemonState(
+                        config_path=config_path,
+                        pre_processed_output_dir=args.pre_processed_output_dir,
+                    )
+                daemon_state: DaemonState = self.states[key]
+                with profile_run(
+                    enabled=args.profile,
+                    output_format=args.profile_format,
+                    output_filepath=args.profile_output,
+                ):
+                    if daemon_state.refresh():
+                        print(f"Daemon (re)loaded config and receipts:{key}")
+                    run_actions(
+                        args=args,
+                        config=daemon_state.config,
+                        labelled_receipts=daemon_state.labelled_receipts,
+                        models_loader=self.get_models,
+                    )
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            output.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            os.chdir(original_cwd)
+        return {"exit_code": exit_code, "output": output.getvalue()}
+
+    @typechecked
+    def handle_connection(self, *, connection: socket.socket) -> bool:
+        """Answers the request of one client. Returns True if the daemon
+        should stop. A malformed request, or a client that disconnects, is
+        answered (if possible) with an error, and does not stop the daemon."""
+        try:
+            request: Dict[str, Any] = receive_message(connection=connection)
+            if request["action"] == "shutdown":
+                send_message(
+                    connection=connection,
+                    message={"exit_code": 0, "output": ""},
+                )
+                return True
+            elif request["action"] == "run":
+                response: Dict[str, Any] = self.handle_run_request(
+                    argv=request["argv"], cwd=request["cwd"]
+                )
+            else:
+                response = {
+                    "exit_code": 1,
+                    "output": f"Unknown action:{request['action']}\n",
+                }
+        except Exception as e:
+            response = {
+                "exit_code": 1,
+                "output": f"Invalid daemon request: {type(e).__name__}: {e}\n",
+            }
+        try:
+            send_message(connection=connection, message=response)
+        except OSError:
+            pass  # The client is gone.
+        return False
+
+    @typechecked
+    def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise ValueError(
+                    f"A daemon is already listening on:{self.socket_path}"
+                )
+            except ConnectionRefusedError:
+                # Remove a socket file that was left by a crashed daemon.
+                os.remove(self.socket_path)
+            finally:
+                probe.close()
+
+        set_csv_transactions_cache(
+            csv_transactions_cache=CsvTransactionsCache()
+        )
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        print(f"hledger_preprocessor daemon listening on:{self.socket_path}")
+        try:
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    if self.handle_connection(connection=connection):
+                        break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            set_csv_transactions_cache(csv_transactions_cache=None)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            print("hledger_preprocessor daemon stopped.")
+
+
+@typechecked
+def serve(*, socket_path: str) -> None:
+    DaemonServer(socket_path=socket_path).serve_forever()
@@ -9,6 +9,7 @@ import chardet
 from typeguard import typechecked
 
 from hledger_preprocessor.generics.enums import EnumEncoder
+from hledger_preprocessor.profiling.Profiler import count
 
 
 def create_and_save_json(*, data, filepath) -> None:
@@ -106,6 +107,12 @@ def convert_input_csv_encoding(
     ) as infile:
         content = infile.read()
 
+    # Skip the rewrite if the file already has the desired encoding, such that
+    # its modification time only changes when its content changes.
+    with open(input_csv_filepath, "rb") as raw_infile:
+        if raw_infile.read() == content.encode(output_encoding):
+            return
+
     with open(
         input_csv_filepath, mode="w", encoding=output_encoding
     ) as outfile:
@@ -115,10 +122,17 @@ def convert_input_csv_encoding(
 @typechecked
 def get_image_hash(*, image_path: str) -> str:
     """Calculates the SHA256 hash of an image."""
+    return get_file_hash(filepath=image_path)
+
+
+@typechecked
+def get_file_hash(*, filepath: str) -> str:
+    """Calculates the SHA256 hash of the content of a file."""
+    count("file_hashes_computed")
     hasher = hashlib.sha256()
-    with open(image_path, "rb") as image_file:
+    with open(filepath, "rb") as some_file:
         while True:
-            chunk = image_file.read(4096)
+            chunk = some_file.read(4096)
             if not chunk:
                 break
             hasher.update(chunk)
@@ -2,16 +2,20 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from typeguard import typechecked
+from typeguard import typechecked, typeguard_ignore
 
 from hledger_preprocessor.config.CsvColumnMapping import CsvColumnMapping
-from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.generics.Transaction import (
+    Transaction,
+    get_cached_hash,
+)
+from hledger_preprocessor.profiling.Profiler import count
 from hledger_preprocessor.TransactionObjects.Account import Account
 from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
 
 
 @typechecked
-@dataclass(frozen=True, unsafe_hash=True)
+@dataclass(frozen=True, eq=False, slots=True)
 class GenericCsvTransaction(Transaction):
     # Common fields — all optional because not every bank has them
     # amount_in_account: Optional[float] = None
@@ -132,9 +136,19 @@ class GenericCsvTransaction(Transaction):
         else:
             raise ValueError("Did not create a filled hledger dict.")
 
+    @typeguard_ignore
     def get_hash(self) -> int:
+        return get_cached_hash(
+            transaction=self,
+            slot_name="_identity_hash",
+            compute_hash=self._compute_identity_hash,
+        )
+
+    def _compute_identity_hash(self) -> int:
         import hashlib
 
+        count("transaction_hashes_computed")
+
         m = hashlib.sha256()
 
         # 1. Date: canonical ISO format (always the same string)
@@ -0,0 +1,12 @@
+from datetime import date
+from typing import Dict, Protocol
+
+
+class RateFetcher(Protocol):
+    """Returns the rate_to_base of the currencies it knows on the_date, the
+    amount of the base currency that one unit of the currency is worth."""
+
+    def fetch_rates(
+        self, *, base_currency: str, the_date: date
+    ) -> Dict[str, float]: ...
+    def get_name(self) -> str: ...
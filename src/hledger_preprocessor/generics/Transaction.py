@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import TYPE_CHECKING, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Union
 
-from typeguard import typechecked
+from typeguard import typechecked, typeguard_ignore
 
+from hledger_preprocessor.profiling.Profiler import count
 from hledger_preprocessor.TransactionObjects.Account import Account
 from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
 
@@ -13,8 +14,23 @@ if TYPE_CHECKING:
 
 
 @typechecked
-@dataclass(frozen=True, unsafe_hash=True)
+@dataclass(frozen=True, eq=False)
 class Transaction(ABC):
+    """Base of the transactions. The transactions are slotted, as a finance
+    root can hold 100k+ of them in memory, and cache their hashes, as they
+    are compared in nested loops. The subclasses use eq=False to inherit the
+    __eq__ and __hash__ below."""
+
+    # Declared by hand (instead of slots=True) to add the hash cache slots.
+    __slots__ = (
+        "account",
+        "the_date",
+        "tendered_amount_out",
+        "change_returned",
+        "_base_hash",
+        "_identity_hash",
+    )
+
     account: Account
     the_date: datetime
     tendered_amount_out: float
@@ -52,10 +68,23 @@ class Transaction(ABC):
 
     # @abstractmethod
     # def get_hash(self) -> int: ...
-    @typechecked
+    # The hash methods skip the type checks, which cost more than the lookup.
+    @typeguard_ignore
     def get_hash(self) -> int:
+        """Returns the hash of the date and amounts. Subclasses override it
+        with a hash of more fields, while Transaction.get_hash(some_txn)
+        compares transactions of different types."""
+        return get_cached_hash(
+            transaction=self,
+            slot_name="_base_hash",
+            compute_hash=self._compute_base_hash,
+        )
+
+    def _compute_base_hash(self) -> int:
         import hashlib
 
+        count("transaction_hashes_computed")
+
         m = hashlib.sha256()
 
         # Canonical date format (ISO)
@@ -67,10 +96,22 @@ class Transaction(ABC):
 
         return int(m.hexdigest()[:16], 16)
 
+    @typeguard_ignore
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Transaction):
+        """Equal if all fields are equal, like the dataclass __eq__, but the
+        cached hashes reject most unequal transactions without comparing
+        their fields."""
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self.get_hash() != other.get_hash():
             return False
-        return self.get_hash() == other.get_hash()
+        return get_compared_values(transaction=self) == get_compared_values(
+            transaction=other
+        )
+
+    @typeguard_ignore
+    def __hash__(self) -> int:
+        return hash(self.get_hash())
 
     @abstractmethod
     def to_dict_without_classification(self) -> Dict: ...
@@ -89,3 +130,22 @@ class Transaction(ABC):
 
     def get_year(self) -> int:
         return self.the_date.year
+
+
+def get_cached_hash(
+    *, transaction: Transaction, slot_name: str, compute_hash: Callable[[], Any]
+) -> Any:
+    """Returns the hash stored in the slot_name slot, and computes it on first
+    use. The hashed fields of a transaction are never changed."""
+    try:
+        return getattr(transaction, slot_name)
+    except AttributeError:
+        hash_value = compute_hash()
+        object.__setattr__(transaction, slot_name, hash_value)
+        return hash_value
+
+
+def get_compared_values(*, transaction: Transaction) -> Tuple[Any, ...]:
+    return tuple(
+        getattr(transaction, f.name) for f in fields(transaction) if f.compare
+    )
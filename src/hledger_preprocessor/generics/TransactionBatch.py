@@ -0,0 +1,159 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from math import isnan
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.generics.GenericTransactionWithCsv import (
+    GenericCsvTransaction,
+)
+from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.TransactionObjects.Account import Account
+from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+_MICROSECOND: timedelta = timedelta(microseconds=1)
+
+
+@dataclass
+class TransactionBatch:
+    """Stores the csv transactions of a single account column by column: the
+    dates and amounts as packed arrays, and the (often repeated) strings
+    interned. The transactions are only created when they are read, and an
+    index sorted by date makes date-range queries a binary search."""
+
+    account: Account
+    # Microseconds since 1970-01-01 of the (timezone-naive) dates.
+    timestamps: array
+    tendered_amounts_out: array
+    changes_returned: array
+    # NaN where the balance_after is None.
+    balances_after: array
+    descriptions: List[Optional[str]]
+    other_party_names: List[Optional[str]]
+    other_party_account_names: List[Optional[str]]
+    transaction_codes: List[Optional[TransactionCode]]
+    bics: List[Optional[str]]
+    # None where the transaction has no original_transaction or extra fields.
+    original_transactions: List[Optional[GenericCsvTransaction]]
+    extras: List[Optional[Dict[str, Any]]]
+    # The row indices, sorted by date.
+    date_order: array
+
+    @staticmethod
+    @typechecked
+    def can_store(*, transactions: List[Transaction]) -> bool:
+        """Returns True if the transactions are csv transactions of a single
+        account."""
+        return all(
+            type(transaction) is GenericCsvTransaction
+            and transaction.account == transactions[0].account
+            for transaction in transactions
+        )
+
+    @staticmethod
+    @typechecked
+    def from_transactions(
+        *, transactions: List[Transaction]
+    ) -> "TransactionBatch":
+        if not transactions or not TransactionBatch.can_store(
+            transactions=transactions
+        ):
+            raise ValueError(
+                "A TransactionBatch stores one or more GenericCsvTransactions"
+                " of a single account."
+            )
+        return TransactionBatch(
+            account=transactions[0].account,
+            timestamps=array(
+                "q",
+                ((t.the_date - _EPOCH) // _MICROSECOND for t in transactions),
+            ),
+            tendered_amounts_out=array(
+                "d", (t.tendered_amount_out for t in transactions)
+            ),
+            changes_returned=array(
+                "d", (t.change_returned for t in transactions)
+            ),
+            balances_after=array(
+                "d",
+                (
+                    float("nan") if t.balance_after is None else t.balance_after
+                    for t in transactions
+                ),
+            ),
+            descriptions=[_intern(value=t.description) for t in transactions],
+            other_party_names=[
+                _intern(value=t.other_party_name) for t in transactions
+            ],
+            other_party_account_names=[
+                _intern(value=t.other_party_account_name) for t in transactions
+            ],
+            transaction_codes=[t.transaction_code for t in transactions],
+            bics=[_intern(value=t.bic) for t in transactions],
+            original_transactions=[
+                t.original_transaction for t in transactions
+            ],
+            extras=[t.extra or None for t in transactions],
+            date_order=array(
+                "q",
+                sorted(
+                    range(len(transactions)),
+                    key=lambda i: transactions[i].the_date,
+                ),
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @typechecked
+    def get_transaction(self, *, index: int) -> GenericCsvTransaction:
+        balance_after: float = self.balances_after[index]
+        return GenericCsvTransaction(
+            account=self.account,
+            the_date=_EPOCH + self.timestamps[index] * _MICROSECOND,
+            tendered_amount_out=self.tendered_amounts_out[index],
+            change_returned=self.changes_returned[index],
+            balance_after=None if isnan(balance_after) else balance_after,
+            description=self.descriptions[index],
+            other_party_name=self.other_party_names[index],
+            other_party_account_name=self.other_party_account_names[index],
+            transaction_code=self.transaction_codes[index],
+            bic=self.bics[index],
+            original_transaction=self.original_transactions[index],
+            extra=dict(self.extras[index] or {}),
+        )
+
+    @typechecked
+    def to_transactions(self) -> List[GenericCsvTransaction]:
+        return [self.get_transaction(index=i) for i in range(len(self))]
+
+    @typechecked
+    def get_transactions_in_date_range(
+        self, *, start_date: datetime, end_date: datetime
+    ) -> List[GenericCsvTransaction]:
+        """Returns the transactions within [start_date, end_date], without
+        creating the transactions outside it."""
+        first: int = bisect_left(
+            self.date_order,
+            (start_date - _EPOCH) // _MICROSECOND,
+            key=self.timestamps.__getitem__,
+        )
+        last: int = bisect_right(
+            self.date_order,
+            (end_date - _EPOCH) // _MICROSECOND,
+            key=self.timestamps.__getitem__,
+        )
+        return [
+            self.get_transaction(index=self.date_order[i])
+            for i in range(first, last)
+        ]
+
+
+def _intern(*, value: Optional[str]) -> Optional[str]:
+    return None if value is None else sys.intern(value)
@@ -1,7 +1,8 @@
 import hashlib
+from dataclasses import fields, is_dataclass
 from datetime import datetime
 from enum import Enum, EnumMeta
-from typing import Any
+from typing import Any, Dict
 
 import numpy as np
 
@@ -13,8 +14,10 @@ def hash_something(*, something: Any) -> str:
     # Serialize the object's attributes (sorted to ensure consistency)
     if isinstance(something, str):
         serialized = serialize(obj=something)
-    else:
+    elif hasattr(something, "__dict__"):
         serialized = serialize(obj=something.__dict__)
+    else:
+        serialized = serialize(obj=get_field_values(obj=something))
 
     # Update the hasher with the serialized bytes
     hasher.update(serialized)
@@ -23,6 +26,12 @@ def hash_something(*, something: Any) -> str:
     return hasher.hexdigest()
 
 
+def get_field_values(*, obj: Any) -> Dict[str, Any]:
+    """Returns the fields of a dataclass, which (if slotted) has no
+    __dict__."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
 # TODO: reduce duplication.
 def serialize(*, obj: Any) -> bytes:
     """Recursively serialize object attributes to a consistent byte string."""
@@ -47,6 +56,8 @@ def serialize(*, obj: Any) -> bytes:
         return obj.isoformat().encode("utf-8")  # Convert to ISO 8601 string
     elif hasattr(obj, "__dict__"):
         return serialize(obj=obj.__dict__)
+    elif is_dataclass(obj):  # Slotted dataclasses have no __dict__.
+        return serialize(obj=get_field_values(obj=obj))
     elif obj is None:
         return b"null"
     elif isinstance(obj, np.ndarray):
@@ -1,6 +1,6 @@
 """Parses the CLI args."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from typeguard import typechecked
 
@@ -8,6 +8,8 @@ from hledger_preprocessor.categorisation.ai_based.ai_eg0 import ExampleAIModel
 from hledger_preprocessor.categorisation.rule_based.rule_based_eg0 import (
     ExampleRuleBasedModel,
 )
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.ReceiptAiConfig import ReceiptAiConfig
 from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.generics.ReceiptCategoryModel import (
     ReceiptCategoryModel,
@@ -22,8 +24,10 @@ from hledger_preprocessor.receipts_to_objects.ai_based.donut import DonutAI
 
 
 def get_models(
-    *, quick_categorisation: bool
+    *, quick_categorisation: bool, config: Optional[Config] = None
 ) -> Dict[ClassifierType, Dict[LogicType, Any]]:
+    """Returns the models, with the receipt image model set up as in the
+    receipt_ai section of the config (or the defaults without a config)."""
 
     if quick_categorisation:
         classifiers: Dict[ClassifierType, Dict[LogicType, Any]] = {
@@ -38,7 +42,7 @@ def get_models(
                 get_transaction_classification_models()
             ),
             ClassifierType.RECEIPT_IMAGE_TO_OBJ: (
-                get_receipt_image_to_obj_models()
+                get_receipt_image_to_obj_models(config=config)
             ),
             ClassifierType.RECEIPT_IMG_CATEGORY: (
                 get_receipt_img_classification_models()
@@ -65,10 +69,21 @@ def get_transaction_classification_models() -> (
     }
 
 
-def get_receipt_image_to_obj_models() -> (
-    Dict[str, List[ReceiptImageToObjModel]]
-):
-    ai_img_to_receipt_obj: ReceiptImageToObjModel = DonutAI()
+def get_receipt_image_to_obj_models(
+    *, config: Optional[Config] = None
+) -> Dict[str, List[ReceiptImageToObjModel]]:
+    receipt_ai: ReceiptAiConfig = (
+        ReceiptAiConfig() if config is None else config.receipt_ai
+    )
+    ai_img_to_receipt_obj: ReceiptImageToObjModel = DonutAI(
+        greedy=receipt_ai.greedy,
+        backend=receipt_ai.backend,
+        model_dir=(
+            None
+            if config is None
+            else receipt_ai.get_model_dir(dir_paths=config.dir_paths)
+        ),
+    )
     return {
         LogicType.AI: [ai_img_to_receipt_obj],
     }
@@ -3,9 +3,9 @@
 import os
 from typing import List
 
-from PIL import Image  # For image format checking
 from typeguard import typechecked
 
+from hledger_preprocessor.image_access import is_image_file
 from hledger_preprocessor.TransactionObjects.Account import Account
 
 
@@ -61,13 +61,9 @@ def get_images_in_folder(*, folder_path: str) -> List[str]:
 
         if os.path.isfile(file_path):  # check if it is a file
             try:
-                # Use PIL to check if it's a valid image (more robust)
-                img = Image.open(file_path)
-                img.verify()  # Check file integrity
-                image_paths.append(file_path)
-                img.close()  # Close the image file after verification
-            except (OSError, SyntaxError):  # Handle non-image files gracefully
-                pass  # Or you could print a message: print(f"Skipping non-image file: {filename}")
+                # Check the image header and integrity, without decoding it.
+                if is_image_file(filepath=file_path):
+                    image_paths.append(file_path)
             except (
                 Exception
             ) as e:  # Catch any other potential errors during file processing
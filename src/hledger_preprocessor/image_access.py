@@ -0,0 +1,99 @@
+"""Opens the receipt images either at full resolution, to edit and save them,
+or as a preview that is only large enough to look at or analyse.
+
+A preview of a JPEG is decoded at the smallest of its 1/2, 1/4 or 1/8 DCT
+scales that is still larger than the preview, which takes a fraction of the
+time and memory of a full decode. If a thumbnail cache dir is set, the
+previews are also stored there by image hash and size, such that an image
+that is looked at again (or moved) is not decoded again."""
+
+import os
+from typing import Optional
+
+from PIL import Image
+from typeguard import typechecked
+
+from hledger_preprocessor.file_reading_and_writing import get_image_hash
+from hledger_preprocessor.profiling.Profiler import count
+
+THUMBNAIL_CACHE_DIRNAME: str = ".thumbnails"
+# The previews fit in a square of this size, which fills a 1280x720 window
+# also after a quarter turn.
+PREVIEW_SIZE: int = 1280
+
+# Set by the interactive flows, to reuse the previews in between images and
+# runs.
+_thumbnail_cache_dir: Optional[str] = None
+
+
+@typechecked
+def set_thumbnail_cache_dir(*, cache_dir: Optional[str]) -> None:
+    global _thumbnail_cache_dir
+    _thumbnail_cache_dir = cache_dir
+
+
+@typechecked
+def get_thumbnail_cache_dir() -> Optional[str]:
+    return _thumbnail_cache_dir
+
+
+@typechecked
+def is_image_file(*, filepath: str) -> bool:
+    """Returns True if the file is an image, by reading its header and
+    checking its structure, without decoding its pixels."""
+    try:
+        with Image.open(filepath) as image:
+            image.verify()
+        return True
+    except (OSError, SyntaxError):
+        return False
+
+
+@typechecked
+def open_full_image(*, image_path: str) -> Image.Image:
+    """Returns the decoded image at full resolution."""
+    with Image.open(image_path) as image:
+        image.load()
+        count("images_decoded_full")
+        return image.copy()
+
+
+def _decode_preview(*, image_path: str, max_size: int) -> Image.Image:
+    with Image.open(image_path) as image:
+        image.draft("RGB", (max_size, max_size))
+        preview: Image.Image = image.convert("RGB")
+    preview.thumbnail((max_size, max_size))
+    count("images_decoded_preview")
+    return preview
+
+
+@typechecked
+def open_preview_image(
+    *, image_path: str, max_size: int = PREVIEW_SIZE
+) -> Image.Image:
+    """Returns an RGB copy of the image that fits in a max_size square, from
+    the thumbnail cache if it has one."""
+    cache_dir: Optional[str] = get_thumbnail_cache_dir()
+    if cache_dir is None:
+        return _decode_preview(image_path=image_path, max_size=max_size)
+
+    thumbnail_path: str = os.path.join(
+        cache_dir, f"{get_image_hash(image_path=image_path)}_{max_size}.jpg"
+    )
+    if os.path.isfile(thumbnail_path):
+        try:
+            with Image.open(thumbnail_path) as thumbnail:
+                thumbnail.load()
+                count("thumbnail_cache_hits")
+                return thumbnail.copy()
+        except OSError:  # A damaged thumbnail is made again.
+            pass
+    preview: Image.Image = _decode_preview(
+        image_path=image_path, max_size=max_size
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    # Per process, as previews can be made by multiple processes at once.
+    tmp_filepath: str = f"{thumbnail_path}.{os.getpid()}.tmp"
+    preview.save(tmp_filepath, format="JPEG", quality=90)
+    os.replace(tmp_filepath, thumbnail_path)
+    return preview
@@ -0,0 +1,90 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.file_reading_and_writing import get_file_hash
+
+BUILD_MANIFEST_FILENAME: str = ".hledger_preprocessor_build.json"
+
+
+@dataclass(frozen=True)
+class BuildTarget:
+    """A generated output of the preprocessor and the files it is built from."""
+
+    name: str
+    input_filepaths: List[str]
+    output_paths: List[str]
+
+
+@dataclass
+class BuildManifest:
+    """Stores the content hashes of the inputs that were used to build each
+    target, such that unchanged targets can be skipped on the next run."""
+
+    config_filepath: str
+    manifest_filepath: str
+    input_hashes_per_target: Dict[str, Dict[str, str]] = field(
+        default_factory=dict
+    )
+
+    @staticmethod
+    @typechecked
+    def load(*, config: Config, config_filepath: str) -> "BuildManifest":
+        """Loads the manifest from the working dir, or starts an empty one."""
+        manifest_filepath: str = os.path.join(
+            config.get_working_subdir_path(assert_exists=False),
+            BUILD_MANIFEST_FILENAME,
+        )
+        input_hashes_per_target: Dict[str, Dict[str, str]] = {}
+        if os.path.isfile(manifest_filepath):
+            with open(manifest_filepath, encoding="utf-8") as f:
+                input_hashes_per_target = json.load(f)
+        return BuildManifest(
+            config_filepath=os.path.abspath(config_filepath),
+            manifest_filepath=manifest_filepath,
+            input_hashes_per_target=input_hashes_per_target,
+        )
+
+    @typechecked
+    def is_up_to_date(self, *, build_target: BuildTarget) -> bool:
+        """Returns True if all outputs exist and none of the inputs changed
+        (or were added/removed) since the target was last recorded."""
+        if build_target.name not in self.input_hashes_per_target:
+            return False
+        for output_path in build_target.output_paths:
+            if not os.path.exists(output_path):
+                return False
+        return self.input_hashes_per_target[
+            build_target.name
+        ] == get_input_hashes(input_filepaths=build_target.input_filepaths)
+
+    @typechecked
+    def record(self, *, build_target: BuildTarget) -> None:
+        """Stores the current input hashes of a freshly built target."""
+        self.input_hashes_per_target[build_target.name] = get_input_hashes(
+            input_filepaths=build_target.input_filepaths
+        )
+        self.save()
+
+    @typechecked
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_filepath), exist_ok=True)
+        tmp_filepath: str = f"{self.manifest_filepath}.tmp"
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(self.input_hashes_per_target, f, indent=4, sort_keys=True)
+        os.replace(tmp_filepath, self.manifest_filepath)
+
+
+@typechecked
+def get_input_hashes(*, input_filepaths: List[str]) -> Dict[str, str]:
+    """Returns the SHA256 content hash per existing input file. Missing inputs
+    are left out, so deleting an input also invalidates the target."""
+    return {
+        filepath: get_file_hash(filepath=filepath)
+        for filepath in sorted(set(input_filepaths))
+        if os.path.isfile(filepath)
+    }
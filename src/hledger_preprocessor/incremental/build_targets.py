@@ -0,0 +1,160 @@
+"""Lists the inputs and outputs of each target that the preprocessor builds,
+such that the BuildManifest can determine which targets need a rebuild."""
+
+import os
+from typing import List
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.AccountConfig import AccountConfig
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.create_start import get_script_path
+from hledger_preprocessor.incremental.BuildManifest import BuildTarget
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    get_files_in_folder,
+)
+
+
+@typechecked
+def get_shared_input_filepaths(
+    *, config: Config, config_filepath: str
+) -> List[str]:
+    """Returns the config.yaml and categories.yaml filepaths."""
+    return [
+        os.path.abspath(config_filepath),
+        config.file_names.get_filepath(
+            dir_path_config=config.dir_paths,
+            filename="categories_filename",
+        ),
+    ]
+
+
+@typechecked
+def get_receipt_label_filepaths(*, config: Config) -> List[str]:
+    receipt_labels_dir: str = config.dir_paths.get_path(
+        "receipt_labels_dir", absolute=True
+    )
+    if not os.path.isdir(receipt_labels_dir):
+        return []
+    return get_files_in_folder(
+        folder_path=receipt_labels_dir,
+        file_name=config.file_names.tui_label_filename,
+        extensions=[".json"],
+    )
+
+
+@typechecked
+def get_rules_script_filepaths() -> List[str]:
+    """Returns the createRules and preprocess scripts that are copied into
+    each hledger-flow account directory."""
+    current_path: str = get_script_path()
+    return [f"{current_path}/createRules", f"{current_path}/preprocess"]
+
+
+@typechecked
+def get_account_type_path(
+    *, config: Config, account_config: AccountConfig
+) -> str:
+    account = account_config.account
+    return os.path.join(
+        config.get_import_path(assert_exists=False),
+        account.account_holder,
+        account.bank,
+        account.account_type,
+    )
+
+
+@typechecked
+def get_new_setup_target(
+    *, config: Config, config_filepath: str, account_config: AccountConfig
+) -> BuildTarget:
+    return BuildTarget(
+        name=f"new_setup:{account_config.account.to_string()}",
+        input_filepaths=[
+            os.path.abspath(config_filepath),
+            account_config.get_abs_csv_filepath(
+                dir_paths_config=config.dir_paths
+            ),
+            *get_rules_script_filepaths(),
+        ],
+        output_paths=[
+            os.path.join(
+                get_account_type_path(
+                    config=config, account_config=account_config
+                ),
+                "1-in",
+            )
+        ],
+    )
+
+
+@typechecked
+def get_preprocess_csvs_target(
+    *, config: Config, config_filepath: str, account_config: AccountConfig
+) -> BuildTarget:
+    pre_processed_output_dir: str = config.dir_paths.get_path(
+        "pre_processed_output_dir", absolute=False
+    )
+    return BuildTarget(
+        name=(
+            f"preprocess_csvs:{account_config.account.to_string()}:"
+            f"{pre_processed_output_dir}"
+        ),
+        input_filepaths=[
+            *get_shared_input_filepaths(
+                config=config, config_filepath=config_filepath
+            ),
+            *get_receipt_label_filepaths(config=config),
+            account_config.get_abs_csv_filepath(
+                dir_paths_config=config.dir_paths
+            ),
+        ],
+        output_paths=[
+            os.path.join(
+                get_account_type_path(
+                    config=config, account_config=account_config
+                ),
+                pre_processed_output_dir,
+            )
+        ],
+    )
+
+
+@typechecked
+def get_preprocess_assets_target(
+    *, config: Config, config_filepath: str
+) -> BuildTarget:
+    return BuildTarget(
+        name="preprocess_assets",
+        input_filepaths=[
+            *get_shared_input_filepaths(
+                config=config, config_filepath=config_filepath
+            ),
+            *get_receipt_label_filepaths(config=config),
+            *get_rules_script_filepaths(),
+        ],
+        output_paths=[
+            config.dir_paths.get_path(
+                path_name="asset_transaction_csvs_dir", absolute=True
+            )
+        ],
+    )
+
+
+@typechecked
+def get_generate_rules_target(
+    *, config: Config, config_filepath: str, account_config: AccountConfig
+) -> BuildTarget:
+    account = account_config.account
+    return BuildTarget(
+        name=f"generate_rules:{account.to_string()}",
+        input_filepaths=[os.path.abspath(config_filepath)],
+        output_paths=[
+            os.path.join(
+                get_account_type_path(
+                    config=config, account_config=account_config
+                ),
+                f"{account.bank}-{account.account_type}.rules",
+            )
+        ],
+    )
@@ -0,0 +1,305 @@
+"""Stores the receipt labels in SQLite, next to (not instead of) the json
+files in the receipt_labels_dir, such that they are read from a single file.
+
+Each label is stored as its original json text, such that exporting it back
+to the receipt_labels_dir is lossless. The size and modification time of each
+label file are stored with it, such that opening the store re-imports the
+label files that were changed, e.g. by hand, since they were stored."""
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+    get_file_fingerprint,
+    get_file_fingerprints,
+)
+from hledger_preprocessor.profiling.Profiler import count, profiled
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    ReceiptLabelCodec,
+    loads_label,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+SCHEMA_VERSION: int = 2
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS receipts (
+    label_relpath TEXT PRIMARY KEY,
+    label_json TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+# The tables of the earlier schema versions, which are dropped on open. The
+# labels are then imported again from the json files.
+OLD_TABLES: List[str] = [
+    "account_transactions",
+    "exchanged_items",
+    "label_files",
+    "receipts",
+]
+
+
+@dataclass
+class ReceiptLabelStore:
+    db_filepath: str
+    connection: sqlite3.Connection
+
+    @staticmethod
+    @typechecked
+    def open(*, db_filepath: str) -> "ReceiptLabelStore":
+        """Opens (and if needed creates) the label database."""
+        os.makedirs(os.path.dirname(db_filepath), exist_ok=True)
+        connection: sqlite3.Connection = sqlite3.connect(db_filepath)
+        version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            connection.close()
+            raise ValueError(
+                f"Unsupported label store schema version:{version} in"
+                f" {db_filepath}, expected:{SCHEMA_VERSION}. Remove it and"
+                " run --import-label-store to rebuild it from the json labels."
+            )
+        with connection:
+            if 0 < version < SCHEMA_VERSION:
+                for table in OLD_TABLES:
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return ReceiptLabelStore(db_filepath=db_filepath, connection=connection)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @typechecked
+    def get_nr_of_labels(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM receipts"
+        ).fetchone()[0]
+
+    def _import_label_file(
+        self,
+        *,
+        config: Config,
+        label_filepath: str,
+        labels_dir: str,
+        fingerprint: FileFingerprint,
+    ) -> None:
+        with open(
+            label_filepath, encoding=config.csv_encoding, newline=""
+        ) as f:
+            label_json: str = f.read()
+        # Such that a label that is not valid json fails its import.
+        json.loads(label_json)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO receipts (label_relpath, label_json,"
+            " mtime_ns, size) VALUES (?, ?, ?, ?)",
+            (
+                os.path.relpath(label_filepath, labels_dir),
+                label_json,
+                *fingerprint,
+            ),
+        )
+
+    @typechecked
+    def upsert_label_file(self, *, config: Config, label_filepath: str) -> None:
+        """Stores the (re)written label file, replacing its previous
+        version."""
+        with self.connection:
+            self._import_label_file(
+                config=config,
+                label_filepath=label_filepath,
+                labels_dir=config.dir_paths.get_path(
+                    "receipt_labels_dir", absolute=True
+                ),
+                fingerprint=get_file_fingerprint(filepath=label_filepath),
+            )
+
+    @typechecked
+    def delete_label(self, *, label_relpath: str) -> None:
+        with self.connection:
+            self._delete_label(label_relpath=label_relpath)
+
+    def _delete_label(self, *, label_relpath: str) -> None:
+        self.connection.execute(
+            "DELETE FROM receipts WHERE label_relpath = ?", (label_relpath,)
+        )
+
+    @typechecked
+    def get_label_filepaths(self, *, config: Config) -> List[str]:
+        # Imported here as load_receipts_from_dir imports this module.
+        from hledger_preprocessor.reading_history import (
+            load_receipts_from_dir,
+        )
+
+        return sorted(
+            load_receipts_from_dir.get_files_in_folder(
+                folder_path=config.dir_paths.get_path(
+                    "receipt_labels_dir", absolute=True
+                ),
+                file_name=config.file_names.tui_label_filename,
+                extensions=[".json"],
+            )
+        )
+
+    @profiled("import_label_store")
+    @typechecked
+    def import_json_labels(self, *, config: Config) -> int:
+        """Replaces the stored labels with the label files in the
+        receipt_labels_dir and returns the number of imported labels."""
+        labels_dir: str = config.dir_paths.get_path(
+            "receipt_labels_dir", absolute=True
+        )
+        label_filepaths: List[str] = self.get_label_filepaths(config=config)
+        # Taken before the labels are read, such that a label that changes
+        # while it is read is imported again on the next sync.
+        fingerprints: Dict[str, FileFingerprint] = get_file_fingerprints(
+            filepaths=label_filepaths
+        )
+        # A single transaction, such that a failed import keeps the old labels.
+        with self.connection:
+            self.connection.execute("DELETE FROM receipts")
+            for label_filepath in label_filepaths:
+                self._import_label_file(
+                    config=config,
+                    label_filepath=label_filepath,
+                    labels_dir=labels_dir,
+                    fingerprint=fingerprints[label_filepath],
+                )
+        return len(label_filepaths)
+
+    @profiled("sync_label_store")
+    @typechecked
+    def sync_json_labels(self, *, config: Config) -> int:
+        """Re-imports the label files whose size or modification time changed
+        since they were stored, imports the new ones, drops the removed ones,
+        and returns the number of imported and dropped labels."""
+        labels_dir: str = config.dir_paths.get_path(
+            "receipt_labels_dir", absolute=True
+        )
+        label_filepaths: List[str] = self.get_label_filepaths(config=config)
+        fingerprints: Dict[str, FileFingerprint] = get_file_fingerprints(
+            filepaths=label_filepaths
+        )
+        stored_fingerprints: Dict[str, FileFingerprint] = {
+            label_relpath: (mtime_ns, size)
+            for label_relpath, mtime_ns, size in self.connection.execute(
+                "SELECT label_relpath, mtime_ns, size FROM receipts"
+            )
+        }
+        removed_relpaths: set[str] = set(stored_fingerprints)
+        nr_of_changes: int = 0
+        with self.connection:
+            for label_filepath in label_filepaths:
+                label_relpath: str = os.path.relpath(label_filepath, labels_dir)
+                removed_relpaths.discard(label_relpath)
+                fingerprint: FileFingerprint = fingerprints[label_filepath]
+                if stored_fingerprints.get(label_relpath) == fingerprint:
+                    continue
+                self._import_label_file(
+                    config=config,
+                    label_filepath=label_filepath,
+                    labels_dir=labels_dir,
+                    fingerprint=fingerprint,
+                )
+                nr_of_changes += 1
+            for label_relpath in sorted(removed_relpaths):
+                self._delete_label(label_relpath=label_relpath)
+                nr_of_changes += 1
+        count("labels_synced", nr_of_changes)
+        return nr_of_changes
+
+    @typechecked
+    def export_json_labels(self, *, config: Config) -> int:
+        """Writes the stored labels to the receipt_labels_dir, byte for byte
+        as they were imported, and returns the number of exported labels."""
+        labels_dir: str = config.dir_paths.get_path(
+            "receipt_labels_dir", absolute=True
+        )
+        labels: List[Tuple[str, str]] = self.connection.execute(
+            "SELECT label_relpath, label_json FROM receipts"
+        ).fetchall()
+        with self.connection:
+            for label_relpath, label_json in labels:
+                label_filepath: str = os.path.join(labels_dir, label_relpath)
+                os.makedirs(os.path.dirname(label_filepath), exist_ok=True)
+                with open(
+                    label_filepath,
+                    "w",
+                    encoding=config.csv_encoding,
+                    newline="",
+                ) as f:
+                    f.write(label_json)
+                # Such that the written labels are not re-imported on open.
+                self.connection.execute(
+                    "UPDATE receipts SET mtime_ns = ?, size = ? WHERE"
+                    " label_relpath = ?",
+                    (
+                        *get_file_fingerprint(filepath=label_filepath),
+                        label_relpath,
+                    ),
+                )
+        return len(labels)
+
+    @profiled("load_receipts_from_label_store")
+    @typechecked
+    def load_receipts(self, *, config: Config) -> List[Receipt]:
+        receipts: List[Receipt] = []
+        receipt_label_codec = ReceiptLabelCodec(config=config)
+        for label_relpath, label_json in self.connection.execute(
+            "SELECT label_relpath, label_json FROM receipts"
+            " ORDER BY label_relpath"
+        ):
+            receipt_data: Dict[str, Any] = loads_label(label_json=label_json)
+            if "raw_img_filepath" not in receipt_data.keys():
+                # Same as load_receipts_from_dir, which only returns these
+                # labels after they are resolved via their receipt image.
+                print(
+                    "WARNING: Skipping label without raw_img_filepath:"
+                    f" {label_relpath}"
+                )
+                continue
+            receipt_data.pop("config", None)
+            receipts.append(
+                receipt_label_codec.decode_receipt(label_data=receipt_data)
+            )
+        count("receipts_loaded", len(receipts))
+        return receipts
+
+
+@typechecked
+def open_label_store(*, config: Config) -> ReceiptLabelStore:
+    """Opens the label store of the config, and syncs it with the json labels,
+    which fills it if it is new."""
+    label_store: ReceiptLabelStore = ReceiptLabelStore.open(
+        db_filepath=config.label_store.get_sqlite_filepath(
+            dir_paths=config.dir_paths
+        )
+    )
+    label_store.sync_json_labels(config=config)
+    return label_store
+
+
+@typechecked
+def store_exported_label(*, config: Config, label_filepath: str) -> None:
+    """Mirrors a (re)written label file into the label store, if the config
+    uses the sqlite backend. The other label files are synced on the next
+    open_label_store."""
+    if not config.label_store.uses_sqlite():
+        return
+    label_store: ReceiptLabelStore = ReceiptLabelStore.open(
+        db_filepath=config.label_store.get_sqlite_filepath(
+            dir_paths=config.dir_paths
+        )
+    )
+    try:
+        label_store.upsert_label_file(
+            config=config, label_filepath=os.path.abspath(label_filepath)
+        )
+    finally:
+        label_store.close()
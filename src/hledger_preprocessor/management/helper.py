@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from typeguard import typechecked
@@ -23,6 +23,13 @@ from hledger_preprocessor.dir_reading_and_writing import (
 from hledger_preprocessor.editing.edit_receipt_tui import tui_select_receipt
 from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.incremental.build_targets import (
+    get_preprocess_csvs_target,
+)
+from hledger_preprocessor.incremental.BuildManifest import (
+    BuildManifest,
+    BuildTarget,
+)
 from hledger_preprocessor.management.get_all_hledger_flow_accounts import (
     get_all_accounts,
 )
@@ -111,11 +118,21 @@ def preprocess_asset_csvs(
     config: Config,
     labelled_receipts: List[Receipt],
     models: Dict[ClassifierType, Dict[LogicType, Any]],
+    build_manifest: Optional[BuildManifest] = None,
 ) -> None:
 
     # account_configs.extend(config.accounts)
     for asset_account_config in config.get_account_configs_without_csv():
         # for asset_account_config in config.asset_accounts:
+        if build_manifest is not None:
+            build_target: BuildTarget = get_preprocess_csvs_target(
+                config=config,
+                config_filepath=build_manifest.config_filepath,
+                account_config=asset_account_config,
+            )
+            if build_manifest.is_up_to_date(build_target=build_target):
+                print(f"Unchanged, skipping:{build_target.name}")
+                continue
         transactions_per_year_per_account: Dict[int, List[Transaction]] = (
             load_csv_transactions_from_file_per_year(
                 config=config,
@@ -151,6 +168,8 @@ def preprocess_asset_csvs(
             account=asset_account_config.account,
             working_subdir=config.get_working_subdir_path(assert_exists=False),
         )
+        if build_manifest is not None:
+            build_manifest.record(build_target=build_target)
 
 
 def preprocess_generic_csvs(
@@ -158,6 +177,7 @@ def preprocess_generic_csvs(
     config: Config,
     labelled_receipts: List[Receipt],
     models: Dict[ClassifierType, Dict[LogicType, Any]],
+    build_manifest: Optional[BuildManifest] = None,
 ) -> None:
     transactions_per_year_per_account: Dict[int, List[Transaction]] = {}
 
@@ -168,6 +188,15 @@ def preprocess_generic_csvs(
         )
 
         if os.path.isfile(path=abs_csv_filepath):
+            if build_manifest is not None:
+                build_target: BuildTarget = get_preprocess_csvs_target(
+                    config=config,
+                    config_filepath=build_manifest.config_filepath,
+                    account_config=account_config,
+                )
+                if build_manifest.is_up_to_date(build_target=build_target):
+                    print(f"Unchanged, skipping:{build_target.name}")
+                    continue
 
             transactions_per_year_per_account: Dict[int, List[Transaction]] = (
                 csv_to_transactions(
@@ -204,5 +233,7 @@ def preprocess_generic_csvs(
                     assert_exists=False
                 ),
             )
+            if build_manifest is not None:
+                build_manifest.record(build_target=build_target)
         else:
             print(f"SKIPPING FOR:{abs_csv_filepath}")
@@ -1,6 +1,6 @@
 import os
 import shutil
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from typeguard import typechecked
 
@@ -16,6 +16,18 @@ from hledger_preprocessor.csv_outputting.output_non_input_csv_transactions impor
 from hledger_preprocessor.csv_parsing.csv_to_transactions import (
     load_csv_transactions_from_file_per_year,
 )
+from hledger_preprocessor.Currencies.ExchangeRateStore import (
+    ExchangeRateStore,
+    get_exchange_rate_store_filepath,
+)
+from hledger_preprocessor.Currencies.fetch_rates import (
+    fetch_exchange_rates,
+    get_default_rate_fetchers,
+)
+from hledger_preprocessor.Currencies.JsonHttpClient import (
+    EXCHANGE_RATE_HTTP_CACHE_DIRNAME,
+    JsonHttpClient,
+)
 from hledger_preprocessor.dir_reading_and_writing import (
     assert_dir_full_hierarchy_exists,
 )
@@ -23,6 +35,22 @@ from hledger_preprocessor.file_reading_and_writing import assert_file_exists
 from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.generics.Transaction import Transaction
 from hledger_preprocessor.helper import assert_dir_exists, get_images_in_folder
+from hledger_preprocessor.image_access import (
+    THUMBNAIL_CACHE_DIRNAME,
+    set_thumbnail_cache_dir,
+)
+from hledger_preprocessor.incremental.build_targets import (
+    get_generate_rules_target,
+    get_new_setup_target,
+    get_preprocess_assets_target,
+)
+from hledger_preprocessor.incremental.BuildManifest import (
+    BuildManifest,
+    BuildTarget,
+)
+from hledger_preprocessor.label_store.ReceiptLabelStore import (
+    ReceiptLabelStore,
+)
 from hledger_preprocessor.management.helper import (
     preprocess_asset_csvs,
     preprocess_generic_csvs,
@@ -33,13 +61,23 @@ from hledger_preprocessor.matching.helper import (
 from hledger_preprocessor.matching.searching.matching import (
     manage_matching_receipts_to_transactions,
 )
+from hledger_preprocessor.profiling.Profiler import profiled
 from hledger_preprocessor.receipt_transaction_matching.compare_transaction_to_receipt import (
     collect_non_csv_transactions,
 )
+from hledger_preprocessor.receipts_to_objects.edit_images.apply_image_ops import (
+    ImageOpsTask,
+    apply_image_ops,
+    get_image_ops_tasks,
+)
 from hledger_preprocessor.receipts_to_objects.edit_images.crop_image import (
     crop_images,
 )
+from hledger_preprocessor.receipts_to_objects.edit_images.propose_image_ops import (
+    ImageOpsProposals,
+)
 from hledger_preprocessor.receipts_to_objects.edit_images.rotate_all_images import (
+    get_images_without_crop,
     rotate_images,
 )
 from hledger_preprocessor.receipts_to_objects.make_receipt_labels import (
@@ -58,18 +96,40 @@ from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
 
 # Action 0.
+@profiled("manage_creating_new_setup")
 @typechecked
 def manage_creating_new_setup(
-    *, config: Config, labelled_receipts: List[Receipt]
+    *,
+    config: Config,
+    labelled_receipts: List[Receipt],
+    account_filter: Optional[List[str]] = None,
+    build_manifest: Optional[BuildManifest] = None,
 ) -> None:
+    """Builds the hledger-flow import tree for all (or the filtered) accounts
+    in a single pass. Re-running it on an existing tree is safe: directories
+    are only created if missing and the scripts/csvs are overwritten. If a
+    build_manifest is given, accounts whose inputs did not change are
+    skipped."""
     print("\n\nSTARTING NEW SETUP")
 
-    for account_config in config.accounts:
+    for account_config in get_account_configs_in_filter(
+        config=config, account_filter=account_filter
+    ):
         abs_csv_filepath: str = account_config.get_abs_csv_filepath(
             dir_paths_config=config.dir_paths
         )
 
         if os.path.isfile(abs_csv_filepath):
+            if build_manifest is not None:
+                build_target: BuildTarget = get_new_setup_target(
+                    config=config,
+                    config_filepath=build_manifest.config_filepath,
+                    account_config=account_config,
+                )
+                if build_manifest.is_up_to_date(build_target=build_target):
+                    print(f"Unchanged, skipping:{build_target.name}")
+                    continue
+
             transactions_per_year_per_account: Dict[int, List[Transaction]] = (
                 load_csv_transactions_from_file_per_year(
                     config=config,
@@ -87,15 +147,46 @@ def manage_creating_new_setup(
                     transactions_per_year_per_account.keys()
                 ),
             )
+            if build_manifest is not None:
+                build_manifest.record(build_target=build_target)
+
+
+@typechecked
+def get_account_configs_in_filter(
+    *, config: Config, account_filter: Optional[List[str]]
+) -> List[AccountConfig]:
+    """Returns the account configs whose account_holder:bank:account_type is in
+    the account_filter, or all account configs if no filter is given."""
+    if not account_filter:
+        return list(config.accounts)
+
+    filtered_account_configs: List[AccountConfig] = [
+        account_config
+        for account_config in config.accounts
+        if account_config.account.to_string() in account_filter
+    ]
+    found_accounts: set[str] = {
+        account_config.account.to_string()
+        for account_config in filtered_account_configs
+    }
+    missing_accounts: set[str] = set(account_filter) - found_accounts
+    if missing_accounts:
+        raise ValueError(
+            f"Did not find account(s):{sorted(missing_accounts)} in config."
+            f" Options are:{[a.account.to_string() for a in config.accounts]}"
+        )
+    return filtered_account_configs
 
 
 # Action 1.
+@profiled("manage_preprocessing_csvs")
 @typechecked
 def manage_preprocessing_csvs(
     *,
     config: Config,
     models: Dict[ClassifierType, Dict[LogicType, Any]],
     labelled_receipts: List[Receipt],
+    build_manifest: Optional[BuildManifest] = None,
 ) -> None:
     if (
         config.dir_paths.get_path("pre_processed_output_dir", absolute=True)
@@ -107,22 +198,37 @@ def manage_preprocessing_csvs(
         )
 
     preprocess_asset_csvs(
-        config=config, labelled_receipts=labelled_receipts, models=models
+        config=config,
+        labelled_receipts=labelled_receipts,
+        models=models,
+        build_manifest=build_manifest,
     )
 
     preprocess_generic_csvs(
-        config=config, labelled_receipts=labelled_receipts, models=models
+        config=config,
+        labelled_receipts=labelled_receipts,
+        models=models,
+        build_manifest=build_manifest,
     )
 
 
+@profiled("manage_preprocessing_assets")
 @typechecked
 def manage_preprocessing_assets(
     *,
     config: Config,
     models: Dict[ClassifierType, Dict[LogicType, Any]],
     labelled_receipts: List[Receipt],
+    build_manifest: Optional[BuildManifest] = None,
 ) -> None:
     # found_asset_years: List[int] = [2023, 2024, 2025]  # TODO: get from code.
+    if build_manifest is not None:
+        build_target: BuildTarget = get_preprocess_assets_target(
+            config=config, config_filepath=build_manifest.config_filepath
+        )
+        if build_manifest.is_up_to_date(build_target=build_target):
+            print(f"Unchanged, skipping:{build_target.name}")
+            return
 
     # Remove asset directory:
     asset_path: str = config.dir_paths.get_path(
@@ -185,13 +291,27 @@ def manage_preprocessing_assets(
         config=config,
         non_input_csv_transactions=non_input_csv_transactions,
     )
+    if build_manifest is not None:
+        build_manifest.record(build_target=build_target)
 
 
 # Action 2
+@profiled("manage_generating_rules")
 @typechecked
-def manage_generating_rules(*, config: Config) -> None:
+def manage_generating_rules(
+    *, config: Config, build_manifest: Optional[BuildManifest] = None
+) -> None:
 
     for account_config in config.accounts:
+        if build_manifest is not None:
+            build_target: BuildTarget = get_generate_rules_target(
+                config=config,
+                config_filepath=build_manifest.config_filepath,
+                account_config=account_config,
+            )
+            if build_manifest.is_up_to_date(build_target=build_target):
+                print(f"Unchanged, skipping:{build_target.name}")
+                continue
         assert_dir_full_hierarchy_exists(
             config=config,
             account=account_config.account,
@@ -201,12 +321,88 @@ def manage_generating_rules(*, config: Config) -> None:
             config=config,
             account_config=account_config,
         )
+        if build_manifest is not None:
+            build_manifest.record(build_target=build_target)
+
+
+@typechecked
+def manage_label_store(
+    *, config: Config, import_labels: bool, export_labels: bool
+) -> None:
+    """Copies the receipt labels from the json files into the sqlite label
+    store, or back."""
+    label_store: ReceiptLabelStore = ReceiptLabelStore.open(
+        db_filepath=config.label_store.get_sqlite_filepath(
+            dir_paths=config.dir_paths
+        )
+    )
+    try:
+        if import_labels:
+            nr_of_labels: int = label_store.import_json_labels(config=config)
+            print(
+                f"Imported {nr_of_labels} labels into:{label_store.db_filepath}"
+            )
+        if export_labels:
+            nr_of_labels = label_store.export_json_labels(config=config)
+            print(
+                f"Exported {nr_of_labels} labels from:{label_store.db_filepath}"
+            )
+    finally:
+        label_store.close()
+
+
+@typechecked
+def manage_exchange_rates(
+    *, config: Config, csv_filepaths: List[str], fetch: bool
+) -> None:
+    """Imports the csv dumps into the exchange rate store, and optionally
+    fetches the rates of today into it."""
+    store: ExchangeRateStore = ExchangeRateStore.open(
+        db_filepath=get_exchange_rate_store_filepath(dir_paths=config.dir_paths)
+    )
+    try:
+        for csv_filepath in csv_filepaths:
+            nr_of_rates: int = store.import_csv(csv_filepath=csv_filepath)
+            print(f"Imported {nr_of_rates} rates into:{store.db_filepath}")
+        if fetch:
+            rates: Dict[str, float] = fetch_exchange_rates(
+                store=store,
+                fetchers=get_default_rate_fetchers(
+                    client=JsonHttpClient(
+                        cache_dir=os.path.join(
+                            config.get_working_subdir_path(assert_exists=False),
+                            EXCHANGE_RATE_HTTP_CACHE_DIRNAME,
+                        )
+                    )
+                ),
+            )
+            print(f"Fetched {len(rates)} rates into:{store.db_filepath}")
+    finally:
+        store.close()
+
+
+@profiled("manage_applying_image_ops")
+@typechecked
+def manage_applying_image_ops(
+    *, config: Config, max_workers: Optional[int] = None
+) -> None:
+    """Applies the recorded rotate and crop operations of all receipt images
+    again, without asking for input."""
+    tasks: List[ImageOpsTask] = get_image_ops_tasks(config=config)
+    apply_image_ops(tasks=tasks, max_workers=max_workers)
+    print(f"Applied the image operations of {len(tasks)} receipt images.")
 
 
 @typechecked
 def manage_creating_receipt_img_labels_with_tui(
-    *, config: Config, labelled_receipts: List[Receipt], verbose: bool
+    *,
+    config: Config,
+    labelled_receipts: List[Receipt],
+    verbose: bool,
+    raw_receipt_img_filepaths: Optional[List[str]] = None,
 ) -> Dict[str, Receipt]:
+    """Rotates, crops and labels the given raw receipt images, or all images in
+    the receipt_images_input_dir if none are given."""
     # Ensure directories exist
     assert_dir_exists(
         dirpath=config.dir_paths.get_path(
@@ -229,30 +425,58 @@ def manage_creating_receipt_img_labels_with_tui(
 
     filepath_receipt_object: Dict[str, Receipt] = {}
 
-    raw_receipt_img_filepaths: List[str] = get_images_in_folder(
-        folder_path=config.dir_paths.get_path(
-            "receipt_images_input_dir", absolute=True
+    if raw_receipt_img_filepaths is None:
+        raw_receipt_img_filepaths = get_images_in_folder(
+            folder_path=config.dir_paths.get_path(
+                "receipt_images_input_dir", absolute=True
+            )
         )
-    )
 
-    # Step 1: Rotate all images
-    rotate_images(
-        raw_receipt_img_filepaths=raw_receipt_img_filepaths, config=config
+    # The previews of the images are reused by the proposals, the rotate and
+    # crop windows and the labelling, also in later runs. The proposal
+    # processes get the cache dir passed, as they may not inherit it.
+    thumbnail_cache_dir: str = os.path.join(
+        config.get_working_subdir_path(assert_exists=False),
+        THUMBNAIL_CACHE_DIRNAME,
     )
+    set_thumbnail_cache_dir(cache_dir=thumbnail_cache_dir)
+    try:
+        # Propose the rotation and crop of the images in the background,
+        # while the first images are rotated and cropped.
+        proposals = ImageOpsProposals(
+            image_filepaths=get_images_without_crop(
+                config=config,
+                raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+            ),
+            thumbnail_cache_dir=thumbnail_cache_dir,
+        )
+        try:
+            # Step 1: Rotate all images
+            rotate_images(
+                raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+                config=config,
+                proposals=proposals,
+            )
 
-    # Step 2: Crop all images
-    crop_images(
-        raw_receipt_img_filepaths=raw_receipt_img_filepaths, config=config
-    )
+            # Step 2: Crop all images
+            crop_images(
+                raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+                config=config,
+                proposals=proposals,
+            )
+        finally:
+            proposals.close()
 
-    receipt_per_raw_img_filepath: Dict[str, Receipt] = (
-        manually_make_receipt_labels(
-            config=config,
-            raw_receipt_img_filepaths=raw_receipt_img_filepaths,
-            labelled_receipts=labelled_receipts,
-            verbose=verbose,
+        receipt_per_raw_img_filepath: Dict[str, Receipt] = (
+            manually_make_receipt_labels(
+                config=config,
+                raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+                labelled_receipts=labelled_receipts,
+                verbose=verbose,
+            )
         )
-    )
+    finally:
+        set_thumbnail_cache_dir(cache_dir=None)
 
     # Assert receipts exist
     for (
@@ -0,0 +1,103 @@
+from argparse import Namespace
+from typing import Any, Callable, Dict, List, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+from hledger_preprocessor.incremental.BuildManifest import BuildManifest
+from hledger_preprocessor.management.helper import edit_receipt
+from hledger_preprocessor.management.main_manager import (
+    manage_applying_image_ops,
+    manage_creating_new_setup,
+    manage_creating_receipt_img_labels_with_tui,
+    manage_exchange_rates,
+    manage_generating_rules,
+    manage_matching_manual_receipt_objs_to_account_transactions,
+    manage_preprocessing_assets,
+    manage_preprocessing_csvs,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+
+@typechecked
+def run_actions(
+    *,
+    args: Namespace,
+    config: Config,
+    labelled_receipts: List[Receipt],
+    models_loader: Callable[..., Dict[ClassifierType, Dict[LogicType, Any]]],
+) -> None:
+    """Performs the actions requested in the CLI args. The models are only
+    loaded (through the models_loader) if an action needs them."""
+    build_manifest: Optional[BuildManifest] = None
+    if args.incremental:
+        build_manifest = BuildManifest.load(
+            config=config, config_filepath=args.config
+        )
+
+    if (
+        args.preprocess_csvs
+        or args.preprocess_assets
+        or args.link_receipts_to_transactions
+    ):
+        models: Dict[ClassifierType, Dict[LogicType, Any]] = models_loader(
+            quick_categorisation=args.quick_categorisation, config=config
+        )
+
+        if args.preprocess_csvs:
+            manage_preprocessing_csvs(
+                config=config,
+                models=models,
+                labelled_receipts=labelled_receipts,
+                build_manifest=build_manifest,
+            )
+
+        if args.preprocess_assets:
+            manage_preprocessing_assets(
+                config=config,
+                models=models,
+                labelled_receipts=labelled_receipts,
+                build_manifest=build_manifest,
+            )
+
+        if args.link_receipts_to_transactions:
+            manage_matching_manual_receipt_objs_to_account_transactions(
+                config=config,
+                models=models,
+                labelled_receipts=labelled_receipts,
+            )
+
+    if args.edit_receipt:
+        edit_receipt(config=config, labelled_receipts=labelled_receipts)
+
+    if args.new_setup:
+        manage_creating_new_setup(
+            config=config,
+            labelled_receipts=labelled_receipts,
+            account_filter=args.account_filter,
+            build_manifest=build_manifest,
+        )
+
+    if args.generate_rules:
+        manage_generating_rules(
+            config=config,
+            build_manifest=build_manifest,
+        )
+
+    if args.import_exchange_rates or args.fetch_exchange_rates:
+        manage_exchange_rates(
+            config=config,
+            csv_filepaths=args.import_exchange_rates or [],
+            fetch=args.fetch_exchange_rates,
+        )
+
+    if args.apply_image_ops:
+        manage_applying_image_ops(
+            config=config, max_workers=args.image_ops_workers
+        )
+
+    if args.tui_label_receipts:
+        manage_creating_receipt_img_labels_with_tui(
+            config=config, labelled_receipts=labelled_receipts, verbose=False
+        )
@@ -3,7 +3,7 @@ import json
 import logging
 import os
 from pprint import pprint
-from typing import Any, Optional, Set, Union
+from typing import Any, Dict, Optional, Set, Tuple, Union
 
 from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.config.load_config import (
@@ -15,8 +15,9 @@ from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.receipt_transaction_matching.read_receipt import (
     read_receipt_from_json,
 )
-from hledger_preprocessor.receipts_to_objects.make_receipt_labels import (
-    export_human_label,
+from hledger_preprocessor.receipts_to_objects.write_receipt_label import (
+    get_debug_label_writes,
+    store_receipt_label,
 )
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
@@ -25,6 +26,9 @@ import logging
 
 from typeguard import typechecked
 
+# The label folder per (labels dir, cropped image path, mtime, size).
+_receipt_folder_paths: Dict[Tuple[str, str, int, int], str] = {}
+
 
 @typechecked
 def get_label_filepath(
@@ -41,10 +45,8 @@ def get_label_filepath(
         config=config, raw_receipt_img_filepath=receipt.raw_img_filepath
     )
 
-    receipt_folder_path: str = create_image_folder(
-        dataset_path=config.dir_paths.get_path(
-            "receipt_labels_dir", absolute=True
-        ),
+    receipt_folder_path: str = get_receipt_folder_path(
+        config=config,
         cropped_receipt_img_filepath=cropped_receipt_img_filepath,
     )
 
@@ -52,82 +54,131 @@ def get_label_filepath(
     return label_filepath
 
 
+@typechecked
+def get_receipt_folder_path(
+    *, config: Config, cropped_receipt_img_filepath: str
+) -> str:
+    """Returns the label folder of the cropped image, which is named after
+    the SHA256 of the image. The folder is remembered per image path, size
+    and modification time, to not hash the image on every label update."""
+    dataset_path: str = config.dir_paths.get_path(
+        "receipt_labels_dir", absolute=True
+    )
+    stat_result = os.stat(cropped_receipt_img_filepath)
+    key: Tuple[str, str, int, int] = (
+        dataset_path,
+        os.path.abspath(cropped_receipt_img_filepath),
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+    )
+    receipt_folder_path: Optional[str] = _receipt_folder_paths.get(key)
+    if receipt_folder_path is None or not os.path.isdir(receipt_folder_path):
+        receipt_folder_path = create_image_folder(
+            dataset_path=dataset_path,
+            cropped_receipt_img_filepath=cropped_receipt_img_filepath,
+        )
+        _receipt_folder_paths[key] = receipt_folder_path
+    return receipt_folder_path
+
+
 @typechecked
 def store_updated_receipt_label(
     *,
     latest_receipt: Receipt,
     config: Config,
 ) -> None:
-    """The incoming receipt arg may be changed by the matching algo, e.g. date correction. The stored_receipt is the original receipt that is loaded from json, (which lead to the incoming receipt through the matching algo), the loaded_receipt is the import of the export of the modified receipt arg."""
+    """The incoming receipt arg may be changed by the matching algo, e.g. date correction. The label is written atomically, and only if its content changed. With --debug-label-writes, the stored_receipt (the original receipt loaded from json) and the loaded_receipt (the import of the export of the modified receipt arg) are also diffed field by field."""
 
     label_filepath: str = get_label_filepath(
         receipt=latest_receipt,
         config=config,
     )
     assert_file_exists(filepath=label_filepath)
+    if not get_debug_label_writes():
+        store_receipt_label(
+            config=config,
+            receipt=latest_receipt,
+            label_filepath=label_filepath,
+        )
+        return
+
     original_receipt: Receipt = read_receipt_from_json(
         config=config,
         label_filepath=label_filepath,
         verbose=False,
         raw_receipt_img_filepath=latest_receipt.raw_img_filepath,
     )
-
-    if original_receipt.__dict__ != latest_receipt.__dict__:
-        print(f"exporting latest_receipt")
-        export_human_label(
-            receipt=latest_receipt, label_filepath=label_filepath
-        )
-        print(f"exported latest_receipt")
-
-        loaded_receipt: Receipt = read_receipt_from_json(
+    if store_receipt_label(
+        config=config, receipt=latest_receipt, label_filepath=label_filepath
+    ):
+        assert_label_update_is_complete(
             config=config,
             label_filepath=label_filepath,
-            verbose=False,
-            raw_receipt_img_filepath=latest_receipt.raw_img_filepath,
+            latest_receipt=latest_receipt,
+            original_receipt=original_receipt,
         )
 
-        ignore_keys_none = {
-            "balance_after",
-            "bic",
-            "description",
-            "extra",
-            "other_party_account_name",
-            "other_party_name",
-            "transaction_code",
-            # "original_transaction",  # optional: also ignore this if often None
-        }
-
-        if has_diff_and_print(
-            dict1=loaded_receipt.__dict__,
-            dict2=latest_receipt.__dict__,
-            name1="loaded_receipt",
-            name2="latest_receipt",
-            ignore_keys_none=ignore_keys_none,
-            ignore_empty_dict_keys={"extra"},
-            ignore_keys={"nr_in_batch"},
-        ):
-
-            raise ValueError(
-                "The exported receipt is not the same as the updated receipt. "
-            )
-
-        if not has_diff_and_print(
-            dict1=loaded_receipt.__dict__,
-            dict2=original_receipt.__dict__,
-            name1="loaded_receipt",
-            name2="original_receipt",
-            ignore_keys_none=ignore_keys_none,
-            ignore_empty_dict_keys={"extra", "nr_in_batch"},
-            ignore_keys={"nr_in_batch"},
-        ):
-            print("loaded")
-            pprint(loaded_receipt.get_both_item_types())
-            print("original")
-            pprint(original_receipt.get_both_item_types())
-            raise ValueError(
-                "The loaded receipt is the same as the original receipt. "
-            )
-        print("Everything went better than expected :)")
+
+@typechecked
+def assert_label_update_is_complete(
+    *,
+    config: Config,
+    label_filepath: str,
+    latest_receipt: Receipt,
+    original_receipt: Receipt,
+) -> None:
+    """Asserts the stored label loads as the latest receipt, and differs from
+    the original receipt."""
+    loaded_receipt: Receipt = read_receipt_from_json(
+        config=config,
+        label_filepath=label_filepath,
+        verbose=False,
+        raw_receipt_img_filepath=latest_receipt.raw_img_filepath,
+    )
+
+    ignore_keys_none = {
+        "balance_after",
+        "bic",
+        "description",
+        "extra",
+        "other_party_account_name",
+        "other_party_name",
+        "transaction_code",
+        # "original_transaction",  # optional: also ignore this if often None
+    }
+
+    if has_diff_and_print(
+        dict1=loaded_receipt.__dict__,
+        dict2=latest_receipt.__dict__,
+        name1="loaded_receipt",
+        name2="latest_receipt",
+        ignore_keys_none=ignore_keys_none,
+        ignore_empty_dict_keys={"extra"},
+        ignore_keys={"nr_in_batch"},
+        verbose=True,
+    ):
+
+        raise ValueError(
+            "The exported receipt is not the same as the updated receipt. "
+        )
+
+    if not has_diff_and_print(
+        dict1=loaded_receipt.__dict__,
+        dict2=original_receipt.__dict__,
+        name1="loaded_receipt",
+        name2="original_receipt",
+        ignore_keys_none=ignore_keys_none,
+        ignore_empty_dict_keys={"extra", "nr_in_batch"},
+        ignore_keys={"nr_in_batch"},
+    ):
+        print("loaded")
+        pprint(loaded_receipt.get_both_item_types())
+        print("original")
+        pprint(original_receipt.get_both_item_types())
+        raise ValueError(
+            "The loaded receipt is the same as the original receipt. "
+        )
+    print("Everything went better than expected :)")
 
 
 @typechecked
@@ -1,14 +1,17 @@
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
 
 from typeguard import typechecked
 
+from hledger_preprocessor.Currencies.ExchangeRateStore import ExchangeRateStore
 from hledger_preprocessor.Currency import Currency, DirectAssetPurchases
 from hledger_preprocessor.TransactionObjects.Receipt import AccountTransaction
 
 
 @typechecked
 def add_estimated_conversion_ratio(
-    *, search_receipt_account_transaction: AccountTransaction
+    *,
+    search_receipt_account_transaction: AccountTransaction,
+    exchange_rates: Optional[ExchangeRateStore] = None,
 ) -> Tuple[
     Union[Currency, DirectAssetPurchases],
     Union[Currency, DirectAssetPurchases],
@@ -17,10 +20,12 @@ def add_estimated_conversion_ratio(
     """
     Prompts the user to select a currency or asset (from a unified list) sold to obtain the receipt
     currency and provide a conversion ratio. Assumes the selected currency/asset differs from the
-    receipt transaction currency.
+    receipt transaction currency. If the exchange rates of both are stored, their ratio on the
+    receipt date is proposed.
 
     Args:
         search_receipt_account_transaction: The transaction from the receipt with its currency.
+        exchange_rates: The stored exchange rates to propose the conversion ratio from.
 
     Returns:
         Tuple containing:
@@ -49,13 +54,9 @@ def add_estimated_conversion_ratio(
             if user_input.isdigit() and 1 <= int(user_input) <= len(options):
                 selected_option = options[int(user_input) - 1]
                 # Assert that the selected currency/asset differs from the receipt currency
-                assert (
-                    selected_option.value
-                    != search_receipt_account_transaction.currency
-                ), (
+                assert selected_option != to_currency, (
                     f"Selected currency/asset {selected_option.value} must"
-                    " differ from receipt currency"
-                    f" {search_receipt_account_transaction.currency}"
+                    f" differ from receipt currency {to_currency.value}"
                 )
                 return selected_option
             print(
@@ -67,18 +68,25 @@ def add_estimated_conversion_ratio(
         *,
         from_currency: Union[Currency, DirectAssetPurchases],
         to_currency: Union[Currency, DirectAssetPurchases],
+        stored_ratio: Optional[float],
     ) -> float:
         """Prompts the user for a valid conversion ratio between two currencies/assets."""
+        default_hint: str = (
+            ""
+            if stored_ratio is None
+            else f" [press enter for the stored rate: {stored_ratio:.6g}]"
+        )
         while True:
             try:
-                ratio = float(
-                    input(
-                        "\nEnter the conversion ratio from"
-                        f" {from_currency.value} to {to_currency.value} (e.g.,"
-                        f" 1 {from_currency.value} = X {to_currency.value},"
-                        " enter X): "
-                    ).strip()
-                )
+                user_input: str = input(
+                    "\nEnter the conversion ratio from"
+                    f" {from_currency.value} to {to_currency.value} (e.g.,"
+                    f" 1 {from_currency.value} = X {to_currency.value},"
+                    f" enter X){default_hint}: "
+                ).strip()
+                if not user_input and stored_ratio is not None:
+                    return stored_ratio
+                ratio = float(user_input)
                 if ratio > 0:
                     return ratio
                 print("Conversion ratio must be a positive number.")
@@ -86,10 +94,21 @@ def add_estimated_conversion_ratio(
                 print("Invalid input. Please enter a valid number.")
 
     # Prompt for a single currency or asset from the unified list
+    to_currency: Currency = (
+        search_receipt_account_transaction.account.base_currency
+    )
     from_currency = prompt_for_currency_or_asset()
-    to_currency = search_receipt_account_transaction.currency
+    stored_ratio: Optional[float] = None
+    if exchange_rates is not None:
+        stored_ratio = exchange_rates.get_conversion_ratio(
+            from_currency=from_currency.value,
+            to_currency=to_currency.value,
+            the_date=search_receipt_account_transaction.the_date.date(),
+        )
     conversion_ratio = prompt_for_conversion_ratio(
-        from_currency=from_currency, to_currency=to_currency
+        from_currency=from_currency,
+        to_currency=to_currency,
+        stored_ratio=stored_ratio,
     )
 
     return from_currency, to_currency, conversion_ratio
@@ -7,6 +7,7 @@ from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.matching.searching.match_receipt import (
     match_receipt_items_to_csv_transactions,
 )
+from hledger_preprocessor.profiling.Profiler import profiled
 from hledger_preprocessor.TransactionObjects.Receipt import (
     Account,
     AccountTransaction,
@@ -22,6 +23,7 @@ from typeguard import typechecked
 from hledger_preprocessor.generics.Transaction import Transaction
 
 
+@profiled("manage_matching_receipts_to_transactions")
 @typechecked
 def manage_matching_receipts_to_transactions(
     *,
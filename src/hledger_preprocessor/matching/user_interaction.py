@@ -1,10 +1,15 @@
 import logging
-from typing import Dict, Union
+import os
+from typing import Dict, Optional, Union
 
 from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.config.load_config import (  # Config,
     raw_receipt_img_filepath_to_cropped,
 )
+from hledger_preprocessor.Currencies.ExchangeRateStore import (
+    ExchangeRateStore,
+    get_exchange_rate_store_filepath,
+)
 from hledger_preprocessor.Currency import Currency, DirectAssetPurchases
 from hledger_preprocessor.receipt_transaction_matching.get_bank_data_from_transactions import (
     HledgerFlowAccountInfo,
@@ -70,11 +75,25 @@ def prompt_user_for_no_matches(
         from_currency: Union[Currency, DirectAssetPurchases]
         conversion_ratio_1_from_to: float
 
-        from_currency, _, conversion_ratio_1_from_to = (
-            add_estimated_conversion_ratio(
-                search_receipt_account_transaction=action_dataset.search_receipt_account_transaction,
-            )
+        # Propose the ratio from the stored exchange rates, if there are any.
+        exchange_rates_filepath: str = get_exchange_rate_store_filepath(
+            dir_paths=action_dataset.config.dir_paths
         )
+        exchange_rates: Optional[ExchangeRateStore] = (
+            ExchangeRateStore.open(db_filepath=exchange_rates_filepath)
+            if os.path.isfile(exchange_rates_filepath)
+            else None
+        )
+        try:
+            from_currency, _, conversion_ratio_1_from_to = (
+                add_estimated_conversion_ratio(
+                    search_receipt_account_transaction=action_dataset.search_receipt_account_transaction,
+                    exchange_rates=exchange_rates,
+                )
+            )
+        finally:
+            if exchange_rates is not None:
+                exchange_rates.close()
         action_values = AlternateCurrencyWithdrawl(
             from_currency=from_currency,
             conversion_ratio_1_from_to=conversion_ratio_1_from_to,
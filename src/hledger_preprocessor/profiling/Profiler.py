@@ -0,0 +1,232 @@
+"""Named timing spans and counters that are reported when --profile is passed.
+
+The span/count/profiled helpers are called in hot loops, so they are not
+typechecked and only check whether a profiler is active when profiling is
+disabled."""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from typeguard import typechecked
+
+PROFILE_FORMATS: List[str] = ["table", "json", "chrome-trace"]
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+
+
+@dataclass
+class Profiler:
+    """Collects the spans and counters of a single CLI run."""
+
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+    spans: List[Span] = field(default_factory=list)
+    counters: Dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_span(self, *, name: str, start_ns: int, end_ns: int) -> None:
+        with self.lock:
+            self.spans.append(
+                Span(
+                    name=name,
+                    start_ns=start_ns,
+                    duration_ns=end_ns - start_ns,
+                    thread_id=threading.get_ident(),
+                )
+            )
+
+    def count(self, *, name: str, amount: int) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @typechecked
+    def get_span_summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the number of calls and the total, mean and max duration in
+        seconds per span name, sorted on descending total duration."""
+        durations_per_name: Dict[str, List[int]] = {}
+        for span in self.spans:
+            durations_per_name.setdefault(span.name, []).append(
+                span.duration_ns
+            )
+        summary: List[Tuple[str, Dict[str, float]]] = [
+            (
+                name,
+                {
+                    "calls": len(durations),
+                    "total_s": sum(durations) / 1e9,
+                    "mean_s": sum(durations) / len(durations) / 1e9,
+                    "max_s": max(durations) / 1e9,
+                },
+            )
+            for name, durations in durations_per_name.items()
+        ]
+        return dict(sorted(summary, key=lambda item: -item[1]["total_s"]))
+
+    @typechecked
+    def format_table(self) -> str:
+        name_width: int = max(
+            [len("span")] + [len(name) for name in self.get_span_summary()]
+        )
+        lines: List[str] = [
+            f"{'span':<{name_width}} {'calls':>8} {'total[s]':>10}"
+            f" {'mean[s]':>10} {'max[s]':>10}"
+        ]
+        for name, stats in self.get_span_summary().items():
+            lines.append(
+                f"{name:<{name_width}} {int(stats['calls']):>8}"
+                f" {stats['total_s']:>10.4f} {stats['mean_s']:>10.4f}"
+                f" {stats['max_s']:>10.4f}"
+            )
+        if self.counters:
+            counter_width: int = max(len(name) for name in self.counters)
+            lines.append("")
+            lines.append(f"{'counter':<{counter_width}} {'value':>10}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<{counter_width}} {value:>10}")
+        return "\n".join(lines)
+
+    @typechecked
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "spans": self.get_span_summary(),
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    @typechecked
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Returns the spans in the Chrome trace event format, which can be
+        opened in chrome://tracing or https://ui.perfetto.dev."""
+        pid: int = os.getpid()
+        end_us: float = (time.perf_counter_ns() - self.start_ns) / 1e3
+        trace_events: List[Dict[str, Any]] = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start_ns - self.start_ns) / 1e3,
+                "dur": span.duration_ns / 1e3,
+                "pid": pid,
+                "tid": span.thread_id,
+            }
+            for span in self.spans
+        ]
+        trace_events.extend(
+            {
+                "name": name,
+                "ph": "C",
+                "ts": end_us,
+                "pid": pid,
+                "args": {name: value},
+            }
+            for name, value in sorted(self.counters.items())
+        )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    @typechecked
+    def write_report(
+        self, *, output_format: str, output_filepath: Optional[str]
+    ) -> None:
+        if output_format == "table":
+            report: str = self.format_table()
+        elif output_format == "json":
+            report = json.dumps(self.to_json(), indent=2)
+        elif output_format == "chrome-trace":
+            report = json.dumps(self.to_chrome_trace())
+        else:
+            raise ValueError(
+                f"Unknown profile format:{output_format}, options are:"
+                f" {PROFILE_FORMATS}"
+            )
+
+        if output_filepath is None:
+            print(f"\nPROFILE\n{report}")
+        else:
+            with open(output_filepath, "w", encoding="utf-8") as f:
+                f.write(report)
+            print(f"Wrote profile to:{output_filepath}")
+
+
+# Only set when --profile is passed.
+_active_profiler: Optional[Profiler] = None
+_disabled_span = nullcontext()
+
+
+@typechecked
+def set_profiler(*, profiler: Optional[Profiler]) -> None:
+    global _active_profiler
+    _active_profiler = profiler
+
+
+@typechecked
+def get_profiler() -> Optional[Profiler]:
+    return _active_profiler
+
+
+@contextmanager
+def _enabled_span(profiler: Profiler, name: str) -> Iterator[None]:
+    start_ns: int = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        profiler.add_span(
+            name=name, start_ns=start_ns, end_ns=time.perf_counter_ns()
+        )
+
+
+def span(name: str) -> Any:
+    """Times the enclosed block under name if profiling is enabled."""
+    if _active_profiler is None:
+        return _disabled_span
+    return _enabled_span(_active_profiler, name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increments the counter name if profiling is enabled."""
+    if _active_profiler is not None:
+        _active_profiler.count(name=name, amount=amount)
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator that times each call of the function under name."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _active_profiler is None:
+                return func(*args, **kwargs)
+            with _enabled_span(_active_profiler, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profile_run(
+    *, enabled: bool, output_format: str, output_filepath: Optional[str]
+) -> Iterator[None]:
+    """Profiles the enclosed block and writes the report afterwards."""
+    if not enabled:
+        yield
+        return
+    profiler = Profiler()
+    set_profiler(profiler=profiler)
+    try:
+        with _enabled_span(profiler, "total"):
+            yield
+    finally:
+        set_profiler(profiler=None)
+        profiler.write_report(
+            output_format=output_format, output_filepath=output_filepath
+        )
@@ -0,0 +1,166 @@
+import os
+import pickle  # nosec B403 - only loads the snapshot this program wrote.
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, Tuple
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+)
+from hledger_preprocessor.Currency import Currency
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+RECEIPT_SNAPSHOT_FILENAME: str = ".hledger_preprocessor_receipts.pickle"
+# Increment when the stored receipt objects change, to rebuild old snapshots.
+RECEIPT_SNAPSHOT_VERSION: int = 2
+
+
+@dataclass
+class ReceiptSnapshot:
+    """Stores the receipts that were decoded from the json labels, with the
+    (st_mtime_ns, st_size) of their label file, such that the next run only
+    decodes the labels that were added or changed. The receipts are stored
+    with their cached transaction hashes, and get the (interned) accounts
+    when they are loaded."""
+
+    config: Config
+    snapshot_filepath: str
+    entries: Dict[str, Tuple[FileFingerprint, Receipt]] = field(
+        default_factory=dict
+    )
+
+    @staticmethod
+    @typechecked
+    def load(*, config: Config) -> "ReceiptSnapshot":
+        """Loads the snapshot from the working dir, or starts an empty one if
+        there is none, or if it was made by another version or for accounts
+        that are configured differently."""
+        receipt_snapshot = ReceiptSnapshot(
+            config=config,
+            snapshot_filepath=os.path.join(
+                config.get_working_subdir_path(assert_exists=False),
+                RECEIPT_SNAPSHOT_FILENAME,
+            ),
+        )
+        if not os.path.isfile(receipt_snapshot.snapshot_filepath):
+            return receipt_snapshot
+        try:
+            with open(receipt_snapshot.snapshot_filepath, "rb") as f:
+                content: Any = _ReceiptUnpickler(f).load()
+        # A truncated or incompatible snapshot is rebuilt from the labels.
+        except Exception:
+            return receipt_snapshot
+        if (
+            isinstance(content, dict)
+            and content.get("version") == RECEIPT_SNAPSHOT_VERSION
+            and content.get("config_key") == get_config_key(config=config)
+        ):
+            receipt_snapshot.entries = content["entries"]
+        return receipt_snapshot
+
+    @typechecked
+    def get_unchanged_receipts(
+        self, *, fingerprints: Dict[str, FileFingerprint]
+    ) -> Dict[str, Receipt]:
+        """Returns the stored receipt per label file that was stored with the
+        same fingerprint, which leaves out the added and changed labels."""
+        receipt_per_label_filepath: Dict[str, Receipt] = {}
+        for label_filepath, fingerprint in fingerprints.items():
+            entry = self.entries.get(label_filepath)
+            if entry is not None and entry[0] == fingerprint:
+                receipt_per_label_filepath[label_filepath] = entry[1]
+        return receipt_per_label_filepath
+
+    @typechecked
+    def update(
+        self, *, entries: Dict[str, Tuple[FileFingerprint, Receipt]]
+    ) -> None:
+        """Replaces the stored receipts, and saves them if any label was
+        added, changed or removed."""
+        if {
+            label_filepath: fingerprint
+            for label_filepath, (fingerprint, _) in entries.items()
+        } == {
+            label_filepath: fingerprint
+            for label_filepath, (fingerprint, _) in self.entries.items()
+        }:
+            return
+        self.entries = entries
+        self.save()
+
+    @typechecked
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.snapshot_filepath), exist_ok=True)
+        tmp_filepath: str = f"{self.snapshot_filepath}.tmp"
+        with open(tmp_filepath, "wb") as f:
+            _ReceiptPickler(f).dump(
+                {
+                    "version": RECEIPT_SNAPSHOT_VERSION,
+                    "config_key": get_config_key(config=self.config),
+                    "entries": self.entries,
+                }
+            )
+        os.replace(tmp_filepath, self.snapshot_filepath)
+
+
+@typechecked
+def get_config_key(*, config: Config) -> str:
+    """Returns the part of the config that the decoded receipts depend on:
+    the accounts, and whether their transactions are csv transactions."""
+    return repr(
+        sorted(
+            (
+                account_config.account.base_currency.value,
+                account_config.account.account_holder,
+                account_config.account.bank,
+                account_config.account.account_type,
+                account_config.has_input_csv(),
+            )
+            for account_config in config.accounts
+        )
+    )
+
+
+class _ReceiptPickler(pickle.Pickler):
+    """Stores the accounts by reference instead of by value."""
+
+    def __init__(self, file: IO[bytes]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def persistent_id(self, obj: Any) -> Any:
+        if type(obj) is Account:
+            return (
+                "account",
+                obj.base_currency.value,
+                obj.account_holder,
+                obj.bank,
+                obj.account_type,
+            )
+        return None
+
+
+class _ReceiptUnpickler(pickle.Unpickler):  # nosec B301
+    def __init__(self, file: IO[bytes]):
+        super().__init__(file)
+        # Pickle does not memoize persistent ids, so the accounts are.
+        self.accounts: Dict[Tuple[Any, ...], Account] = {}
+
+    def persistent_load(self, pid: Any) -> Any:
+        if isinstance(pid, tuple) and pid[0] == "account":
+            if pid not in self.accounts:
+                self.accounts[pid] = intern_account(
+                    account=Account(
+                        base_currency=Currency(pid[1]),
+                        account_holder=pid[2],
+                        bank=pid[3],
+                        account_type=pid[4],
+                    )
+                )
+            return self.accounts[pid]
+        raise pickle.UnpicklingError(f"Unknown persistent id:{pid}")
@@ -1,6 +1,5 @@
-import json
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from typeguard import typechecked
 
@@ -8,14 +7,33 @@ from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.config.load_config import (
     raw_receipt_img_filepath_to_cropped,
 )
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+    get_file_fingerprints,
+)
 from hledger_preprocessor.dir_reading_and_writing import (
     get_receipt_folder_name,
 )
 from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.helper import assert_dir_exists, get_images_in_folder
+from hledger_preprocessor.label_store.ReceiptLabelStore import (
+    ReceiptLabelStore,
+    open_label_store,
+)
+from hledger_preprocessor.profiling.Profiler import count, profiled
+from hledger_preprocessor.reading_history.read_label_files import (
+    read_label_files,
+)
+from hledger_preprocessor.reading_history.ReceiptSnapshot import (
+    ReceiptSnapshot,
+)
 from hledger_preprocessor.receipts_to_objects.make_receipt_labels import (
     export_human_label,
 )
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    ReceiptLabelCodec,
+    read_label_file,
+)
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
 
@@ -32,6 +50,7 @@ def load_existing_receipt_labels_via_images(
     )
 
     receipt_per_raw_img_filepath: Dict[Tuple[str, str], Receipt] = {}
+    receipt_label_codec = ReceiptLabelCodec(config=config)
     for receipt_nr, raw_receipt_img_filepath in enumerate(
         raw_receipt_img_filepaths
     ):
@@ -64,25 +83,25 @@ def load_existing_receipt_labels_via_images(
         label_filepath: str = os.path.join(receipt_folder_path, label_filename)
 
         if os.path.isfile(path=label_filepath):
-            with open(label_filepath, encoding=config.csv_encoding) as f:
-                receipt_data = json.load(f)
-                if "raw_img_filepath" not in receipt_data.keys():
-                    receipt_data["raw_img_filepath"] = raw_receipt_img_filepath
-                if "config" in receipt_data.keys():
-                    receipt_data.pop("config")
-                    print(
-                        f"WARNING: Popped old config, tied to receipt updated"
-                        f" it with new config"
-                    )
-                receipt = Receipt(
-                    config=config, **receipt_data
-                )  # Assuming Receipt is a dataclass or similar
-                receipt_per_raw_img_filepath[
-                    (raw_receipt_img_filepath, label_filepath)
-                ] = receipt
+            receipt_data = read_label_file(label_filepath=label_filepath)
+            if "raw_img_filepath" not in receipt_data.keys():
+                receipt_data["raw_img_filepath"] = raw_receipt_img_filepath
+            if "config" in receipt_data.keys():
+                receipt_data.pop("config")
+                print(
+                    f"WARNING: Popped old config, tied to receipt updated"
+                    f" it with new config"
+                )
+            receipt = receipt_label_codec.decode_receipt(
+                label_data=receipt_data
+            )
+            receipt_per_raw_img_filepath[
+                (raw_receipt_img_filepath, label_filepath)
+            ] = receipt
     return receipt_per_raw_img_filepath
 
 
+@profiled("load_receipts_from_dir")
 @typechecked
 def load_receipts_from_dir(*, config: Config) -> List[Receipt]:
     """
@@ -95,65 +114,121 @@ def load_receipts_from_dir(*, config: Config) -> List[Receipt]:
         List of Receipt objects loaded from the labels directory
     """
 
+    if config.label_store.uses_sqlite():
+        label_store: ReceiptLabelStore = open_label_store(config=config)
+        try:
+            return label_store.load_receipts(config=config)
+        finally:
+            label_store.close()
+
     # Ensure the labels directory exists
     abs_receipt_dir_path: str = config.dir_paths.get_path(
         "receipt_labels_dir", absolute=True
     )
     assert_dir_exists(dirpath=abs_receipt_dir_path)
 
-    receipts: List[Receipt] = []
     label_files = get_files_in_folder(
         folder_path=abs_receipt_dir_path,
         file_name=config.file_names.tui_label_filename,
         extensions=[".json"],  # Assuming labels are stored as JSON files
     )
 
-    img_receipts: Dict[Tuple[str, str], Receipt] = (
-        load_existing_receipt_labels_via_images(config=config)
+    # Only loaded (which hashes all receipt images) if a label misses its
+    # raw_img_filepath.
+    img_receipts: Optional[Dict[Tuple[str, str], Receipt]] = None
+
+    # The receipts of the unchanged labels are taken from the snapshot.
+    receipt_per_label_filepath: Dict[str, Receipt] = {}
+    receipt_snapshot: Optional[ReceiptSnapshot] = None
+    fingerprints: Dict[str, FileFingerprint] = {}
+    if config.label_store.snapshot:
+        receipt_snapshot = ReceiptSnapshot.load(config=config)
+        # Taken before the labels are read, such that a label that changes
+        # while it is read is decoded again on the next run.
+        fingerprints = get_file_fingerprints(filepaths=label_files)
+        receipt_per_label_filepath = receipt_snapshot.get_unchanged_receipts(
+            fingerprints=fingerprints
+        )
+    changed_label_files: List[str] = [
+        label_filepath
+        for label_filepath in label_files
+        if label_filepath not in receipt_per_label_filepath
+    ]
+
+    label_datas: List[Dict[str, Any]] = read_label_files(
+        label_filepaths=changed_label_files,
+        max_workers=config.label_store.load_workers,
+        executor=config.label_store.load_executor,
     )
 
-    for label_filepath in label_files:
+    receipt_label_codec = ReceiptLabelCodec(config=config)
+    for label_filepath, receipt_data in zip(changed_label_files, label_datas):
         # input(f'label_filepath={label_filepath}')
-        with open(label_filepath, encoding=config.csv_encoding) as f:
-            receipt_data = json.load(f)
-            if "raw_img_filepath" not in receipt_data.keys():
-                found_label: bool = False
-                for (
-                    raw_receipt_img_filepath,
-                    other_label_filepath,
-                ) in img_receipts.keys():
-                    if label_filepath == other_label_filepath:
-                        # receipt_data
-                        receipt_data["raw_img_filepath"] = (
-                            raw_receipt_img_filepath
-                        )
-                        if "config" in receipt_data.keys():
-                            receipt_data.pop("config")
-                            print(
-                                f"WARNING: Popped old config, tied to receipt"
-                                f" updated it with new config"
-                            )
-                        receipt = Receipt(config=config, **receipt_data)
-                        found_label = True
-
-                        export_human_label(
-                            receipt=receipt, label_filepath=other_label_filepath
+        if "raw_img_filepath" not in receipt_data.keys():
+            if img_receipts is None:
+                img_receipts = load_existing_receipt_labels_via_images(
+                    config=config
+                )
+            found_label: bool = False
+            for (
+                raw_receipt_img_filepath,
+                other_label_filepath,
+            ) in img_receipts.keys():
+                if label_filepath == other_label_filepath:
+                    # receipt_data
+                    receipt_data["raw_img_filepath"] = raw_receipt_img_filepath
+                    if "config" in receipt_data.keys():
+                        receipt_data.pop("config")
+                        print(
+                            f"WARNING: Popped old config, tied to receipt"
+                            f" updated it with new config"
                         )
-                if not found_label:
-                    raise FileNotFoundError(f" did not find:{label_filepath}")
-            else:
-                if "config" in receipt_data.keys():
-                    receipt_data.pop("config")
-                    print(
-                        f"WARNING: Popped old config, tied to receipt updated"
-                        f" it with new config"
+                    receipt = receipt_label_codec.decode_receipt(
+                        label_data=receipt_data
                     )
-                receipt = Receipt(config=config, **receipt_data)
-                receipts.append(receipt)
+                    found_label = True
+
+                    export_human_label(
+                        config=config,
+                        receipt=receipt,
+                        label_filepath=other_label_filepath,
+                    )
+            if not found_label:
+                raise FileNotFoundError(f" did not find:{label_filepath}")
+        else:
+            if "config" in receipt_data.keys():
+                receipt_data.pop("config")
+                print(
+                    f"WARNING: Popped old config, tied to receipt updated"
+                    f" it with new config"
+                )
+            receipt = receipt_label_codec.decode_receipt(
+                label_data=receipt_data
+            )
+            receipt_per_label_filepath[label_filepath] = receipt
         # if receipt_data["the_date"] == "2024-12-20T20:31:00":
         #     pprint(receipt)
         #     # input(f'{receipt_data.keys()}')
         #     raise ValueError("FOUDN RECEIPT")
+
+    receipts: List[Receipt] = [
+        receipt_per_label_filepath[label_filepath]
+        for label_filepath in label_files
+        if label_filepath in receipt_per_label_filepath
+    ]
+    if receipt_snapshot is not None:
+        receipt_snapshot.update(
+            entries={
+                label_filepath: (
+                    fingerprints[label_filepath],
+                    receipt_per_label_filepath[label_filepath],
+                )
+                for label_filepath in label_files
+                if label_filepath in receipt_per_label_filepath
+            }
+        )
+    count("receipts_loaded", len(receipts))
+    count("receipts_decoded", len(changed_label_files))
     return receipts
 
 
@@ -0,0 +1,81 @@
+"""Reads and parses the json receipt label files in parallel, as opening the
+files dominates the loading time on network or encrypted file systems."""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple, Union
+
+from typeguard import typechecked
+
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    read_label_file,
+)
+
+
+def _read_label_files_or_errors(
+    label_filepaths: List[str],
+) -> List[Union[Any, Exception]]:
+    """Returns the parsed labels, or the error that reading a label raised,
+    such that the errors of all files can be reported together. Module-level,
+    so that a process pool can pickle it."""
+    results: List[Union[Any, Exception]] = []
+    for label_filepath in label_filepaths:
+        try:
+            results.append(read_label_file(label_filepath=label_filepath))
+        except Exception as error:  # Reported per file by read_label_files.
+            results.append(error)
+    return results
+
+
+@typechecked
+def read_label_files(
+    *, label_filepaths: List[str], max_workers: int, executor: str = "thread"
+) -> List[Dict[str, Any]]:
+    """Returns the parsed labels in the order of the label_filepaths. A
+    thread pool overlaps the file reads, a process pool also the parsing.
+
+    Raises:
+        ValueError: listing, in file order, each file that could not be read
+            or did not contain a json object.
+    """
+    results: List[Union[Any, Exception]] = []
+    if max_workers <= 1 or len(label_filepaths) <= 1:
+        results = _read_label_files_or_errors(label_filepaths)
+    else:
+        workers: int = min(max_workers, len(label_filepaths))
+        # A few chunks per worker balance the load, while a task (and for a
+        # process pool its pickling) per file would cost more than the read.
+        chunk_size: int = -(-len(label_filepaths) // (workers * 4))
+        chunks: List[List[str]] = [
+            label_filepaths[start : start + chunk_size]
+            for start in range(0, len(label_filepaths), chunk_size)
+        ]
+        pool: Executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if executor == "process"
+            else ThreadPoolExecutor(max_workers=workers)
+        )
+        with pool:
+            for chunk_results in pool.map(_read_label_files_or_errors, chunks):
+                results.extend(chunk_results)
+
+    errors: List[Tuple[str, Exception]] = []
+    for label_filepath, result in zip(label_filepaths, results):
+        if isinstance(result, Exception):
+            errors.append((label_filepath, result))
+        elif not isinstance(result, dict):
+            errors.append(
+                (
+                    label_filepath,
+                    TypeError(f"Expected a json object, got {type(result)}"),
+                )
+            )
+    if errors:
+        raise ValueError(
+            f"Could not read {len(errors)} of the {len(label_filepaths)}"
+            " receipt labels:\n"
+            + "\n".join(
+                f"{label_filepath}: {type(error).__name__}: {error}"
+                for label_filepath, error in errors
+            )
+        ) from errors[0][1]
+    return results
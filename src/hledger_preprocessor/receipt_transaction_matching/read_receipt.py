@@ -3,7 +3,6 @@
 The transaction data from the .csv file is used to correct/overwrite any incorrect labels generated manually.
 """
 
-import json
 from datetime import datetime
 from pprint import pprint
 from typing import Dict, List, Optional, Union
@@ -15,16 +14,20 @@ from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.generics.GenericTransactionWithCsv import (
     GenericCsvTransaction,
 )
-from hledger_preprocessor.TransactionObjects.Account import Account
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    ReceiptLabelCodec,
+    read_label_file,
+)
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
 from hledger_preprocessor.TransactionObjects.AccountTransaction import (
     AccountTransaction,
 )
-from hledger_preprocessor.TransactionObjects.Address import Address
-from hledger_preprocessor.TransactionObjects.AssetType import AssetType
 from hledger_preprocessor.TransactionObjects.ExchangedItem import ExchangedItem
 from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
-from hledger_preprocessor.TransactionObjects.ShopId import ShopId
 
 
 @typechecked
@@ -46,78 +49,29 @@ def read_receipt_from_json(
         Receipt object reconstructed from JSON.
     """
 
-    with open(label_filepath) as f:
-        data = json.load(f)
+    data = read_label_file(label_filepath=label_filepath)
 
     if verbose:
         print(f"Reading receipt from:\n{label_filepath}")
         pprint(data)
 
-    def convert_types(obj):
-        """Recursively convert strings to datetime, Currency, Account, Address, and ShopId."""
-        if isinstance(obj, dict):
-            result = {}
-            for key, value in obj.items():
-                if key == "the_date" and isinstance(value, str):
-                    result[key] = datetime.fromisoformat(value)
-                elif key == "currency" and isinstance(value, str):
-                    result[key] = Currency(value)
-                elif key == "account" and isinstance(value, str):
-                    result[key] = Account.from_string(value)
-                elif key == "asset_type" and isinstance(value, str):
-                    result[key] = AssetType(value)
-                elif key == "address" and isinstance(value, dict):
-                    # Convert address dictionary to Address object
-                    result[key] = Address(**convert_types(value))
-                elif key == "shop_identifier" and isinstance(value, dict):
-                    # Convert shop_identifier dictionary to ShopId object
-                    result[key] = ShopId(**convert_types(value))
-                else:
-                    result[key] = convert_types(value)
-            return result
-        elif isinstance(obj, list):
-            return [convert_types(item) for item in obj]
-        return obj
-
     # Ensure data is a dictionary
     if not isinstance(data, dict):
         raise TypeError(f"Expected a dictionary in JSON file, got {type(data)}")
 
-    converted_data = convert_types(data)
-    net_bought_items_dict: Union[None, Dict] = converted_data.pop(
-        "net_bought_items"
-    )
-    net_returned_items_dict: Union[None, Dict] = converted_data.pop(
-        "net_returned_items"
-    )
-
-    if "raw_img_filepath" not in converted_data.keys():
+    if "raw_img_filepath" not in data.keys():
         if not raw_receipt_img_filepath:
             raise KeyError(
                 f"Did not find the {raw_receipt_img_filepath} in the receipt."
             )
-        converted_data["raw_img_filepath"] = raw_receipt_img_filepath
-    if "config" in converted_data.keys():
-        converted_data.pop("config")
+        data["raw_img_filepath"] = raw_receipt_img_filepath
+    if "config" in data.keys():
+        data.pop("config")
         print(
             f"WARNING: Popped old config, tied to receipt updated"
             f" it with new config"
         )
-    return Receipt(
-        config=config,
-        # shop_identifier=converted_data["shop_identifier"],
-        net_bought_items=convert_to_exchanged_item(
-            the_date=converted_data["the_date"],
-            net_items_dict=net_bought_items_dict,
-            account_transaction_type="account_transactions",
-        ),
-        net_returned_items=convert_to_exchanged_item(
-            the_date=converted_data["the_date"],
-            net_items_dict=net_returned_items_dict,
-            account_transaction_type="account_transactions",  # TODO: convert to ENUM
-        ),
-        **converted_data,
-    )
+    return ReceiptLabelCodec(config=config).decode_receipt(label_data=data)
 
 
 @typechecked
@@ -135,15 +89,24 @@ def convert_original_transaction_dict(
         GenericCsvTransaction object.
     """
     # Map 'amount' to 'tendered_amount_out' if needed
-    if "amount" in original_txn_dict and "tendered_amount_out" not in original_txn_dict:
-        original_txn_dict["tendered_amount_out"] = float(original_txn_dict["amount"])
+    if (
+        "amount" in original_txn_dict
+        and "tendered_amount_out" not in original_txn_dict
+    ):
+        original_txn_dict["tendered_amount_out"] = float(
+            original_txn_dict["amount"]
+        )
 
     # Set default change_returned if missing
     if "change_returned" not in original_txn_dict:
         original_txn_dict["change_returned"] = 0.0
 
     # Get currency from dict or parent context
-    currency_val = original_txn_dict.get("currency") or original_txn_dict.get("base_currency") or parent_currency
+    currency_val = (
+        original_txn_dict.get("currency")
+        or original_txn_dict.get("base_currency")
+        or parent_currency
+    )
     if currency_val and isinstance(currency_val, str):
         currency_val = Currency(currency_val)
 
@@ -151,7 +114,9 @@ def convert_original_transaction_dict(
     account_val = original_txn_dict.get("account")
     if account_val and isinstance(account_val, dict):
         if isinstance(account_val.get("base_currency"), str):
-            account_val["base_currency"] = Currency(account_val["base_currency"])
+            account_val["base_currency"] = Currency(
+                account_val["base_currency"]
+            )
         original_txn_dict["account"] = Account(**account_val)
     elif account_val and isinstance(account_val, str):
         # Account is a string like "at:triodos:checking" - need currency from elsewhere
@@ -185,16 +150,28 @@ def convert_original_transaction_dict(
     # Convert transaction_code string to TransactionCode enum
     txn_code = original_txn_dict.get("transaction_code")
     if txn_code and isinstance(txn_code, str):
-        original_txn_dict["transaction_code"] = TransactionCode.normalize_transaction_code(txn_code)
+        original_txn_dict["transaction_code"] = (
+            TransactionCode.normalize_transaction_code(txn_code)
+        )
 
     # Only keep fields that GenericCsvTransaction accepts
     valid_fields = {
-        "account", "the_date", "tendered_amount_out", "change_returned",
-        "balance_after", "description", "other_party_name",
-        "other_party_account_name", "transaction_code", "bic",
-        "original_transaction", "extra"
+        "account",
+        "the_date",
+        "tendered_amount_out",
+        "change_returned",
+        "balance_after",
+        "description",
+        "other_party_name",
+        "other_party_account_name",
+        "transaction_code",
+        "bic",
+        "original_transaction",
+        "extra",
+    }
+    filtered_dict = {
+        k: v for k, v in original_txn_dict.items() if k in valid_fields
     }
-    filtered_dict = {k: v for k, v in original_txn_dict.items() if k in valid_fields}
 
     return GenericCsvTransaction(**filtered_dict)
 
@@ -245,7 +222,9 @@ def convert_to_exchanged_item(
                     # TODO: delete this after reformatting receipt label.
                     account_dict.pop("asset_category")
 
-                account_transaction_dict["account"] = Account(**account_dict)
+                account_transaction_dict["account"] = intern_account(
+                    account=Account(**account_dict)
+                )
                 account_transaction_dict["the_date"] = the_date
 
             # Convert original_transaction dict to GenericCsvTransaction object
@@ -253,12 +232,18 @@ def convert_to_exchanged_item(
             if original_txn and isinstance(original_txn, dict):
                 # Get currency from parent context to pass to original_transaction
                 parent_currency = account_transaction_dict.get("currency")
-                if not parent_currency and account_dict and isinstance(account_dict, dict):
+                if (
+                    not parent_currency
+                    and account_dict
+                    and isinstance(account_dict, dict)
+                ):
                     parent_currency = account_dict.get("base_currency")
                 if parent_currency and isinstance(parent_currency, str):
                     parent_currency = Currency(parent_currency)
                 account_transaction_dict["original_transaction"] = (
-                    convert_original_transaction_dict(original_txn, parent_currency)
+                    convert_original_transaction_dict(
+                        original_txn, parent_currency
+                    )
                 )
 
             account_transactions.append(
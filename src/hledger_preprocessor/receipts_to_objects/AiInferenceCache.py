@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.generics.enums import EnumEncoder
+from hledger_preprocessor.generics.ReceiptImageToObjModel import (
+    ReceiptImageToObjModel,
+)
+
+AI_INFERENCE_CACHE_DIRNAME: str = ".ai_inference_cache"
+
+
+@typechecked
+def get_model_cache_params(
+    *, ai_model: ReceiptImageToObjModel
+) -> Dict[str, Any]:
+    """Returns the name, revision and preprocessing parameters of the model
+    that its inference results depend on. Models that do not report them are
+    only identified by their name."""
+    if hasattr(ai_model, "get_cache_params"):
+        return ai_model.get_cache_params()
+    return {"name": ai_model.get_name()}
+
+
+@dataclass
+class AiInferenceCache:
+    """Stores the json that a model inferred from a receipt image, under the
+    SHA256 of the image and of the model parameters. A renamed or moved image
+    is therefore not inferred again, while an image that is inferred by
+    another model revision, or with other preprocessing, is. Each entry is a
+    separate file that is stored as soon as its image is inferred, such that
+    a run that is interrupted keeps the results it already inferred."""
+
+    cache_dir: str
+
+    @staticmethod
+    @typechecked
+    def get_key(*, image_hash: str, model_params: Dict[str, Any]) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                {"image_sha256": image_hash, "model": model_params},
+                sort_keys=True,
+                cls=EnumEncoder,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+
+    @typechecked
+    def get_entry_filepath(self, *, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    @typechecked
+    def get(self, *, key: str) -> Optional[Any]:
+        """Returns the cached json of the key, or None if there is none."""
+        entry_filepath: str = self.get_entry_filepath(key=key)
+        if not os.path.isfile(entry_filepath):
+            return None
+        try:
+            with open(entry_filepath, encoding="utf-8") as f:
+                return json.load(f)["json"]
+        # A truncated entry is inferred again.
+        except (json.JSONDecodeError, KeyError):
+            return None
+
+    @typechecked
+    def put(
+        self,
+        *,
+        key: str,
+        image_hash: str,
+        model_params: Dict[str, Any],
+        json_object: Any,
+    ) -> None:
+        """Stores the json with the image hash and model parameters that it
+        was inferred for, to be able to inspect the cache."""
+        entry_filepath: str = self.get_entry_filepath(key=key)
+        os.makedirs(os.path.dirname(entry_filepath), exist_ok=True)
+        tmp_filepath: str = f"{entry_filepath}.tmp"
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "image_sha256": image_hash,
+                    "model": model_params,
+                    "json": json_object,
+                },
+                f,
+                indent=4,
+                cls=EnumEncoder,
+                default=str,
+            )
+        os.replace(tmp_filepath, entry_filepath)
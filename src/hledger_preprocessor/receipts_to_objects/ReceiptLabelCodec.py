@@ -0,0 +1,227 @@
+"""Converts receipt labels from and to json in a single pass over their
+known structure: Receipt -> ExchangedItem -> AccountTransaction -> Account,
+and Receipt -> ShopId -> Address.
+
+The json is parsed with orjson if it is installed, otherwise with the json
+module of the standard library. The helpers that run per label or per value
+are not @typechecked, as the checks would cost more than the decoding."""
+
+import json
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Union
+
+import iso8601
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.helper import get_account_config
+from hledger_preprocessor.Currency import Currency
+from hledger_preprocessor.generics.GenericTransactionWithCsv import (
+    GenericCsvTransaction,
+)
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
+from hledger_preprocessor.TransactionObjects.AccountTransaction import (
+    AccountTransaction,
+)
+from hledger_preprocessor.TransactionObjects.AssetType import AssetType
+from hledger_preprocessor.TransactionObjects.convert_exchanged_item import (
+    merge_item_dicts,
+)
+from hledger_preprocessor.TransactionObjects.convert_shop_id import (
+    convert_shop_id,
+)
+from hledger_preprocessor.TransactionObjects.ExchangedItem import ExchangedItem
+from hledger_preprocessor.TransactionObjects.initialize_account_transaction import (
+    initialize_account_transaction,
+)
+from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional.
+    orjson = None  # type: ignore[assignment]
+
+JSON_BACKEND: str = "json" if orjson is None else "orjson"
+
+# Account fields as (base_currency, account_holder, bank, account_type).
+AccountKey = Tuple[str, str, str, str]
+
+
+def loads_label(*, label_json: Union[bytes, str]) -> Any:
+    # orjson rejects the NaN and Infinity that the json module writes.
+    if orjson is not None:
+        try:
+            return orjson.loads(label_json)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(label_json)
+
+
+def read_label_file(*, label_filepath: str) -> Any:
+    with open(label_filepath, "rb") as f:
+        return loads_label(label_json=f.read())
+
+
+def parse_label_date(*, the_date: str) -> datetime:
+    """Returns the timezone-naive date, like iso8601.parse_date, but with the
+    (much faster) datetime.fromisoformat for the labels it can parse."""
+    try:
+        return datetime.fromisoformat(the_date).replace(tzinfo=None)
+    except ValueError:
+        try:
+            return iso8601.parse_date(the_date).replace(tzinfo=None)
+        except iso8601.ParseError:
+            raise ValueError(f"Invalid format for the_date: {the_date}")
+
+
+# The dataclass field names per type, as fields() is slow for many objects.
+_field_names: Dict[type, Tuple[str, ...]] = {}
+
+
+def encode_label_value(obj: Any) -> Any:
+    """Returns the json content of a (dataclass) object of a receipt, without
+    first copying it, as dataclasses.asdict does: datetimes become isoformat
+    strings, and Currency and AssetType their values."""
+    if isinstance(obj, (str, int, float, TransactionCode)) or obj is None:
+        return obj
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, (Currency, AssetType)):
+        return obj.value
+    elif isinstance(obj, (list, tuple)):
+        return [encode_label_value(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: encode_label_value(value) for key, value in obj.items()}
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        obj_type: type = type(obj)
+        if obj_type not in _field_names:
+            _field_names[obj_type] = tuple(f.name for f in fields(obj))
+        return {
+            name: encode_label_value(getattr(obj, name))
+            for name in _field_names[obj_type]
+        }
+    else:
+        raise TypeError(f"Unexpected type:{type(obj)} for:{obj}")
+
+
+@dataclass
+class ReceiptLabelCodec:
+    """Builds the Receipts of the labels of a config. The accounts, and
+    whether they have an input csv, are looked up once per codec instead of
+    once per account transaction."""
+
+    config: Config
+    accounts: Dict[AccountKey, Account] = field(default_factory=dict)
+    has_input_csv_per_account: Dict[Account, bool] = field(default_factory=dict)
+
+    @typechecked
+    def decode_receipt(self, *, label_data: Dict[str, Any]) -> Receipt:
+        """Returns the Receipt of the label. The label_data is consumed: its
+        dicts are reused to build the objects."""
+        if isinstance(label_data["the_date"], str):
+            label_data["the_date"] = parse_label_date(
+                the_date=label_data["the_date"]
+            )
+        for items_key in ["net_bought_items", "net_returned_items"]:
+            if label_data.get(items_key):
+                label_data[items_key] = self.decode_exchanged_item(
+                    item=label_data[items_key]
+                )
+        if isinstance(label_data.get("shop_identifier"), dict):
+            label_data["shop_identifier"] = convert_shop_id(
+                shop_id=label_data["shop_identifier"]
+            )
+        return Receipt(**label_data)
+
+    def decode_exchanged_item(
+        self, *, item: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> ExchangedItem:
+        merged_item: Dict[str, Any] = (
+            merge_item_dicts(items=item) if isinstance(item, list) else item
+        )
+        the_date: datetime = (
+            parse_label_date(the_date=merged_item["the_date"])
+            if isinstance(merged_item["the_date"], str)
+            else merged_item["the_date"].replace(tzinfo=None)
+        )
+        return ExchangedItem(
+            quantity=merged_item["quantity"],
+            description=merged_item["description"],
+            the_date=the_date,
+            account_transactions=[
+                self.decode_account_transaction(
+                    transaction=transaction, the_date=the_date
+                )
+                for transaction in merged_item["account_transactions"]
+            ],
+            tax_per_unit=merged_item.get("tax_per_unit"),
+            group_discount=merged_item.get("group_discount"),
+            category=merged_item.get("category"),
+            round_amount=merged_item.get("round_amount"),
+            unit_price=merged_item.get("unit_price"),
+        )
+
+    def decode_account_transaction(
+        self, *, transaction: Dict[str, Any], the_date: datetime
+    ) -> Union[AccountTransaction, GenericCsvTransaction]:
+        account: Account = self.decode_account(
+            account_data=transaction["account"]
+        )
+        if account not in self.has_input_csv_per_account:
+            self.has_input_csv_per_account[account] = get_account_config(
+                config=self.config, account=account
+            ).has_input_csv()
+
+        # The csv transactions and linked transactions have their own dates
+        # and (nested) fields.
+        if (
+            self.has_input_csv_per_account[account]
+            or "original_transaction" in transaction
+        ):
+            return initialize_account_transaction(
+                config=self.config,
+                transaction=transaction,
+                account=account,
+                currency=account.base_currency,
+                the_date=the_date,
+                recursion_depth=0,
+            )
+        transaction.pop("currency", None)
+        transaction["account"] = account
+        transaction["the_date"] = the_date
+        return AccountTransaction(**transaction)
+
+    def decode_account(self, *, account_data: Dict[str, Any]) -> Account:
+        key: AccountKey = (
+            account_data["base_currency"],
+            account_data["account_holder"],
+            account_data["bank"],
+            account_data["account_type"],
+        )
+        if key not in self.accounts:
+            currency_input = account_data["base_currency"]
+            try:
+                currency: Currency = (
+                    Currency[currency_input]
+                    if isinstance(currency_input, str)
+                    else currency_input
+                )
+            except KeyError:
+                raise ValueError(
+                    f"Invalid currency: {currency_input}. Valid values are:"
+                    f" {[e.name for e in Currency]}"
+                )
+            self.accounts[key] = intern_account(
+                account=Account(
+                    base_currency=currency,
+                    account_holder=account_data["account_holder"],
+                    bank=account_data["bank"],
+                    account_type=account_data["account_type"],
+                )
+            )
+        return self.accounts[key]
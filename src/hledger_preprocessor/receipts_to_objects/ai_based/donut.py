@@ -1,11 +1,14 @@
+import hashlib
 import os
 import re
 import sys
+import threading
 import warnings
 from contextlib import redirect_stderr
 from dataclasses import dataclass
 from io import StringIO
-from typing import Any, Dict, Tuple
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Suppress TensorFlow/CUDA/absl warnings before importing torch
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
@@ -28,6 +31,8 @@ from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
 # raise ValueError("C")
 
+DONUT_MODEL_NAME: str = "naver-clova-ix/donut-base-finetuned-cord-v2"
+
 
 @dataclass
 class DonutLabel:
@@ -42,24 +47,48 @@ class DonutLabel:
 class DonutAI:
     def __init__(
         self,
+        *,
+        greedy: bool = False,
+        backend: str = "torch",
+        model_dir: Optional[str] = None,
     ):
+        """Loads the model once, on the GPU if there is one. With greedy, the
+        text is decoded with a single beam instead of two, which is faster on
+        a CPU, but can parse some receipts less accurately. The model is
+        loaded from model_dir if it is given, otherwise from the Hugging Face
+        hub. See load_donut_model for the backends."""
 
         # Only import if model is called.
         from transformers import (
             DonutProcessor,  # TODO: resolve and/or silence warning.
         )
-        from transformers import VisionEncoderDecoderModel  # Throws warning.
 
         self.name = "Donut"
+        self.backend: str = backend
+        model_path: str = model_dir or DONUT_MODEL_NAME
         self.processor = DonutProcessor.from_pretrained(
-            "naver-clova-ix/donut-base-finetuned-cord-v2",
+            model_path,
             use_fast=True,
         )
 
-        self.model = VisionEncoderDecoderModel.from_pretrained(
-            "naver-clova-ix/donut-base-finetuned-cord-v2"
+        self.device = (
+            "cuda"
+            if backend == "torch" and torch.cuda.is_available()
+            else "cpu"
+        )
+        self.model = load_donut_model(
+            backend=backend, model_path=model_path, device=self.device
+        )
+        self.num_beams: int = 1 if greedy else 2
+        self.revision: Optional[str] = get_model_revision(
+            model_path=model_path, model=self.model
         )
 
+        self.task_prompt: str = "<s_cord-v2>"
+        self.decoder_input_ids = self.processor.tokenizer(
+            self.task_prompt, add_special_tokens=False, return_tensors="pt"
+        )["input_ids"].to(self.device)
+
     def image_path_to_receipt(
         self, receipt_filepath: str
     ) -> Tuple[str, Receipt]:
@@ -70,54 +99,85 @@ class DonutAI:
         receipt: Receipt = self._json_object_to_receipt(json_object=json_object)
         return json_object, receipt
 
+    def images_to_receipts(
+        self, *, receipt_filepaths: List[str], batch_size: int = 4
+    ) -> Iterator[Tuple[Any, Receipt]]:
+        """Yields the (json, receipt) of each image, in the order of the
+        receipt_filepaths, as soon as its batch is parsed. A background
+        thread loads and preprocesses the next batch of images while the
+        model parses the current one."""
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got:{batch_size}")
+        for pixel_values in _prefetch_batches(
+            batches=(
+                receipt_filepaths[start : start + batch_size]
+                for start in range(0, len(receipt_filepaths), batch_size)
+            ),
+            prepare_batch=self._prepare_images_for_ai_inference,
+        ):
+            for json_object in self._images_to_texts(pixel_values):
+                yield (
+                    json_object,
+                    self._json_object_to_receipt(json_object=json_object),
+                )
+
     def _prepare_image_for_ai_inference(self, receipt_filepath: str) -> Any:
-        image = Image.open(receipt_filepath).convert("RGB")
-        # preparing the image
-        pixel_values = self.processor(
-            image, return_tensors="pt", legacy=False
+        return self._prepare_images_for_ai_inference([receipt_filepath])
+
+    def _prepare_images_for_ai_inference(
+        self, receipt_filepaths: List[str]
+    ) -> Any:
+        """Returns the pixel values of the images as a single batch. The
+        processor resizes and pads all images to the input size of the
+        model."""
+        images = []
+        for receipt_filepath in receipt_filepaths:
+            with Image.open(receipt_filepath) as image:
+                images.append(image.convert("RGB"))
+        return self.processor(
+            images, return_tensors="pt", legacy=False
         ).pixel_values
-        return pixel_values
 
     def _prepped_image_to_json(self, pixel_values: Any) -> Receipt:
         json_result = self._image_to_text(pixel_values)
         return json_result
 
     def _image_to_text(self, pixel_values) -> float:
-        task_prompt = "<s_cord-v2>"
-        decoder_input_ids = self.processor.tokenizer(
-            task_prompt, add_special_tokens=False, return_tensors="pt"
-        )["input_ids"]
-
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(device)
-
-        # generate output
-        outputs = self.model.generate(
-            pixel_values.to(device),
-            decoder_input_ids=decoder_input_ids.to(device),
-            max_length=self.model.decoder.config.max_position_embeddings,
-            early_stopping=True,
-            pad_token_id=self.processor.tokenizer.pad_token_id,
-            eos_token_id=self.processor.tokenizer.eos_token_id,
-            use_cache=True,
-            num_beams=2,
-            bad_words_ids=[[self.processor.tokenizer.unk_token_id]],
-            return_dict_in_generate=True,
-            output_scores=True,
-        )
+        return self._images_to_texts(pixel_values)[0]
+
+    def _images_to_texts(self, pixel_values) -> List[Any]:
+        """Returns the parsed json of each image in the batch."""
+        generate_kwargs: Dict[str, Any] = {}
+        if self.num_beams > 1:
+            generate_kwargs["early_stopping"] = True
+
+        # generate output, without tracking gradients.
+        with torch.inference_mode():
+            sequences = self.model.generate(
+                pixel_values.to(self.device),
+                decoder_input_ids=self.decoder_input_ids.expand(
+                    pixel_values.shape[0], -1
+                ),
+                max_length=self.model.config.decoder.max_position_embeddings,
+                pad_token_id=self.processor.tokenizer.pad_token_id,
+                eos_token_id=self.processor.tokenizer.eos_token_id,
+                use_cache=True,
+                num_beams=self.num_beams,
+                bad_words_ids=[[self.processor.tokenizer.unk_token_id]],
+                **generate_kwargs,
+            )
 
-        # clean the response
-        sequence = self.processor.batch_decode(outputs.sequences, legacy=False)[
-            0
-        ]
-        sequence = sequence.replace(
-            self.processor.tokenizer.eos_token, ""
-        ).replace(self.processor.tokenizer.pad_token, "")
-        sequence = re.sub(r"<.*?>", "", sequence, count=1).strip()
+        results: List[Any] = []
+        for sequence in self.processor.batch_decode(sequences, legacy=False):
+            # clean the response
+            sequence = sequence.replace(
+                self.processor.tokenizer.eos_token, ""
+            ).replace(self.processor.tokenizer.pad_token, "")
+            sequence = re.sub(r"<.*?>", "", sequence, count=1).strip()
 
-        # convert response to json
-        result = self.processor.token2json(sequence)
-        return result
+            # convert response to json
+            results.append(self.processor.token2json(sequence))
+        return results
 
     def _json_object_to_receipt(self, json_object: str) -> Receipt:
         return json_object
@@ -125,3 +185,111 @@ class DonutAI:
     @typechecked
     def get_name(self) -> str:
         return self.name
+
+    @typechecked
+    def get_cache_params(self) -> Dict[str, Any]:
+        """Returns the model revision and the (preprocessing and decoding)
+        parameters that the inferred json depends on."""
+        return {
+            "name": self.name,
+            "revision": self.revision,
+            "backend": self.backend,
+            "num_beams": self.num_beams,
+            "task_prompt": self.task_prompt,
+            "image_processor": self.processor.image_processor.to_dict(),
+        }
+
+
+@typechecked
+def load_donut_model(*, backend: str, model_path: str, device: str) -> Any:
+    """Returns the Donut model of model_path (a local dir or a hub name), in
+    eval mode and on the device, for the backend:
+    - torch: the model as published.
+    - quantized: the linear layers, which do most of the work, are
+    dynamically quantized to int8. Only runs on the CPU.
+    - onnx: the ONNX export in model_path, run by ONNX Runtime (through
+    optimum) on the CPU."""
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForVision2Seq
+        except ImportError as e:
+            raise ImportError(
+                "The onnx receipt_ai backend needs optimum[onnxruntime]:"
+                " pip install optimum[onnxruntime]"
+            ) from e
+        return ORTModelForVision2Seq.from_pretrained(model_path)
+
+    from transformers import VisionEncoderDecoderModel  # Throws warning.
+
+    model = VisionEncoderDecoderModel.from_pretrained(model_path)
+    model.eval()
+    if backend == "torch":
+        return model.to(device)
+    if backend == "quantized":
+        if device != "cpu":
+            raise ValueError(
+                f"The quantized Donut model only runs on the cpu, not:{device}"
+            )
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    raise ValueError(f"Unknown Donut backend:{backend}")
+
+
+@typechecked
+def get_model_revision(*, model_path: str, model: Any) -> Optional[str]:
+    """Returns the commit hash of a model from the hub, or for a local model
+    dir the hash of the names, sizes and modification times of its files."""
+    if not os.path.isdir(model_path):
+        return getattr(model.config, "_commit_hash", None)
+    hasher = hashlib.sha256()
+    for dirpath, _, filenames in sorted(os.walk(model_path)):
+        for filename in sorted(filenames):
+            filepath: str = os.path.join(dirpath, filename)
+            stat_result = os.stat(filepath)
+            hasher.update(
+                f"{os.path.relpath(filepath, model_path)}:{stat_result.st_size}"
+                f":{stat_result.st_mtime_ns}\n".encode()
+            )
+    return hasher.hexdigest()
+
+
+def _prefetch_batches(
+    *,
+    batches: Iterator[List[str]],
+    prepare_batch: Callable[[List[str]], Any],
+    queue_size: int = 2,
+) -> Iterator[Any]:
+    """Yields the prepared batches, while a background thread prepares up to
+    queue_size next batches. An error in the thread is raised here."""
+    prepared_batches: "Queue[Tuple[bool, Any]]" = Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def prepare_all() -> None:
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    return
+                prepared_batches.put((True, prepare_batch(batch)))
+            prepared_batches.put((False, None))
+        except Exception as error:
+            prepared_batches.put((False, error))
+
+    worker = threading.Thread(target=prepare_all, daemon=True)
+    worker.start()
+    try:
+        while True:
+            has_batch, value = prepared_batches.get()
+            if not has_batch:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        # Unblock the thread if the consumer stops early.
+        stop.set()
+        while worker.is_alive():
+            try:
+                prepared_batches.get(timeout=0.1)
+            except Empty:
+                pass
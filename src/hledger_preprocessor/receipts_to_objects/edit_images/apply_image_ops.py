@@ -0,0 +1,216 @@
+"""Applies the rotate and crop operations that are recorded in the processing
+metadata sidecars of the receipt images again, without the interactive
+windows, e.g. after moving the raw images or changing the output format. The
+images are processed in parallel by a process pool, as decoding, rotating
+and encoding full resolution images is CPU bound."""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.ReceiptImgConfig import ReceiptImgConfig
+from hledger_preprocessor.helper import get_images_in_folder
+from hledger_preprocessor.profiling.Profiler import count
+
+# Formats that can not store an alpha channel or palette.
+_RGB_ONLY_EXTENSIONS = {".jpg", ".jpeg"}
+
+
+@dataclass(frozen=True)
+class ImageOpsTask:
+    """The sidecar of a raw receipt image and where its results go."""
+
+    metadata_path: str
+    raw_img_filepath: str
+    rotated_path: str
+    cropped_path: str
+
+
+def _save_image(*, image: Image.Image, output_path: str) -> None:
+    extension: str = Path(output_path).suffix.lower()
+    if extension in _RGB_ONLY_EXTENSIONS and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.save(output_path)
+
+
+@typechecked
+def save_rotated_image(
+    *, image_path: str, angle_degrees: Union[int, float], output_path: str
+) -> None:
+    """Saves the image rotated clockwise by angle_degrees. Also saves it for
+    a rotation of 0 degrees, such that the crop reads the rotated image."""
+    with Image.open(image_path) as image:
+        if angle_degrees != 0:
+            _save_image(
+                image=image.rotate(-angle_degrees, expand=True),
+                output_path=output_path,
+            )
+        else:
+            _save_image(image=image, output_path=output_path)
+
+
+@typechecked
+def save_cropped_image(
+    *, image_path: str, crop_coords: List[float], output_path: str
+) -> None:
+    """Saves the [x1, y1, x2, y2] crop (normalized 0 to 1) of the image. The
+    receipt label folders are named after the hash of the cropped image, so
+    the interactive and batch crops both use this, to write the same
+    bytes."""
+    with Image.open(image_path) as image:
+        width, height = image.size
+        x1, y1, x2, y2 = (
+            int(coord * dim)
+            for coord, dim in zip(crop_coords, [width, height, width, height])
+        )
+        _save_image(image=image.crop((x1, y1, x2, y2)), output_path=output_path)
+
+
+def _apply_image_ops(task: ImageOpsTask) -> Optional[Exception]:
+    """Applies the operations of the sidecar to its raw image, and points the
+    sidecar to the written images. As in the interactive flow, the crop is
+    applied to the saved rotated image. Returns the error instead of raising
+    it, such that the errors of all images are reported together.
+    Module-level, so that the process pool can pickle it."""
+    try:
+        with open(task.metadata_path) as f:
+            metadata: Dict[str, Any] = json.load(f)
+        image_path: str = task.raw_img_filepath
+        for operation in metadata["operations"]:
+            if not operation.get("applied"):
+                continue
+            if operation["type"] == "rotate":
+                save_rotated_image(
+                    image_path=image_path,
+                    angle_degrees=operation["angle_degrees"],
+                    output_path=task.rotated_path,
+                )
+                metadata["rotated_path"] = task.rotated_path
+                image_path = task.rotated_path
+            elif operation["type"] == "crop":
+                coordinates: Dict[str, float] = operation["coordinates"]
+                save_cropped_image(
+                    image_path=image_path,
+                    crop_coords=[
+                        coordinates[name] for name in ["x1", "y1", "x2", "y2"]
+                    ],
+                    output_path=task.cropped_path,
+                )
+                metadata["cropped_path"] = task.cropped_path
+                image_path = task.cropped_path
+            else:
+                raise ValueError(f"Unknown operation:{operation['type']}")
+        metadata["original_path"] = task.raw_img_filepath
+
+        tmp_filepath: str = f"{task.metadata_path}.tmp"
+        with open(tmp_filepath, "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_filepath, task.metadata_path)
+    except Exception as error:  # Reported per image by apply_image_ops.
+        return error
+    return None
+
+
+@typechecked
+def get_image_ops_tasks(*, config: Config) -> List[ImageOpsTask]:
+    """Returns a task per processing metadata sidecar in the processed images
+    dir. A raw image that is no longer at its recorded path is looked up by
+    its filename stem in the receipt images input dir."""
+    processed_dir: str = config.dir_paths.get_path(
+        "receipt_images_processed_dir", absolute=True
+    )
+    receipt_img_filenames: ReceiptImgConfig = config.file_names.receipt_img
+    raw_img_filepath_per_stem: Optional[Dict[str, str]] = None
+
+    tasks: List[ImageOpsTask] = []
+    for filename in sorted(os.listdir(processed_dir)):
+        if not filename.endswith(receipt_img_filenames.processing_metadata_ext):
+            continue
+        metadata_path: str = os.path.join(processed_dir, filename)
+        with open(metadata_path) as f:
+            metadata: Any = json.load(f)
+        # Skip other files with the same extension, e.g. json labels.
+        if not isinstance(metadata, dict) or "operations" not in metadata:
+            continue
+
+        stem: str = filename[
+            : -len(receipt_img_filenames.processing_metadata_ext)
+        ]
+        raw_img_filepath: str = metadata.get("original_path", "")
+        if not os.path.isfile(raw_img_filepath):
+            if raw_img_filepath_per_stem is None:
+                raw_img_filepath_per_stem = {
+                    Path(filepath).stem: filepath
+                    for filepath in get_images_in_folder(
+                        folder_path=config.dir_paths.get_path(
+                            "receipt_images_input_dir", absolute=True
+                        )
+                    )
+                }
+            if stem not in raw_img_filepath_per_stem:
+                raise FileNotFoundError(
+                    f"The raw image:{raw_img_filepath} of:{metadata_path} was"
+                    f" not found, nor an image named:{stem} in the receipt"
+                    " images input dir."
+                )
+            raw_img_filepath = raw_img_filepath_per_stem[stem]
+
+        tasks.append(
+            ImageOpsTask(
+                metadata_path=metadata_path,
+                raw_img_filepath=raw_img_filepath,
+                rotated_path=os.path.join(
+                    processed_dir,
+                    f"{stem}{receipt_img_filenames.rotate}"
+                    f"{receipt_img_filenames.rotate_ext}",
+                ),
+                cropped_path=os.path.join(
+                    processed_dir,
+                    f"{stem}{receipt_img_filenames.crop}"
+                    f"{receipt_img_filenames.crop_ext}",
+                ),
+            )
+        )
+    return tasks
+
+
+@typechecked
+def apply_image_ops(
+    *, tasks: List[ImageOpsTask], max_workers: Optional[int] = None
+) -> None:
+    """Applies the recorded operations of each task, with max_workers
+    processes (default: one per CPU), or in this process for 1 worker.
+
+    Raises:
+        ValueError: listing each sidecar whose operations could not be
+            applied.
+    """
+    results: List[Optional[Exception]]
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_apply_image_ops(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_apply_image_ops, tasks))
+    count("receipt_images_processed", len(tasks))
+
+    errors: List[Tuple[str, Exception]] = [
+        (task.metadata_path, error)
+        for task, error in zip(tasks, results)
+        if error is not None
+    ]
+    if errors:
+        raise ValueError(
+            f"Could not apply the operations of {len(errors)} of the"
+            f" {len(tasks)} receipt images:\n"
+            + "\n".join(
+                f"{metadata_path}: {type(error).__name__}: {error}"
+                for metadata_path, error in errors
+            )
+        ) from errors[0][1]
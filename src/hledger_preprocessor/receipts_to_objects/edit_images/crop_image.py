@@ -1,20 +1,32 @@
 import json
 import os
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 import cv2
 import numpy as np
-from PIL import Image
 from typeguard import typechecked
 
 from hledger_preprocessor.config.load_config import Config
 from hledger_preprocessor.generics.enums import EnumEncoder
+from hledger_preprocessor.receipts_to_objects.edit_images.apply_image_ops import (
+    save_cropped_image,
+)
 
 # Import drawing functions from the shared module
+from hledger_preprocessor.receipts_to_objects.edit_images.display_images import (
+    DisplayImagePrefetcher,
+    load_display_image,
+)
 from hledger_preprocessor.receipts_to_objects.edit_images.drawing import (
     draw_crop_overlay,
 )
+from hledger_preprocessor.receipts_to_objects.edit_images.propose_image_ops import (
+    CropCoords,
+    ImageOpsProposal,
+    ImageOpsProposals,
+    propose_crop,
+)
 from hledger_preprocessor.TransactionObjects.Receipt import (  # For image handling
     ExchangedItem,
     Receipt,
@@ -27,6 +39,8 @@ def crop_and_save_image(
     output_path: str,
     max_window_width: int = 1280,
     max_window_height: int = 720,
+    initial_crop_coords: Optional[CropCoords] = None,
+    display_source: Optional[np.ndarray] = None,
 ) -> Union[List[float], bool]:
     """
     Opens an image, displays it scaled to fit the OpenCV window, allows user to manually set
@@ -40,21 +54,26 @@ def crop_and_save_image(
         output_path (str): Path to save the cropped image
         max_window_width (int): Maximum width of the display window (default: 1280)
         max_window_height (int): Maximum height of the display window (default: 720)
+        initial_crop_coords (Optional[CropCoords]): Crop coordinates [x1, y1, x2, y2] to start from, e.g. a proposed crop (default: [0.2, 0.2, 0.8, 0.8])
+        display_source (Optional[np.ndarray]): Downscaled BGR copy of the image to display, e.g. prefetched (default: loaded from image_path)
 
     Returns:
         Union[List[float], bool]: List of crop coordinates [x1, y1, x2, y2] (normalized 0 to 1)
                                  or False if operation is cancelled
     """
+    # The full resolution image is only decoded when it is cropped.
     try:
-        pil_image = Image.open(image_path)
+        if display_source is None:
+            display_source = load_display_image(image_path=image_path)
     except Exception as e:
         print(f"Error loading image: {e}")
         return False
 
-    cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-    img_height, img_width = cv_image.shape[:2]
-
-    crop_coords = [0.2, 0.2, 0.8, 0.8]  # [x1, y1, x2, y2]
+    crop_coords = (  # [x1, y1, x2, y2]
+        [0.2, 0.2, 0.8, 0.8]
+        if initial_crop_coords is None
+        else list(initial_crop_coords)
+    )
     current_coord = 0  # Tracks which coordinate is being edited for numerical input (0: x1, 1: y1, 2: x2, 3: y2)
     input_value = ""  # String to build numerical input
     alt_pressed = False  # Track Alt key state (reset after each key event)
@@ -80,7 +99,7 @@ def crop_and_save_image(
     ) -> np.ndarray:
         return draw_crop_overlay(image, coords, active)
 
-    display_image = resize_to_fit(cv_image, max_width, max_window_height)
+    display_image = resize_to_fit(display_source, max_width, max_window_height)
 
     cv2.namedWindow("Crop Image", cv2.WINDOW_NORMAL)
     cv2.resizeWindow(
@@ -133,15 +152,12 @@ def crop_and_save_image(
                     and crop_coords[1] < crop_coords[3]
                     and all(0 <= c <= 1 for c in crop_coords)
                 ):
-                    x1, y1, x2, y2 = (
-                        int(c * dim)
-                        for c, dim in zip(
-                            crop_coords,
-                            [img_width, img_height, img_width, img_height],
-                        )
+                    # As the batch --apply-image-ops does.
+                    save_cropped_image(
+                        image_path=image_path,
+                        crop_coords=crop_coords,
+                        output_path=output_path,
                     )
-                    cropped_image = pil_image.crop((x1, y1, x2, y2))
-                    cropped_image.save(output_path)
                     print(f"Cropped image saved to {output_path}")
                     break
                 else:
@@ -236,11 +252,65 @@ def crop_and_save_image(
     return crop_coords
 
 
+@typechecked
+def get_initial_crop_coords(
+    *,
+    proposal: Optional[ImageOpsProposal],
+    rotation_angle: int,
+    rotated_path: str,
+) -> Optional[CropCoords]:
+    """Returns the proposed crop if the image was rotated as proposed, or
+    else detects the crop in the rotated image."""
+    if proposal is not None and proposal.angle_degrees == rotation_angle:
+        return proposal.crop_coords
+    try:
+        return propose_crop(image_filepath=rotated_path)
+    except Exception as e:
+        print(f"Could not propose the crop: {e}")
+        return None
+
+
 @typechecked
 def crop_images(
-    *, raw_receipt_img_filepaths: List[str], config: "Config"
+    *,
+    raw_receipt_img_filepaths: List[str],
+    config: "Config",
+    proposals: Optional[ImageOpsProposals] = None,
 ) -> None:
-    """Crop images and save metadata with crop coordinates, ensuring images are rotated first."""
+    """Crop images and save metadata with crop coordinates, ensuring images are rotated first. Each image starts with its proposed crop, if proposals are given."""
+    # Loads the next rotated images while the user crops the current one.
+    prefetcher = DisplayImagePrefetcher()
+    try:
+        _crop_images(
+            raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+            config=config,
+            proposals=proposals,
+            prefetcher=prefetcher,
+        )
+    finally:
+        prefetcher.close()
+
+
+def _crop_images(
+    *,
+    raw_receipt_img_filepaths: List[str],
+    config: "Config",
+    proposals: Optional[ImageOpsProposals],
+    prefetcher: DisplayImagePrefetcher,
+) -> None:
+    processed_dir: str = config.dir_paths.get_path(
+        "receipt_images_processed_dir", absolute=True
+    )
+    # The rotated images that are probably cropped next.
+    next_rotated_paths: List[str] = [
+        os.path.join(
+            processed_dir,
+            f"{Path(raw_receipt_img_filepath).stem}"
+            f"{config.file_names.receipt_img.rotate}"
+            f"{config.file_names.receipt_img.rotate_ext}",
+        )
+        for raw_receipt_img_filepath in raw_receipt_img_filepaths
+    ]
     current_index = 0
     while current_index < len(raw_receipt_img_filepaths):
         raw_receipt_img_filepath = raw_receipt_img_filepaths[current_index]
@@ -293,8 +363,30 @@ def crop_images(
             )
 
         print(f"cropped_path={cropped_path}")
+        initial_crop_coords: Optional[CropCoords] = None
+        if proposals is not None:
+            initial_crop_coords = get_initial_crop_coords(
+                proposal=proposals.get(image_filepath=raw_receipt_img_filepath),
+                rotation_angle=next(
+                    op["angle_degrees"]
+                    for op in metadata["operations"]
+                    if op["type"] == "rotate" and op["applied"]
+                ),
+                rotated_path=rotated_path,
+            )
+        try:
+            display_source: Optional[np.ndarray] = prefetcher.get(
+                image_path=rotated_path,
+                next_image_paths=next_rotated_paths[current_index + 1 :],
+            )
+        except Exception as e:
+            print(f"Error loading image: {e}")
+            display_source = None
         crop_result = crop_and_save_image(
-            image_path=rotated_path, output_path=cropped_path
+            image_path=rotated_path,
+            output_path=cropped_path,
+            initial_crop_coords=initial_crop_coords,
+            display_source=display_source,
         )
 
         if crop_result is False and current_index > 0:
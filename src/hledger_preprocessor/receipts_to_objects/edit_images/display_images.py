@@ -0,0 +1,107 @@
+"""Loads the downscaled copies of the receipt images that the rotate and crop
+windows show, ahead of time in a background thread. The windows rotate and
+resize these copies, and only apply the rotation or crop to the full
+resolution image when it is saved."""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+from typeguard import typechecked
+
+from hledger_preprocessor.image_access import PREVIEW_SIZE, open_preview_image
+
+DISPLAY_SIZE: int = PREVIEW_SIZE
+# The number of next images that are loaded ahead of time.
+PREFETCH_COUNT: int = 3
+
+
+@typechecked
+def load_display_image(
+    *, image_path: str, display_size: int = DISPLAY_SIZE
+) -> np.ndarray:
+    """Returns a BGR copy of the preview of the image, that fits in a
+    display_size square."""
+    display_image: Image.Image = open_preview_image(
+        image_path=image_path, max_size=display_size
+    )
+    # RGB to BGR, for OpenCV.
+    return np.ascontiguousarray(np.asarray(display_image)[:, :, ::-1])
+
+
+@typechecked
+def rotate_display_image(
+    *, display_image: np.ndarray, angle_degrees: int
+) -> np.ndarray:
+    """Returns the display copy rotated clockwise, like the full resolution
+    image is rotated on save. Quarter turns only reorder the pixels."""
+    angle_degrees %= 360
+    if angle_degrees % 90 == 0:
+        return np.ascontiguousarray(
+            np.rot90(display_image, k=-(angle_degrees // 90))
+        )
+    return np.asarray(
+        Image.fromarray(display_image).rotate(-angle_degrees, expand=True)
+    )
+
+
+class DisplayImagePrefetcher:
+    """Returns the display copies of the images, and loads those of the next
+    images in a background thread while the user looks at the current one.
+    The copies of the last few images are kept, to go back without delay."""
+
+    @typechecked
+    def __init__(
+        self,
+        *,
+        prefetch_count: int = PREFETCH_COUNT,
+        display_size: int = DISPLAY_SIZE,
+    ):
+        self.prefetch_count: int = prefetch_count
+        self.display_size: int = display_size
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Least recently used first.
+        self.display_images: "OrderedDict[str, Future[np.ndarray]]" = (
+            OrderedDict()
+        )
+
+    @typechecked
+    def get(
+        self, *, image_path: str, next_image_paths: List[str]
+    ) -> np.ndarray:
+        """Returns the display copy of the image, and starts loading those of
+        the first prefetch_count next_image_paths."""
+        future: Optional["Future[np.ndarray]"] = self.display_images.get(
+            image_path
+        )
+        if future is None:
+            future = self.executor.submit(
+                load_display_image,
+                image_path=image_path,
+                display_size=self.display_size,
+            )
+            self.display_images[image_path] = future
+        self.display_images.move_to_end(image_path)
+
+        for next_image_path in next_image_paths[: self.prefetch_count]:
+            if next_image_path not in self.display_images:
+                self.display_images[next_image_path] = self.executor.submit(
+                    load_display_image,
+                    image_path=next_image_path,
+                    display_size=self.display_size,
+                )
+        while len(self.display_images) > 2 * self.prefetch_count + 1:
+            _, evicted = self.display_images.popitem(last=False)
+            evicted.cancel()
+
+        try:
+            return future.result()
+        except Exception:
+            # Load it again, such that a changed or fixed file is retried.
+            self.display_images.pop(image_path, None)
+            raise
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
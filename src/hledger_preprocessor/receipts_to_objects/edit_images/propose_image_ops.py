@@ -0,0 +1,223 @@
+"""Proposes the rotation and crop of receipt images, such that the rotate and
+crop windows open with them instead of with no rotation and a fixed crop box.
+
+The rotation is the quarter turn of the EXIF orientation, plus the turn that
+makes the detected receipt upright (receipts are longer than wide), plus its
+skew, from the orientation of the receipt contour or else of the Hough lines
+in the image. The crop is the bounding box of the receipt contour in the
+rotated image. The detection runs on a downscaled grayscale copy of the
+image, in a background process pool."""
+
+import math
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+from typeguard import typechecked
+
+from hledger_preprocessor.image_access import (
+    open_preview_image,
+    set_thumbnail_cache_dir,
+)
+
+# The detection runs on images of at most this size, in pixels.
+DETECTION_SIZE: int = 800
+# Skews beyond this many degrees are more likely wrong detections.
+MAX_SKEW_DEGREES: int = 15
+# The receipt must cover this share of the image to propose a crop.
+MIN_RECEIPT_AREA_SHARE: float = 0.1
+CROP_MARGIN: float = 0.01
+
+# Clockwise rotation in degrees that shows the image upright, per EXIF
+# orientation tag, as PIL does not apply the tag when opening the image.
+_EXIF_ORIENTATION_TAG: int = 0x0112
+_ROTATION_PER_EXIF_ORIENTATION: Dict[int, int] = {3: 180, 6: 90, 8: 270}
+
+CropCoords = Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class ImageOpsProposal:
+    """The clockwise rotation in degrees, as rotate_and_save_image uses it,
+    and the [x1, y1, x2, y2] crop in the rotated image, normalized to 0-1,
+    as crop_and_save_image uses it. The crop is None if no receipt was
+    found."""
+
+    angle_degrees: int
+    crop_coords: Optional[CropCoords]
+
+
+def _load_gray(*, image_filepath: str) -> Tuple[Image.Image, int]:
+    """Returns the downscaled grayscale image, and the rotation of its EXIF
+    orientation. The image is downscaled from its (cached) preview, which
+    the rotate and crop windows then show."""
+    with Image.open(image_filepath) as image:
+        exif_angle: int = _ROTATION_PER_EXIF_ORIENTATION.get(
+            image.getexif().get(_EXIF_ORIENTATION_TAG, 1), 0
+        )
+    gray: Image.Image = open_preview_image(image_path=image_filepath).convert(
+        "L"
+    )
+    gray.thumbnail((DETECTION_SIZE, DETECTION_SIZE))
+    return gray, exif_angle
+
+
+def _find_receipt_contour(*, gray: np.ndarray) -> Optional[np.ndarray]:
+    """Returns the largest bright region, the paper of the receipt, if it
+    covers enough of the image but not all of it."""
+    blurred: np.ndarray = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, mask = cv2.threshold(
+        blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
+    )
+    # Close the dark text on the paper.
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
+    contours, _ = cv2.findContours(
+        mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
+    if not contours:
+        return None
+    contour: np.ndarray = max(contours, key=cv2.contourArea)
+    image_area: int = gray.shape[0] * gray.shape[1]
+    if not (
+        MIN_RECEIPT_AREA_SHARE * image_area
+        <= cv2.contourArea(contour)
+        < 0.98 * image_area
+    ):
+        return None
+    return contour
+
+
+def _get_contour_rotation(*, contour: np.ndarray) -> int:
+    """Returns the clockwise rotation that makes the long side of the receipt
+    vertical, from the minimum area rectangle around it."""
+    corners: np.ndarray = cv2.boxPoints(cv2.minAreaRect(contour))
+    sides: List[np.ndarray] = [corners[1] - corners[0], corners[2] - corners[1]]
+    long_side: np.ndarray = max(sides, key=lambda side: np.hypot(*side))
+    # The angle of the long side to the vertical axis, in [-90, 90).
+    angle: float = math.degrees(math.atan2(long_side[0], long_side[1]))
+    return round((angle + 90) % 180 - 90)
+
+
+def _get_hough_skew(*, gray: np.ndarray) -> int:
+    """Returns the clockwise rotation that makes the (near) horizontal lines
+    in the image, such as the text lines and rules, horizontal."""
+    edges: np.ndarray = cv2.Canny(gray, 50, 150)
+    lines: Optional[np.ndarray] = cv2.HoughLinesP(
+        edges,
+        rho=1,
+        theta=np.pi / 360,
+        threshold=80,
+        minLineLength=gray.shape[1] // 4,
+        maxLineGap=10,
+    )
+    if lines is None:
+        return 0
+    angles: List[float] = []
+    for x1, y1, x2, y2 in lines.reshape(-1, 4):
+        angle: float = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        angle = (angle + 90) % 180 - 90
+        if abs(angle) <= MAX_SKEW_DEGREES:
+            angles.append(angle)
+    if not angles:
+        return 0
+    return -round(float(np.median(angles)))
+
+
+def _get_crop_coords(*, gray: Image.Image) -> Optional[CropCoords]:
+    """Returns the bounding box of the receipt, with a small margin."""
+    gray_array: np.ndarray = np.asarray(gray)
+    contour: Optional[np.ndarray] = _find_receipt_contour(gray=gray_array)
+    if contour is None:
+        return None
+    x, y, width, height = cv2.boundingRect(
+        cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+    )
+    image_height, image_width = gray_array.shape
+    return (
+        max(x / image_width - CROP_MARGIN, 0.0),
+        max(y / image_height - CROP_MARGIN, 0.0),
+        min((x + width) / image_width + CROP_MARGIN, 1.0),
+        min((y + height) / image_height + CROP_MARGIN, 1.0),
+    )
+
+
+@typechecked
+def propose_image_ops(*, image_filepath: str) -> ImageOpsProposal:
+    """Returns the proposed rotation and crop of the image."""
+    gray, angle_degrees = _load_gray(image_filepath=image_filepath)
+    upright: np.ndarray = np.asarray(gray.rotate(-angle_degrees, expand=True))
+
+    contour: Optional[np.ndarray] = _find_receipt_contour(gray=upright)
+    if contour is not None:
+        rotation: int = _get_contour_rotation(contour=contour)
+        # In between a skew and a quarter turn, the receipt is not a rectangle.
+        if MAX_SKEW_DEGREES < abs(rotation) < 90 - MAX_SKEW_DEGREES:
+            rotation = 0
+    else:
+        rotation = _get_hough_skew(gray=upright)
+    angle_degrees = (angle_degrees + rotation) % 360
+
+    return ImageOpsProposal(
+        angle_degrees=angle_degrees,
+        crop_coords=_get_crop_coords(
+            gray=gray.rotate(-angle_degrees, expand=True)
+        ),
+    )
+
+
+@typechecked
+def propose_crop(*, image_filepath: str) -> Optional[CropCoords]:
+    """Returns the proposed crop of an image that is already rotated."""
+    gray, _ = _load_gray(image_filepath=image_filepath)
+    return _get_crop_coords(gray=gray)
+
+
+class ImageOpsProposals:
+    """Proposes the rotation and crop of the images in a background process
+    pool, in their order, while the user rotates and crops the first ones.
+    The workers read and write the previews in the thumbnail_cache_dir, if
+    it is given."""
+
+    @typechecked
+    def __init__(
+        self,
+        *,
+        image_filepaths: List[str],
+        max_workers: Optional[int] = None,
+        thumbnail_cache_dir: Optional[str] = None,
+    ):
+        # Set in each worker, as a spawned worker does not inherit it.
+        self.pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=partial(
+                set_thumbnail_cache_dir, cache_dir=thumbnail_cache_dir
+            ),
+        )
+        self.futures: Dict[str, "Future[ImageOpsProposal]"] = {
+            image_filepath: self.pool.submit(
+                propose_image_ops, image_filepath=image_filepath
+            )
+            for image_filepath in image_filepaths
+        }
+
+    @typechecked
+    def get(self, *, image_filepath: str) -> Optional[ImageOpsProposal]:
+        """Returns the proposal of the image, waiting for it if it is not
+        done yet, or None if there is none."""
+        future: Optional["Future[ImageOpsProposal]"] = self.futures.get(
+            image_filepath
+        )
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as error:  # The user then rotates and crops it.
+            print(f"Could not propose the rotation and crop: {error}")
+            return None
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
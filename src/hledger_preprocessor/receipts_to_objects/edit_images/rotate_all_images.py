@@ -1,16 +1,27 @@
 import json
 import os
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 import cv2
 import numpy as np
 import screeninfo  # Required for getting screen resolution
-from PIL import Image
 from typeguard import typechecked
 
 from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.config.ReceiptImgConfig import ReceiptImgConfig
+from hledger_preprocessor.receipts_to_objects.edit_images.apply_image_ops import (
+    save_rotated_image,
+)
+from hledger_preprocessor.receipts_to_objects.edit_images.display_images import (
+    DisplayImagePrefetcher,
+    load_display_image,
+    rotate_display_image,
+)
+from hledger_preprocessor.receipts_to_objects.edit_images.propose_image_ops import (
+    ImageOpsProposal,
+    ImageOpsProposals,
+)
 
 
 @typechecked
@@ -20,6 +31,8 @@ def rotate_and_save_image(
     output_path: str,
     max_window_width: int = 1280,
     max_window_height: int = 720,
+    initial_angle: int = 0,
+    display_source: Optional[np.ndarray] = None,
 ) -> Union[int, bool]:
     """
     Opens an image, displays it scaled to fit the OpenCV window, allows user to rotate it by pressing
@@ -30,21 +43,27 @@ def rotate_and_save_image(
         output_path (str): Path to save the rotated image
         max_window_width (int): Maximum width of the display window (default: 1280)
         max_window_height (int): Maximum height of the display window (default: 720)
+        initial_angle (int): Rotation angle in degrees to start from, e.g. a proposed rotation (default: 0)
+        display_source (Optional[np.ndarray]): Downscaled BGR copy of the image to display, e.g. prefetched (default: loaded from image_path)
 
     Returns:
-        Union[int, bool]: Rotation angle in degrees (0, 90, 180, 270) or False if reverting to previous image
+        Union[int, bool]: Rotation angle in degrees (0, 90, 180, 270, plus the skew of the initial_angle) or False if reverting to previous image
     """
-    # Load image with PIL for rotation
     try:
-        pil_image = Image.open(image_path)
+        if display_source is None:
+            display_source = load_display_image(image_path=image_path)
     except Exception as e:
         print(f"Error loading image: {e}")
         return False
 
-    # Convert PIL image to OpenCV format for display
-    cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-    rotation_angle = 0  # Cumulative rotation in degrees
-    angle_history = [0]  # Store history of rotation angles, starting with 0
+    rotation_angle = initial_angle % 360  # Cumulative rotation in degrees
+    # Store history of rotation angles, starting with the initial angle
+    angle_history = [rotation_angle]
+
+    # Rotate the downscaled copy for display
+    cv_image = rotate_display_image(
+        display_image=display_source, angle_degrees=rotation_angle
+    )
 
     # Set maximum window dimensions
     max_width, max_height = max_window_width, max_window_height
@@ -83,23 +102,17 @@ def rotate_and_save_image(
             key = cv2.waitKey(0) & 0xFF  # Wait for a keypress
 
             if key == 13:  # Enter key
-                if rotation_angle != 0:
-                    # Save the rotated image using original PIL image
-                    rotated_image = pil_image.rotate(
-                        -rotation_angle, expand=True
-                    )
-                    rotated_image.save(output_path)
-                    print(
-                        f"Rotated: {rotation_angle} [degrees], image saved to"
-                        f" {output_path}"
-                    )
-                else:
-                    pil_image.save(output_path)
-                    print(
-                        f"Rotated: {rotation_angle} [degrees], image saved to"
-                        f" {output_path}"
-                    )
-
+                # Save the rotated image from the original image, as the batch
+                # --apply-image-ops does.
+                save_rotated_image(
+                    image_path=image_path,
+                    angle_degrees=rotation_angle,
+                    output_path=output_path,
+                )
+                print(
+                    f"Rotated: {rotation_angle} [degrees], image saved to"
+                    f" {output_path}"
+                )
                 break
             elif key == ord("r"):  # Rotate right (clockwise)
                 rotation_angle = (rotation_angle + 90) % 360
@@ -126,9 +139,8 @@ def rotate_and_save_image(
                 continue  # Ignore other keys
 
             # Update displayed image
-            pil_image_rotated = pil_image.rotate(-rotation_angle, expand=True)
-            cv_image = cv2.cvtColor(
-                np.array(pil_image_rotated), cv2.COLOR_RGB2BGR
+            cv_image = rotate_display_image(
+                display_image=display_source, angle_degrees=rotation_angle
             )
             display_image = resize_to_fit(cv_image, max_width, max_height)
             # Update window size if image dimensions change after rotation
@@ -148,16 +160,65 @@ def rotate_and_save_image(
 import json
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from typeguard import typechecked
 
 
+@typechecked
+def get_images_without_crop(
+    *, config: "Config", raw_receipt_img_filepaths: List[str]
+) -> List[str]:
+    """Returns the raw images whose metadata does not have an applied crop,
+    which are the images that are still rotated and/or cropped."""
+    images_without_crop: List[str] = []
+    for raw_receipt_img_filepath in raw_receipt_img_filepaths:
+        metadata_path = os.path.join(
+            config.dir_paths.get_path(
+                "receipt_images_processed_dir", absolute=True
+            ),
+            f"{Path(raw_receipt_img_filepath).stem}{config.file_names.receipt_img.processing_metadata_ext}",
+        )
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            if any(
+                op["type"] == "crop" and op["applied"]
+                for op in metadata["operations"]
+            ):
+                continue
+        images_without_crop.append(raw_receipt_img_filepath)
+    return images_without_crop
+
+
 @typechecked
 def rotate_images(
-    *, raw_receipt_img_filepaths: List[str], config: "Config"
+    *,
+    raw_receipt_img_filepaths: List[str],
+    config: "Config",
+    proposals: Optional[ImageOpsProposals] = None,
+) -> None:
+    """Rotate images and save metadata with rotation angle, skipping already rotated images if rotated image exists. Each image starts with its proposed rotation, if any."""
+    # Loads the next images while the user rotates the current one.
+    prefetcher = DisplayImagePrefetcher()
+    try:
+        _rotate_images(
+            raw_receipt_img_filepaths=raw_receipt_img_filepaths,
+            config=config,
+            proposals=proposals,
+            prefetcher=prefetcher,
+        )
+    finally:
+        prefetcher.close()
+
+
+def _rotate_images(
+    *,
+    raw_receipt_img_filepaths: List[str],
+    config: "Config",
+    proposals: Optional[ImageOpsProposals],
+    prefetcher: DisplayImagePrefetcher,
 ) -> None:
-    """Rotate images and save metadata with rotation angle, skipping already rotated images if rotated image exists."""
     current_index = 0
     receipt_img_filenames: ReceiptImgConfig = config.file_names.receipt_img
     while current_index < len(raw_receipt_img_filepaths):
@@ -197,8 +258,24 @@ def rotate_images(
                 )
 
         print(f"rotated_path={rotated_path}")
+        proposal: Optional[ImageOpsProposal] = (
+            None
+            if proposals is None
+            else proposals.get(image_filepath=raw_receipt_img_filepath)
+        )
+        try:
+            display_source: Optional[np.ndarray] = prefetcher.get(
+                image_path=raw_receipt_img_filepath,
+                next_image_paths=raw_receipt_img_filepaths[current_index + 1 :],
+            )
+        except Exception as e:
+            print(f"Error loading image: {e}")
+            display_source = None
         rotation_result = rotate_and_save_image(
-            image_path=raw_receipt_img_filepath, output_path=rotated_path
+            image_path=raw_receipt_img_filepath,
+            output_path=rotated_path,
+            initial_angle=0 if proposal is None else proposal.angle_degrees,
+            display_source=display_source,
         )
 
         if rotation_result is False and current_index > 0:
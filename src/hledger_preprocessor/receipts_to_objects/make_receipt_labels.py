@@ -1,27 +1,20 @@
-import copy
-import json
 import os
 import tkinter as tk
-from dataclasses import asdict
-from datetime import datetime
 from pprint import pprint
 from typing import Dict, List, Optional
 
+import numpy as np
 from typeguard import typechecked
 
 from hledger_preprocessor.config.Config import Config
 from hledger_preprocessor.config.load_config import (
     raw_receipt_img_filepath_to_cropped,
 )
-from hledger_preprocessor.Currency import Currency
 from hledger_preprocessor.dir_reading_and_writing import (
     find_receipt_folder_path,
 )
-from hledger_preprocessor.generics.enums import (
-    ClassifierType,
-    EnumEncoder,
-    LogicType,
-)
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+from hledger_preprocessor.image_access import open_preview_image
 from hledger_preprocessor.management.get_all_hledger_flow_accounts import (
     get_all_accounts,
 )
@@ -31,11 +24,15 @@ from hledger_preprocessor.receipt_transaction_matching.get_bank_data_from_transa
 from hledger_preprocessor.receipt_transaction_matching.read_receipt import (
     read_receipt_from_json,
 )
-from hledger_preprocessor.TransactionObjects.Account import Account
-from hledger_preprocessor.TransactionObjects.AssetType import AssetType
-from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
+from hledger_preprocessor.receipts_to_objects.write_receipt_label import (
+    receipt_to_label_dict,
+    store_receipt_label,
+)
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
+# The receipt is shown at most this size, in pixels.
+LABEL_PREVIEW_SIZE: int = 2048
+
 
 @typechecked
 def manually_make_receipt_labels(
@@ -94,7 +91,9 @@ def manually_make_receipt_labels(
             receipts[raw_receipt_img_filepath] = receipt_label
             # Store the manually generated receipt label.
             export_human_label(
-                receipt=receipt_label, label_filepath=label_filepath
+                config=config,
+                receipt=receipt_label,
+                label_filepath=label_filepath,
             )
             print(f"Saved manual label to:\n{label_filepath}")
         else:
@@ -145,85 +144,24 @@ def ask_questions(
 
 
 @typechecked
-def export_human_label(*, receipt: "Receipt", label_filepath: str) -> None:
+def export_human_label(
+    *, config: Config, receipt: "Receipt", label_filepath: str
+) -> None:
     """
     Stores the manually generated Receipt object to a JSON file.
 
     Args:
+        config: The config, to also update the label store.
         receipt: The Receipt object containing the label data to be stored.
         label_filepath: The full path where the JSON file should be saved.
     """
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(label_filepath), exist_ok=True)
-
-    # Convert the Receipt object to a dictionary with a deep copy
-    receipt_dict = copy.deepcopy(asdict(receipt))
-
-    def convert_types(obj):
-        """Recursively convert datetime to isoformat, Currency to string, Account to string, and AssetType to string."""
-        if isinstance(obj, dict):
-            return {key: convert_types(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_types(item) for item in obj]
-        elif isinstance(obj, tuple):
-            return [convert_types(item) for item in obj]
-        elif isinstance(obj, datetime):
-            return obj.isoformat()
-        elif isinstance(obj, Currency):
-            return obj.value
-        elif isinstance(obj, Account):
-            return obj.to_string()
-        elif isinstance(obj, AssetType):
-            return obj.value
-        elif isinstance(obj, str):
-            return obj
-        elif isinstance(obj, int):
-            return obj
-        elif isinstance(obj, float):
-            return obj
-        elif isinstance(obj, TransactionCode):
-            return obj
-        elif obj is None:
-            return None
-        else:
-            raise TypeError(f"Unexpected type:{type(obj)} for:{obj}")
-        # return obj
-
-    # Apply recursive conversion
-    receipt_dict = convert_types(receipt_dict)
-
-    # Validate currency fields in receipt and transactions
-    for item_list_key in ["net_bought_items", "net_returned_items"]:
-        item_list = receipt_dict.get(item_list_key)
-        if item_list is None or isinstance(
-            item_list, str
-        ):  # Handle None or unexpected string
-            continue
-        for item in item_list:
-            if not isinstance(item, dict):  # Ensure item is a dictionary
-                continue
-            for transaction in item.get("account_transactions", []):
-                if not isinstance(
-                    transaction, dict
-                ):  # Ensure transaction is a dictionary
-                    continue
-                if not isinstance(transaction.get("currency"), str):
-                    raise TypeError(
-                        "Expected str for currency in AccountTransaction after"
-                        " conversion."
-                    )
-                if not isinstance(transaction.get("account"), str):
-                    raise TypeError(
-                        "Expected str for account in AccountTransaction after"
-                        " conversion."
-                    )
-    printing_receipt: Dict = copy.deepcopy(receipt_dict)
-    printing_receipt.pop("config")
+    printing_receipt: Dict = receipt_to_label_dict(receipt=receipt)
     pprint(printing_receipt)
     input(f"EXPORTING to:\n{label_filepath}")
     # Note: This pauses execution; consider removing in production
-    with open(label_filepath, "w") as f:
-        json.dump(receipt_dict, f, indent=4, cls=EnumEncoder)
+    store_receipt_label(
+        config=config, receipt=receipt, label_filepath=label_filepath
+    )
 
 
 @typechecked
@@ -250,8 +188,6 @@ def make_receipt_label(
     """
 
     from matplotlib import pyplot as plt
-    from tensorflow import image as img
-    from tensorflow import io
 
     # Validate cropped image exists before attempting to load
     if not os.path.isfile(cropped_receipt_img_filepath):
@@ -262,15 +198,17 @@ def make_receipt_label(
             f" path: {raw_receipt_img_filepath}"
         )
 
-    tensor_img = io.read_file(cropped_receipt_img_filepath)
-    tensor_img = img.decode_png(tensor_img, channels=3)
+    # Large enough to read the receipt text in the maximized window.
+    img_array = np.asarray(
+        open_preview_image(
+            image_path=cropped_receipt_img_filepath,
+            max_size=LABEL_PREVIEW_SIZE,
+        )
+    )
 
     plt.style.use("dark_background")
     plt.ion()
 
-    # For some reason this code attempts to rotate the images. Prevent that.
-    # rotated_img = img.rot90(tensor_img, k=nr_of_quarter_turns_cw)
-    img_array = tensor_img.numpy()
     plt.figure()
     plt.imshow(img_array, origin="upper")
     plt.title(f"Answer the questions about this receipt in the CLI/TUI")
@@ -1,16 +1,23 @@
+import json
 import os
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from hledger_preprocessor.create_start import create_dir
-from hledger_preprocessor.dir_reading_and_writing import (
-    create_image_folder,
-    create_next_dir,
+from hledger_preprocessor.dir_reading_and_writing import create_next_dir
+from hledger_preprocessor.file_reading_and_writing import (
+    create_and_save_json,
+    get_image_hash,
 )
-from hledger_preprocessor.file_reading_and_writing import create_and_save_json
 from hledger_preprocessor.generics.enums import ClassifierType, LogicType
 from hledger_preprocessor.generics.ReceiptImageToObjModel import (
     ReceiptImageToObjModel,
 )
+from hledger_preprocessor.profiling.Profiler import count
+from hledger_preprocessor.receipts_to_objects.AiInferenceCache import (
+    AI_INFERENCE_CACHE_DIRNAME,
+    AiInferenceCache,
+    get_model_cache_params,
+)
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
 
@@ -19,7 +26,7 @@ def get_inferenced_json_path(
 ) -> str:
     # Get the relevant relative folder path and filenames.
     model_path: str = create_next_dir(
-        start_path=ai_based_path, next_dir=ai_model.get_name()
+        working_subdir=ai_based_path, next_dir=ai_model.get_name()
     )
 
     # Check if receipt for model already exists or not.
@@ -29,27 +36,61 @@ def get_inferenced_json_path(
     return inferenced_json_path
 
 
+def read_exported_json(*, inferenced_json_path: str) -> Optional[Any]:
+    """Returns the json that an earlier run exported, or None if there is
+    none (or it is truncated)."""
+    if not os.path.isfile(inferenced_json_path):
+        return None
+    try:
+        with open(inferenced_json_path) as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+
 def receipt_images_to_receipt_objects(
     *,
     receipt_filepaths: List[str],
     dataset_path: str,
     ai_models_receipt_parsing: List[ReceiptImageToObjModel],
 ) -> Dict[LogicType, Dict[str, Dict[str, Receipt]]]:
+    """Returns the receipts that the models inferred from the images that
+    were not inferred before, and exports the inferred json of each image
+    and model as soon as it is inferred. The inferred json is cached by
+    image content and model parameters, in the dataset_path.
+
+    The first run with the cache imports the jsons that earlier runs
+    exported, instead of inferring their images again."""
     create_dir(path=dataset_path)
+    cache_dir: str = os.path.join(dataset_path, AI_INFERENCE_CACHE_DIRNAME)
+    import_exported_jsons: bool = not os.path.isdir(cache_dir)
+    inference_cache = AiInferenceCache(cache_dir=cache_dir)
+    model_params_per_model: Dict[ReceiptImageToObjModel, Dict[str, Any]] = {
+        ai_model: get_model_cache_params(ai_model=ai_model)
+        for ai_model in ai_models_receipt_parsing
+    }
     # Logic type, model name, filepath, Receipt.
     receipts: Dict[LogicType, Dict[str, Dict[str, Receipt]]] = {}
     receipts[LogicType.AI.value] = {}
     receipts[LogicType.LABEL.value] = {}
+    # The (receipt_filepath, inferenced_json_path, image_hash, cache key) of
+    # the images per model that are not in the cache.
+    pending_per_model: Dict[
+        ReceiptImageToObjModel, List[Tuple[str, str, str, str]]
+    ] = {}
     for receipt_filepath in receipt_filepaths:
-        receipt_folder_path: str = create_image_folder(
-            dataset_path=dataset_path, receipt_filepath=receipt_filepath
+        image_hash: str = get_image_hash(image_path=receipt_filepath)
+        # The receipt folder is named after the image hash.
+        receipt_folder_path: str = create_next_dir(
+            working_subdir=dataset_path, next_dir=image_hash
         )
         classifier_type_path: str = create_next_dir(
-            start_path=receipt_folder_path,
+            working_subdir=receipt_folder_path,
             next_dir=str(ClassifierType.RECEIPT_IMAGE_TO_OBJ.value),
         )
         logic_type_path: str = create_next_dir(
-            start_path=classifier_type_path, next_dir=str(LogicType.AI.value)
+            working_subdir=classifier_type_path,
+            next_dir=str(LogicType.AI.value),
         )
 
         receipts[LogicType.AI.value][receipt_filepath] = {}
@@ -62,21 +103,73 @@ def receipt_images_to_receipt_objects(
                 ai_model=ai_model,
                 receipt_filepath=receipt_filepath,
             )
-
+            key: str = AiInferenceCache.get_key(
+                image_hash=image_hash,
+                model_params=model_params_per_model[ai_model],
+            )
+            cached_json: Any = inference_cache.get(key=key)
+            if cached_json is None and import_exported_jsons:
+                cached_json = read_exported_json(
+                    inferenced_json_path=inferenced_json_path
+                )
+                if cached_json is not None:
+                    count("ai_inferences_imported")
+                    inference_cache.put(
+                        key=key,
+                        image_hash=image_hash,
+                        model_params=model_params_per_model[ai_model],
+                        json_object=cached_json,
+                    )
+                    continue
+            if cached_json is None:
+                pending_per_model.setdefault(ai_model, []).append(
+                    (receipt_filepath, inferenced_json_path, image_hash, key)
+                )
+                continue
+            count("ai_inferences_cached")
+            # Export the json of a renamed image under its new name.
             if not os.path.exists(inferenced_json_path):
-                # If no, perform the inference and store the json.
-                json_object, ai_based_receipt = ai_model.image_path_to_receipt(
-                    receipt_filepath=receipt_filepath
+                create_and_save_json(
+                    data=cached_json, filepath=inferenced_json_path
                 )
 
-                # Export receipt text
-                create_and_save_json(
-                    data=json_object, filepath=inferenced_json_path
+    # Perform the inference of the receipts without a json per model, in
+    # batches if the model supports that. Each json is stored as soon as it
+    # is inferred, such that an interrupted run keeps the inferred jsons.
+    for ai_model, pending in pending_per_model.items():
+        pending_filepaths: List[str] = [
+            receipt_filepath for receipt_filepath, _, _, _ in pending
+        ]
+        if hasattr(ai_model, "images_to_receipts"):
+            inferences: Iterator[Tuple[Any, Receipt]] = (
+                ai_model.images_to_receipts(receipt_filepaths=pending_filepaths)
+            )
+        else:
+            inferences = (
+                ai_model.image_path_to_receipt(
+                    receipt_filepath=receipt_filepath
                 )
+                for receipt_filepath in pending_filepaths
+            )
+        for (receipt_filepath, inferenced_json_path, image_hash, key), (
+            json_object,
+            ai_based_receipt,
+        ) in zip(pending, inferences):
+            count("ai_inferences")
+            inference_cache.put(
+                key=key,
+                image_hash=image_hash,
+                model_params=model_params_per_model[ai_model],
+                json_object=json_object,
+            )
+            # Export receipt text
+            create_and_save_json(
+                data=json_object, filepath=inferenced_json_path
+            )
 
-                # Store receipt object.
-                receipts[LogicType.AI.value][receipt_filepath] = {
-                    ai_model.name: ai_based_receipt
-                }
+            # Store receipt object.
+            receipts[LogicType.AI.value][receipt_filepath] = {
+                ai_model.name: ai_based_receipt
+            }
 
     return receipts
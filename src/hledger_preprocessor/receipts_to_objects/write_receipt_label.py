@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.generics.enums import EnumEncoder
+from hledger_preprocessor.label_store.ReceiptLabelStore import (
+    store_exported_label,
+)
+from hledger_preprocessor.profiling.Profiler import count, profiled
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    encode_label_value,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+# Set by --debug-label-writes, to diff each updated label field by field.
+_debug_label_writes: bool = False
+
+
+@typechecked
+def set_debug_label_writes(*, enabled: bool) -> None:
+    global _debug_label_writes
+    _debug_label_writes = enabled
+
+
+@typechecked
+def get_debug_label_writes() -> bool:
+    return _debug_label_writes
+
+
+@typechecked
+def receipt_to_label_dict(*, receipt: Receipt) -> Dict[str, Any]:
+    """Returns the json content of the label of the receipt. The encoding
+    builds new dicts and lists, so it can not modify the receipt."""
+    receipt_dict: Dict[str, Any] = encode_label_value(receipt)
+
+    # Validate currency fields in receipt and transactions
+    for item_list_key in ["net_bought_items", "net_returned_items"]:
+        item_list = receipt_dict.get(item_list_key)
+        if item_list is None or isinstance(
+            item_list, str
+        ):  # Handle None or unexpected string
+            continue
+        for item in item_list:
+            if not isinstance(item, dict):  # Ensure item is a dictionary
+                continue
+            for transaction in item.get("account_transactions", []):
+                if not isinstance(
+                    transaction, dict
+                ):  # Ensure transaction is a dictionary
+                    continue
+                if not isinstance(transaction.get("currency"), str):
+                    raise TypeError(
+                        "Expected str for currency in AccountTransaction after"
+                        " conversion."
+                    )
+                if not isinstance(transaction.get("account"), str):
+                    raise TypeError(
+                        "Expected str for account in AccountTransaction after"
+                        " conversion."
+                    )
+    return receipt_dict
+
+
+@typechecked
+def get_canonical_label_hash(*, label_dict: Dict[str, Any]) -> str:
+    """Returns the SHA256 of the label content, independent of its key order
+    and indentation, such that a label in memory and the label as read from
+    file have the same hash."""
+    canonical_json: str = json.dumps(
+        label_dict,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        cls=EnumEncoder,
+    )
+    return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
+
+
+@typechecked
+def read_label_hash(*, label_filepath: str) -> Optional[str]:
+    """Returns the canonical hash of the stored label, or None if there is
+    no (valid) label."""
+    if not os.path.isfile(label_filepath):
+        return None
+    try:
+        with open(label_filepath, encoding="utf-8") as f:
+            return get_canonical_label_hash(label_dict=json.load(f))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+@typechecked
+def write_label_atomically(
+    *, label_dict: Dict[str, Any], label_filepath: str
+) -> None:
+    """Writes the label to a temporary file in the same directory, fsyncs it
+    and renames it over the label, such that a crash never leaves a partially
+    written label behind."""
+    label_dir: str = os.path.dirname(label_filepath)
+    os.makedirs(label_dir, exist_ok=True)
+    tmp_filepath: str = f"{label_filepath}.tmp"
+    with open(tmp_filepath, "w") as f:
+        json.dump(label_dict, f, indent=4, cls=EnumEncoder)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filepath, label_filepath)
+    # Persist the rename itself.
+    dir_descriptor: int = os.open(label_dir, os.O_RDONLY)
+    try:
+        os.fsync(dir_descriptor)
+    finally:
+        os.close(dir_descriptor)
+
+
+@profiled("store_receipt_label")
+@typechecked
+def store_receipt_label(
+    *, config: Config, receipt: Receipt, label_filepath: str
+) -> bool:
+    """Writes the label of the receipt, unless the stored label already has
+    the same content. The written label is verified by comparing its
+    canonical hash to that of the receipt. Returns True if it was written."""
+    label_dict: Dict[str, Any] = receipt_to_label_dict(receipt=receipt)
+    label_hash: str = get_canonical_label_hash(label_dict=label_dict)
+    if read_label_hash(label_filepath=label_filepath) == label_hash:
+        count("receipt_labels_unchanged")
+        return False
+
+    write_label_atomically(label_dict=label_dict, label_filepath=label_filepath)
+    if read_label_hash(label_filepath=label_filepath) != label_hash:
+        raise ValueError(
+            f"The label written to:{label_filepath} does not have the content"
+            " of the receipt."
+        )
+    count("receipt_labels_written")
+    store_exported_label(config=config, label_filepath=label_filepath)
+    return True
@@ -1,4 +1,6 @@
-from typing import Dict, List
+import csv
+from itertools import islice
+from typing import Dict, List, Optional
 
 from typeguard import typechecked
 
@@ -7,6 +9,13 @@ from hledger_preprocessor.config.load_config import Config
 from hledger_preprocessor.csv_parsing.csv_to_transactions import (
     load_csv_transactions_from_file_per_year,
 )
+from hledger_preprocessor.csv_parsing.TransactionHashIndex import (
+    TransactionLocation,
+    get_indexed_locations,
+)
+from hledger_preprocessor.generics.parse_generic_tnx_with_csv import (
+    parse_generic_bank_transaction,
+)
 from hledger_preprocessor.generics.Transaction import Transaction
 from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 
@@ -15,12 +24,18 @@ from hledger_preprocessor.TransactionObjects.Receipt import Receipt
 def retrieve_csv_transaction_from_hash(
     *, config: Config, some_hash: int, labelled_receipts: List[Receipt]
 ) -> Transaction:
-
-    matching_transactions: List[Transaction] = get_all_matching_transactions(
-        config=config, some_hash=some_hash, labelled_receipts=labelled_receipts
+    """Returns the csv transaction with the hash. The rows of the bank csvs
+    are looked up in the transaction hash index, and all csvs are only
+    parsed (which updates the index) if the hash is not indexed."""
+    matching_transactions: Optional[List[Transaction]] = (
+        get_indexed_matching_transactions(config=config, some_hash=some_hash)
     )
-    print(f"some_hash={some_hash}")
-    input(f"matching_transactions={matching_transactions[0]}")
+    if matching_transactions is None:
+        matching_transactions = get_all_matching_transactions(
+            config=config,
+            some_hash=some_hash,
+            labelled_receipts=labelled_receipts,
+        )
     if len(matching_transactions) == 1:
         return matching_transactions[0]
     elif len(matching_transactions) == 0:
@@ -31,6 +46,60 @@ def retrieve_csv_transaction_from_hash(
         )
 
 
+@typechecked
+def get_indexed_matching_transactions(
+    *, config: Config, some_hash: int
+) -> Optional[List[Transaction]]:
+    """Parses only the indexed csv rows of the hash. Returns None if the hash
+    is not indexed, or if a row no longer yields the hash."""
+    locations: Optional[List[TransactionLocation]] = get_indexed_locations(
+        config=config, some_hash=some_hash
+    )
+    if locations is None:
+        return None
+    matching_transactions: List[Transaction] = []
+    for location in locations:
+        transaction: Optional[Transaction] = read_csv_transaction_at_location(
+            config=config, location=location
+        )
+        if transaction is None or transaction.get_hash() != some_hash:
+            return None
+        matching_transactions.append(transaction)
+    return matching_transactions
+
+
+@typechecked
+def read_csv_transaction_at_location(
+    *, config: Config, location: TransactionLocation
+) -> Optional[Transaction]:
+    for account_config in config.accounts:
+        if (
+            account_config.has_input_csv()
+            and account_config.account.to_string() == location.account
+        ):
+            with open(
+                location.csv_filepath,
+                encoding=location.encoding,
+                errors="replace",
+            ) as infile:
+                rows: List[List[str]] = list(
+                    islice(
+                        csv.reader(infile),
+                        location.row_index,
+                        location.row_index + 1,
+                    )
+                )
+            if not rows:
+                return None
+            return parse_generic_bank_transaction(
+                row=rows[0],
+                nr_in_batch=location.row_index,
+                account_config=account_config,
+                csv_column_mapping=account_config.csv_column_mapping,
+            )
+    return None
+
+
 @typechecked
 def get_all_matching_transactions(
     *, config: Config, labelled_receipts: List[Receipt], some_hash: int
@@ -0,0 +1,142 @@
+"""Detects which files changed in a set of watched files and directories.
+
+Changes are always determined by comparing (mtime, size) snapshots, such that
+the result is the same on every platform. If the optional watchdog package is
+installed, its (inotify) events are used to wake up as soon as something
+changes, otherwise the snapshots are polled every poll_interval seconds."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from typeguard import typechecked
+
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    FileFingerprint,
+    get_file_fingerprint,
+)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - watchdog is optional.
+    FileSystemEventHandler = object  # type: ignore[misc,assignment]
+    Observer = None  # type: ignore[misc,assignment]
+
+
+class _WakeUpHandler(FileSystemEventHandler):  # type: ignore[misc,valid-type]
+    def __init__(self, wake_up: threading.Event) -> None:
+        super().__init__()
+        self.wake_up: threading.Event = wake_up
+
+    def on_any_event(self, event: Any) -> None:
+        self.wake_up.set()
+
+
+@dataclass
+class FileWatcher:
+    """Watches the files in watched_paths (directories are walked
+    recursively). wait_for_changes blocks until files were added, modified or
+    removed and no further changes occurred for debounce_seconds."""
+
+    watched_paths: List[str]
+    poll_interval: float = 1.0
+    debounce_seconds: float = 2.0
+    snapshot: Dict[str, FileFingerprint] = field(default_factory=dict)
+    wake_up: threading.Event = field(default_factory=threading.Event)
+    observer: Optional[Any] = None
+
+    def __post_init__(self) -> None:
+        self.watched_paths = [os.path.abspath(p) for p in self.watched_paths]
+        self.snapshot = self.take_snapshot()
+
+    @typechecked
+    def uses_watchdog(self) -> bool:
+        return Observer is not None
+
+    @typechecked
+    def start(self) -> None:
+        if not self.uses_watchdog() or self.observer is not None:
+            return
+        self.observer = Observer()
+        handler = _WakeUpHandler(wake_up=self.wake_up)
+        for directory in self.get_watched_dirs():
+            self.observer.schedule(handler, directory, recursive=True)
+        self.observer.start()
+
+    @typechecked
+    def stop(self) -> None:
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    @typechecked
+    def get_watched_dirs(self) -> List[str]:
+        """Returns the existing directories that contain the watched paths."""
+        watched_dirs: Set[str] = set()
+        for watched_path in self.watched_paths:
+            if os.path.isdir(watched_path):
+                watched_dirs.add(watched_path)
+            elif os.path.isdir(os.path.dirname(watched_path)):
+                watched_dirs.add(os.path.dirname(watched_path))
+        return sorted(watched_dirs)
+
+    @typechecked
+    def take_snapshot(self) -> Dict[str, FileFingerprint]:
+        snapshot: Dict[str, FileFingerprint] = {}
+        for watched_path in self.watched_paths:
+            if os.path.isdir(watched_path):
+                for root, _, filenames in os.walk(watched_path):
+                    for filename in filenames:
+                        filepath: str = os.path.join(root, filename)
+                        try:
+                            snapshot[filepath] = get_file_fingerprint(
+                                filepath=filepath
+                            )
+                        except FileNotFoundError:
+                            # File was removed while walking the directory.
+                            continue
+            elif os.path.isfile(watched_path):
+                snapshot[watched_path] = get_file_fingerprint(
+                    filepath=watched_path
+                )
+        return snapshot
+
+    @typechecked
+    def get_changed_filepaths(self) -> Set[str]:
+        """Returns the files that were added, modified or removed since the
+        previous call, and stores the new snapshot."""
+        new_snapshot: Dict[str, FileFingerprint] = self.take_snapshot()
+        changed_filepaths: Set[str] = {
+            filepath
+            for filepath in set(self.snapshot) | set(new_snapshot)
+            if self.snapshot.get(filepath) != new_snapshot.get(filepath)
+        }
+        self.snapshot = new_snapshot
+        return changed_filepaths
+
+    @typechecked
+    def sleep(self, *, seconds: float) -> None:
+        """Sleeps for at most seconds, or until a watchdog event arrives."""
+        self.wake_up.wait(timeout=seconds)
+        self.wake_up.clear()
+
+    @typechecked
+    def wait_for_changes(self) -> Set[str]:
+        changed_filepaths: Set[str] = set()
+        while not changed_filepaths:
+            self.sleep(seconds=self.poll_interval)
+            changed_filepaths = self.get_changed_filepaths()
+
+        # Debounce: wait until e.g. a bank export or photo is fully written.
+        last_change: float = time.monotonic()
+        while time.monotonic() - last_change < self.debounce_seconds:
+            time.sleep(min(self.poll_interval, self.debounce_seconds))
+            new_changes: Set[str] = self.get_changed_filepaths()
+            if new_changes:
+                changed_filepaths |= new_changes
+                last_change = time.monotonic()
+        return changed_filepaths
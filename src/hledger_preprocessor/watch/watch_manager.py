@@ -0,0 +1,296 @@
+"""Keeps running and only performs the steps that are affected by the receipt
+images, receipt labels and bank csvs that are added or changed."""
+
+import os
+from argparse import Namespace
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from typeguard import typechecked
+
+from hledger_preprocessor.config.AccountConfig import AccountConfig
+from hledger_preprocessor.config.Config import Config
+from hledger_preprocessor.config.load_config import (
+    raw_receipt_img_filepath_to_cropped,
+)
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    CsvTransactionsCache,
+    set_csv_transactions_cache,
+)
+from hledger_preprocessor.daemon.DaemonState import DaemonState
+from hledger_preprocessor.file_reading_and_writing import get_image_hash
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+from hledger_preprocessor.helper import get_images_in_folder
+from hledger_preprocessor.incremental.BuildManifest import BuildManifest
+from hledger_preprocessor.management.main_manager import (
+    manage_creating_new_setup,
+    manage_creating_receipt_img_labels_with_tui,
+    manage_generating_rules,
+    manage_preprocessing_assets,
+    manage_preprocessing_csvs,
+)
+from hledger_preprocessor.watch.FileWatcher import FileWatcher
+
+
+@dataclass
+class WatchSession:
+    """The state that is kept in between the changes that are processed."""
+
+    args: Namespace
+    models_loader: Callable[..., Dict[ClassifierType, Dict[LogicType, Any]]]
+    daemon_state: DaemonState
+    build_manifest: Optional[BuildManifest] = None
+    models: Optional[Dict[ClassifierType, Dict[LogicType, Any]]] = None
+    # Image hash to raw receipt image filepath of images without a label.
+    label_queue: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def config(self) -> Config:
+        return self.daemon_state.config
+
+    @typechecked
+    def get_models(self) -> Dict[ClassifierType, Dict[LogicType, Any]]:
+        if self.models is None:
+            self.models = self.models_loader(
+                quick_categorisation=self.args.quick_categorisation,
+                config=self.config,
+            )
+        return self.models
+
+    @typechecked
+    def refresh(self) -> bool:
+        """Reloads the config and labelled receipts if their files changed."""
+        if self.daemon_state.refresh() or self.build_manifest is None:
+            self.build_manifest = BuildManifest.load(
+                config=self.config, config_filepath=self.args.config
+            )
+            return True
+        return False
+
+
+@typechecked
+def get_watched_paths(*, config: Config, config_path: str) -> List[str]:
+    watched_paths: List[str] = [
+        config_path,
+        config.file_names.get_filepath(
+            dir_path_config=config.dir_paths,
+            filename="categories_filename",
+        ),
+        config.dir_paths.get_path("receipt_images_input_dir", absolute=True),
+        config.dir_paths.get_path("receipt_labels_dir", absolute=True),
+    ]
+    for account_config in config.accounts:
+        if account_config.has_input_csv():
+            watched_paths.append(
+                account_config.get_abs_csv_filepath(
+                    dir_paths_config=config.dir_paths
+                )
+            )
+    return watched_paths
+
+
+@typechecked
+def get_changed_account_configs(
+    *, config: Config, changed_filepaths: Set[str]
+) -> List[AccountConfig]:
+    return [
+        account_config
+        for account_config in config.accounts
+        if account_config.has_input_csv()
+        and os.path.abspath(
+            account_config.get_abs_csv_filepath(
+                dir_paths_config=config.dir_paths
+            )
+        )
+        in changed_filepaths
+    ]
+
+
+@typechecked
+def has_receipt_label(*, config: Config, raw_receipt_img_filepath: str) -> bool:
+    """Returns True if the cropped version of the raw receipt image already has
+    a manual label folder."""
+    cropped_receipt_img_filepath: str = raw_receipt_img_filepath_to_cropped(
+        config=config, raw_receipt_img_filepath=raw_receipt_img_filepath
+    )
+    if not os.path.isfile(cropped_receipt_img_filepath):
+        return False
+    image_hash: str = get_image_hash(image_path=cropped_receipt_img_filepath)
+    receipt_labels_dir: str = config.dir_paths.get_path(
+        "receipt_labels_dir", absolute=True
+    )
+    label_filename: str = f"{config.file_names.tui_label_filename}.json"
+    return any(
+        (dirname == image_hash or dirname.endswith(f"_{image_hash}"))
+        and os.path.isfile(
+            os.path.join(receipt_labels_dir, dirname, label_filename)
+        )
+        for dirname in os.listdir(receipt_labels_dir)
+    )
+
+
+@typechecked
+def queue_new_receipt_images(
+    *, watch_session: WatchSession, changed_filepaths: Set[str]
+) -> None:
+    """Hashes the new, unlabelled raw receipt images and adds them to the
+    label queue."""
+    for raw_receipt_img_filepath in get_images_in_folder(
+        folder_path=watch_session.config.dir_paths.get_path(
+            "receipt_images_input_dir", absolute=True
+        )
+    ):
+        if os.path.abspath(
+            raw_receipt_img_filepath
+        ) in changed_filepaths and not has_receipt_label(
+            config=watch_session.config,
+            raw_receipt_img_filepath=raw_receipt_img_filepath,
+        ):
+            image_hash: str = get_image_hash(
+                image_path=raw_receipt_img_filepath
+            )
+            if image_hash not in watch_session.label_queue:
+                print(f"Queued for labelling:{raw_receipt_img_filepath}")
+                watch_session.label_queue[image_hash] = raw_receipt_img_filepath
+
+
+@typechecked
+def run_affected_steps(
+    *,
+    watch_session: WatchSession,
+    changed_account_configs: Optional[List[AccountConfig]],
+) -> None:
+    """Performs the requested actions for the changed accounts, or for all
+    accounts if changed_account_configs is None. The build manifest skips the
+    targets whose inputs did not change."""
+    args: Namespace = watch_session.args
+    config: Config = watch_session.config
+
+    if args.tui_label_receipts and watch_session.label_queue:
+        manage_creating_receipt_img_labels_with_tui(
+            config=config,
+            labelled_receipts=watch_session.daemon_state.labelled_receipts,
+            verbose=False,
+            raw_receipt_img_filepaths=sorted(
+                watch_session.label_queue.values()
+            ),
+        )
+        watch_session.label_queue.clear()
+        # The new labels are inputs of the steps below.
+        watch_session.refresh()
+        config = watch_session.config
+
+    if args.new_setup and changed_account_configs != []:
+        manage_creating_new_setup(
+            config=config,
+            labelled_receipts=watch_session.daemon_state.labelled_receipts,
+            account_filter=(
+                None
+                if changed_account_configs is None
+                else [
+                    account_config.account.to_string()
+                    for account_config in changed_account_configs
+                ]
+            ),
+            build_manifest=watch_session.build_manifest,
+        )
+
+    if args.preprocess_csvs:
+        manage_preprocessing_csvs(
+            config=config,
+            models=watch_session.get_models(),
+            labelled_receipts=watch_session.daemon_state.labelled_receipts,
+            build_manifest=watch_session.build_manifest,
+        )
+
+    if args.preprocess_assets:
+        manage_preprocessing_assets(
+            config=config,
+            models=watch_session.get_models(),
+            labelled_receipts=watch_session.daemon_state.labelled_receipts,
+            build_manifest=watch_session.build_manifest,
+        )
+
+    if args.generate_rules:
+        manage_generating_rules(
+            config=config, build_manifest=watch_session.build_manifest
+        )
+
+
+@typechecked
+def manage_watching(
+    *,
+    args: Namespace,
+    models_loader: Callable[..., Dict[ClassifierType, Dict[LogicType, Any]]],
+    poll_interval: float = 1.0,
+    debounce_seconds: float = 2.0,
+) -> None:
+    """Performs the requested actions once, and then again for each (debounced)
+    batch of changed files until interrupted with Ctrl+C."""
+    config_path: str = os.path.abspath(args.config)
+    watch_session = WatchSession(
+        args=args,
+        models_loader=models_loader,
+        daemon_state=DaemonState(
+            config_path=config_path,
+            pre_processed_output_dir=args.pre_processed_output_dir,
+        ),
+    )
+    watch_session.refresh()
+    set_csv_transactions_cache(csv_transactions_cache=CsvTransactionsCache())
+
+    file_watcher = FileWatcher(
+        watched_paths=get_watched_paths(
+            config=watch_session.config, config_path=config_path
+        ),
+        poll_interval=poll_interval,
+        debounce_seconds=debounce_seconds,
+    )
+    # Queue the images that are already present and not yet labelled.
+    queue_new_receipt_images(
+        watch_session=watch_session,
+        changed_filepaths=set(file_watcher.snapshot),
+    )
+    run_affected_steps(
+        watch_session=watch_session, changed_account_configs=None
+    )
+
+    file_watcher.start()
+    print(
+        "Watching for changes"
+        f" ({'watchdog' if file_watcher.uses_watchdog() else 'polling'}),"
+        " press Ctrl+C to stop."
+    )
+    try:
+        while True:
+            changed_filepaths: Set[str] = file_watcher.wait_for_changes()
+            print(f"Changed:{sorted(changed_filepaths)}")
+
+            if watch_session.refresh():
+                # The config, categories or receipt labels changed.
+                file_watcher.watched_paths = [
+                    os.path.abspath(p)
+                    for p in get_watched_paths(
+                        config=watch_session.config, config_path=config_path
+                    )
+                ]
+                changed_account_configs: Optional[List[AccountConfig]] = None
+            else:
+                changed_account_configs = get_changed_account_configs(
+                    config=watch_session.config,
+                    changed_filepaths=changed_filepaths,
+                )
+
+            queue_new_receipt_images(
+                watch_session=watch_session,
+                changed_filepaths=changed_filepaths,
+            )
+            run_affected_steps(
+                watch_session=watch_session,
+                changed_account_configs=changed_account_configs,
+            )
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        file_watcher.stop()
+        set_csv_transactions_cache(csv_transactions_cache=None)
@@ -5,15 +5,17 @@ source proces_config_accounts.sh
 
 # Parse command line arguments
 usage() {
-    echo "Usage: $0 --config <path-to-config.yaml> [--randomize]"
+    echo "Usage: $0 --config <path-to-config.yaml> [--randomize] [--incremental]"
     echo ""
     echo "Arguments:"
     echo "  --config <path>   Path to the config.yaml file (required)"
     echo "  --randomize       Enable data randomization (optional, default: false)"
+    echo "  --incremental     Keep the working dir and only rebuild outputs whose inputs changed (optional, default: false)"
     exit 1
 }
 
 RANDOMIZE_DATA="false"
+INCREMENTAL="false"
 GENERAL_CONFIG_FILEPATH=""
 
 while [[ $# -gt 0 ]]; do
@@ -30,6 +32,10 @@ while [[ $# -gt 0 ]]; do
             RANDOMIZE_DATA="true"
             shift
             ;;
+        --incremental)
+            INCREMENTAL="true"
+            shift
+            ;;
         -h|--help)
             usage
             ;;
@@ -62,6 +68,13 @@ fi
 export GENERAL_CONFIG_FILEPATH
 export RANDOMIZE_DATA
 
+# Passed to the hledger_preprocessor calls that support incremental builds.
+if [ "$INCREMENTAL" = "true" ]; then
+    export INCREMENTAL_ARG="--incremental"
+else
+    export INCREMENTAL_ARG=""
+fi
+
 # Load paths from config.yaml using yq
 export FINANCE_DIR=$(yq e '.dir_paths.root_finance_path' "$GENERAL_CONFIG_FILEPATH")
 WORKING_SUBDIR=$(yq e '.dir_paths.working_subdir' "$GENERAL_CONFIG_FILEPATH")
@@ -142,8 +155,12 @@ echo "GENERAL_CONFIG_FILEPATH=$GENERAL_CONFIG_FILEPATH"
 activate_conda
 
 # Start with an empty working dir such that your flow stays reproducible.
+# In incremental mode the working dir is kept and the preprocessor only
+# rebuilds the outputs whose input content hashes changed.
 # rm -rf "$ASSET_TRANSACTION_CSVS"
-rm -rf "$WORKING_DIR"
+if [ "$INCREMENTAL" != "true" ]; then
+    rm -rf "$WORKING_DIR"
+fi
 mkdir -p "$WORKING_DIR"
 
 
@@ -165,7 +182,7 @@ echo ""
 # Preprocess accounts without csvs.
 hledger_preprocessor \
             --config "$GENERAL_CONFIG_FILEPATH" \
-            --preprocess-assets || {
+            --preprocess-assets $INCREMENTAL_ARG || {
             echo "Error: hledger_preprocessor --preprocess-assets failed."
             exit 1
 }
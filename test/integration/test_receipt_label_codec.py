@@ -0,0 +1,52 @@
+"""Integration tests for the receipt label codec."""
+
+import json
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    get_files_in_folder,
+)
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    ReceiptLabelCodec,
+    loads_label,
+    read_label_file,
+)
+from hledger_preprocessor.receipts_to_objects.write_receipt_label import (
+    receipt_to_label_dict,
+)
+from hledger_preprocessor.TransactionObjects.Receipt import Receipt
+
+
+class TestReceiptLabelCodec:
+    """Test that the codec decodes the labels like the Receipt itself."""
+
+    def test_decodes_like_the_receipt(self, temp_finance_root):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        label_filepaths = get_files_in_folder(
+            folder_path=config.dir_paths.get_path(
+                "receipt_labels_dir", absolute=True
+            ),
+            file_name=config.file_names.tui_label_filename,
+            extensions=[".json"],
+        )
+        assert label_filepaths
+
+        codec = ReceiptLabelCodec(config=config)
+        for label_filepath in label_filepaths:
+            with open(label_filepath, encoding="utf-8") as f:
+                expected = Receipt(config=config, **json.load(f))
+            receipt = codec.decode_receipt(
+                label_data=read_label_file(label_filepath=label_filepath)
+            )
+            assert receipt == expected
+
+            # The encoded labels, like the labels written by the tui, also
+            # decode like the Receipt itself.
+            label_dict = receipt_to_label_dict(receipt=receipt)
+            label_json = json.dumps(label_dict)
+            assert codec.decode_receipt(
+                label_data=loads_label(label_json=label_json)
+            ) == Receipt(config=config, **json.loads(label_json))
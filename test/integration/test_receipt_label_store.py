@@ -0,0 +1,179 @@
+"""Integration tests for the sqlite receipt label store."""
+
+import dataclasses
+import json
+import os
+import shutil
+import sqlite3
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.label_store.ReceiptLabelStore import (
+    ReceiptLabelStore,
+    open_label_store,
+    store_exported_label,
+)
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    load_receipts_from_dir,
+)
+
+
+def get_isolated_config(*, temp_finance_root, tmp_path):
+    """Returns the config with a copy of the labels and a label store in the
+    tmp_path, as the finance root is shared across the session, and other
+    tests add labels to it."""
+    config = load_config(
+        config_path=str(temp_finance_root["config_path"]),
+        pre_processed_output_dir=None,
+    )
+    labels_dir = tmp_path / "receipt_labels"
+    shutil.copytree(
+        config.dir_paths.get_path("receipt_labels_dir", absolute=True),
+        labels_dir,
+    )
+    return dataclasses.replace(
+        config,
+        dir_paths=dataclasses.replace(
+            config.dir_paths, receipt_labels_dir=str(labels_dir)
+        ),
+        label_store=dataclasses.replace(
+            config.label_store,
+            backend="sqlite",
+            sqlite_filename=str(tmp_path / "receipt_labels.sqlite"),
+        ),
+    )
+
+
+class TestReceiptLabelStore:
+    """Test that the store loads, syncs and exports the json labels."""
+
+    def test_import_load_and_export(self, temp_finance_root, tmp_path):
+        config = get_isolated_config(
+            temp_finance_root=temp_finance_root, tmp_path=tmp_path
+        )
+        label_store = ReceiptLabelStore.open(
+            db_filepath=str(tmp_path / "receipt_labels.sqlite")
+        )
+        label_filepaths = label_store.get_label_filepaths(config=config)
+        assert label_filepaths
+        assert label_store.import_json_labels(config=config) == len(
+            label_filepaths
+        )
+
+        stored_receipts = label_store.load_receipts(config=config)
+        json_receipts = load_receipts_from_dir(config=config)
+        assert sorted(r.raw_img_filepath for r in stored_receipts) == sorted(
+            r.raw_img_filepath for r in json_receipts
+        )
+
+        # Export into another dir, to compare it to the original labels.
+        labels_dir = config.dir_paths.get_path("receipt_labels_dir")
+        export_dir = tmp_path / "exported_labels"
+        export_config = dataclasses.replace(
+            config,
+            dir_paths=dataclasses.replace(
+                config.dir_paths, receipt_labels_dir=str(export_dir)
+            ),
+        )
+        assert label_store.export_json_labels(config=export_config) == len(
+            label_filepaths
+        )
+        label_store.close()
+        for label_filepath in label_filepaths:
+            exported_filepath = export_dir / os.path.relpath(
+                label_filepath, labels_dir
+            )
+            with open(label_filepath, "rb") as f:
+                assert exported_filepath.read_bytes() == f.read()
+
+    def test_sync_reimports_edited_and_removed_labels(
+        self, temp_finance_root, tmp_path
+    ):
+        config = get_isolated_config(
+            temp_finance_root=temp_finance_root, tmp_path=tmp_path
+        )
+        label_store = ReceiptLabelStore.open(
+            db_filepath=str(tmp_path / "receipt_labels.sqlite")
+        )
+        try:
+            label_filepaths = label_store.get_label_filepaths(config=config)
+            assert len(label_filepaths) >= 2
+            assert label_store.sync_json_labels(config=config) == len(
+                label_filepaths
+            )
+            assert label_store.sync_json_labels(config=config) == 0
+
+            edited_filepath, removed_filepath = label_filepaths[:2]
+            with open(edited_filepath) as f:
+                label_data = json.load(f)
+            label_data["raw_img_filepath"] = "/edited/by/hand.jpg"
+            with open(edited_filepath, "w") as f:
+                json.dump(label_data, f)
+            os.remove(removed_filepath)
+
+            assert label_store.sync_json_labels(config=config) == 2
+            raw_img_filepaths = [
+                r.raw_img_filepath
+                for r in label_store.load_receipts(config=config)
+            ]
+            assert "/edited/by/hand.jpg" in raw_img_filepaths
+            assert len(raw_img_filepaths) <= len(label_filepaths) - 1
+        finally:
+            label_store.close()
+
+    def test_exported_label_is_stored_without_a_sync(
+        self, temp_finance_root, tmp_path
+    ):
+        config = get_isolated_config(
+            temp_finance_root=temp_finance_root, tmp_path=tmp_path
+        )
+        open_label_store(config=config).close()
+
+        label_store = ReceiptLabelStore.open(
+            db_filepath=str(tmp_path / "receipt_labels.sqlite")
+        )
+        try:
+            written_filepath, other_filepath = label_store.get_label_filepaths(
+                config=config
+            )[:2]
+            for label_filepath in [written_filepath, other_filepath]:
+                with open(label_filepath) as f:
+                    label_data = json.load(f)
+                label_data["raw_img_filepath"] = label_filepath
+                with open(label_filepath, "w") as f:
+                    json.dump(label_data, f)
+            store_exported_label(config=config, label_filepath=written_filepath)
+
+            raw_img_filepaths = [
+                r.raw_img_filepath
+                for r in label_store.load_receipts(config=config)
+            ]
+            assert written_filepath in raw_img_filepaths
+            # The other label is only synced on the next open_label_store.
+            assert other_filepath not in raw_img_filepaths
+            assert label_store.sync_json_labels(config=config) == 1
+        finally:
+            label_store.close()
+
+    def test_store_of_an_earlier_schema_is_rebuilt(
+        self, temp_finance_root, tmp_path
+    ):
+        config = get_isolated_config(
+            temp_finance_root=temp_finance_root, tmp_path=tmp_path
+        )
+        db_filepath = str(tmp_path / "receipt_labels.sqlite")
+        connection = sqlite3.connect(db_filepath)
+        with connection:
+            connection.execute(
+                "CREATE TABLE receipts (id INTEGER PRIMARY KEY, label_json"
+                " TEXT)"
+            )
+            connection.execute("PRAGMA user_version = 1")
+        connection.close()
+
+        label_store = open_label_store(config=config)
+        try:
+            assert label_store.get_nr_of_labels() == len(
+                label_store.get_label_filepaths(config=config)
+            )
+        finally:
+            label_store.close()
@@ -0,0 +1,88 @@
+"""Integration tests for the snapshot of the decoded receipts."""
+
+import dataclasses
+import json
+import os
+import shutil
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    load_receipts_from_dir,
+)
+from hledger_preprocessor.reading_history.ReceiptSnapshot import (
+    RECEIPT_SNAPSHOT_FILENAME,
+)
+from hledger_preprocessor.receipts_to_objects.ReceiptLabelCodec import (
+    ReceiptLabelCodec,
+)
+
+
+class TestReceiptSnapshot:
+    """Test that only the changed labels are decoded on a rerun."""
+
+    def test_only_changed_labels_are_decoded(
+        self, temp_finance_root, tmp_path, monkeypatch
+    ):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        # A copy of the labels, as the session wide finance root is shared.
+        labels_dir = tmp_path / "receipt_labels"
+        shutil.copytree(
+            config.dir_paths.get_path("receipt_labels_dir", absolute=True),
+            labels_dir,
+        )
+        config.dir_paths = dataclasses.replace(
+            config.dir_paths,
+            receipt_labels_dir=str(labels_dir),
+            working_subdir=str(tmp_path / "working_dir"),
+        )
+        decoded_labels = []
+        decode_receipt = ReceiptLabelCodec.decode_receipt
+
+        def count_decodes(self, *, label_data):
+            decoded_labels.append(label_data)
+            return decode_receipt(self, label_data=label_data)
+
+        monkeypatch.setattr(ReceiptLabelCodec, "decode_receipt", count_decodes)
+
+        receipts = load_receipts_from_dir(config=config)
+        nr_of_labels = len(list(labels_dir.rglob("*.json")))
+        assert nr_of_labels
+        assert len(decoded_labels) == len(receipts) == nr_of_labels
+        assert (tmp_path / "working_dir" / RECEIPT_SNAPSHOT_FILENAME).is_file()
+
+        decoded_labels.clear()
+        snapshot_receipts = load_receipts_from_dir(config=config)
+        assert not decoded_labels
+        assert snapshot_receipts == receipts
+        # The accounts are interned again.
+        for receipt, snapshot_receipt in zip(receipts, snapshot_receipts):
+            for transaction, snapshot_transaction in zip(
+                receipt.get_both_item_types(verbose=False),
+                snapshot_receipt.get_both_item_types(verbose=False),
+            ):
+                assert snapshot_transaction.account is transaction.account
+
+        label_filepath = next(labels_dir.rglob("*.json"))
+        label = json.loads(label_filepath.read_text())
+        label["total_tax"] = 1.23
+        label_filepath.write_text(json.dumps(label))
+        stat_result = os.stat(label_filepath)
+        os.utime(
+            label_filepath,
+            ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9),
+        )
+        updated_receipts = load_receipts_from_dir(config=config)
+        assert len(decoded_labels) == 1
+        assert sorted(receipt.total_tax for receipt in updated_receipts) == (
+            sorted(
+                [1.23]
+                + [
+                    receipt.total_tax
+                    for receipt in receipts
+                    if receipt.raw_img_filepath != label["raw_img_filepath"]
+                ]
+            )
+        )
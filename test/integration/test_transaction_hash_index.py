@@ -0,0 +1,138 @@
+"""Integration tests for the transaction hash index."""
+
+import dataclasses
+import textwrap
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.csv_parsing.csv_to_transactions import (
+    load_csv_transactions_from_file_per_year,
+)
+from hledger_preprocessor.csv_parsing.CsvTransactionsCache import (
+    get_file_fingerprint,
+)
+from hledger_preprocessor.csv_parsing.TransactionHashIndex import (
+    TransactionHashIndex,
+    TransactionLocation,
+)
+from hledger_preprocessor.retrieval.within_transactions import (
+    retrieve_csv_transaction,
+)
+
+
+class TestTransactionHashIndex:
+    """Test that a parsed csv transaction is retrieved from the index, and
+    that a changed csv falls back to parsing all csvs."""
+
+    def test_retrieve_without_parsing_all_csvs(
+        self, temp_finance_root, monkeypatch
+    ):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        # A separate csv, as the session wide finance root is shared.
+        (temp_finance_root["root"] / "triodos_hash_index.csv").write_text(
+            textwrap.dedent(
+                """\
+                date,account,amount,code,name,iban,type,description,balance
+                15-01-2025,NL123,"-42,17",debit,Ekoplaza,NL456,IC,food,"1000,00"
+                16-01-2025,NL123,"-3,50",debit,Bakery,NL457,IC,bread,"996,50"
+                17-01-2025,NL123,"100,00",credit,Work,NL458,OV,salary,"1096,50"
+                """
+            )
+        )
+        bank_account_config = dataclasses.replace(
+            next(
+                account_config
+                for account_config in config.accounts
+                if account_config.has_input_csv()
+            ),
+            input_csv_filename="triodos_hash_index.csv",
+        )
+        transactions_per_year = load_csv_transactions_from_file_per_year(
+            config=config,
+            labelled_receipts=[],
+            abs_csv_filepath=bank_account_config.get_abs_csv_filepath(
+                dir_paths_config=config.dir_paths
+            ),
+            account_config=bank_account_config,
+            csv_encoding=config.csv_encoding,
+        )
+
+        def fail_on_full_parse(**kwargs):
+            raise AssertionError("Parsed all csvs for an indexed hash.")
+
+        monkeypatch.setattr(
+            retrieve_csv_transaction,
+            "get_all_matching_transactions",
+            fail_on_full_parse,
+        )
+        for transactions in transactions_per_year.values():
+            for transaction in transactions:
+                retrieved = (
+                    retrieve_csv_transaction.retrieve_csv_transaction_from_hash(
+                        config=config,
+                        some_hash=transaction.get_hash(),
+                        labelled_receipts=[],
+                    )
+                )
+                assert retrieved == transaction
+        assert sum(map(len, transactions_per_year.values())) == 3
+
+    def test_hash_in_a_changed_csv_is_not_returned(self, tmp_path):
+        csv_filepaths = [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+        transaction_hash_index = TransactionHashIndex(
+            index_filepath=str(tmp_path / "index.json")
+        )
+        for csv_filepath in csv_filepaths:
+            with open(csv_filepath, "w") as f:
+                f.write("date,amount\n15-01-2025,1\n")
+            transaction_hash_index.fingerprints[csv_filepath] = list(
+                get_file_fingerprint(filepath=csv_filepath)
+            )
+        locations = [
+            TransactionLocation(
+                account="at:triodos:checking",
+                csv_filepath=csv_filepath,
+                encoding="utf-8",
+                row_index=1,
+            )
+            for csv_filepath in csv_filepaths
+        ]
+        transaction_hash_index.locations_per_hash["42"] = locations
+        assert transaction_hash_index.get_locations(some_hash=42) == locations
+        assert transaction_hash_index.get_locations(some_hash=43) is None
+
+        # The hash may be ambiguous or gone, so it is not narrowed down to
+        # the location in the unchanged csv.
+        with open(csv_filepaths[1], "a") as f:
+            f.write("16-01-2025,2\n")
+        assert transaction_hash_index.get_locations(some_hash=42) is None
+
+    def test_index_is_only_parsed_again_once_changed(
+        self, temp_finance_root, tmp_path
+    ):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        config.dir_paths = dataclasses.replace(
+            config.dir_paths, working_subdir=str(tmp_path / "working_dir")
+        )
+        transaction_hash_index = TransactionHashIndex.load(config=config)
+        transaction_hash_index.save()
+        assert TransactionHashIndex.load(config=config) is (
+            transaction_hash_index
+        )
+
+        # An index written by another process is parsed again.
+        other_index = TransactionHashIndex(
+            index_filepath=transaction_hash_index.index_filepath,
+            fingerprints={"/other.csv": [1, 2]},
+        )
+        other_index.save()
+        with open(other_index.index_filepath, "a") as f:
+            f.write(" ")
+        reloaded_index = TransactionHashIndex.load(config=config)
+        assert reloaded_index is not other_index
+        assert reloaded_index.fingerprints == {"/other.csv": [1, 2]}
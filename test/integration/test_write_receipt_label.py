@@ -0,0 +1,51 @@
+"""Integration tests for the atomic receipt label writes."""
+
+import dataclasses
+from datetime import datetime
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.reading_history.load_receipts_from_dir import (
+    load_receipts_from_dir,
+)
+from hledger_preprocessor.receipts_to_objects.write_receipt_label import (
+    get_canonical_label_hash,
+    read_label_hash,
+    receipt_to_label_dict,
+    store_receipt_label,
+)
+
+
+class TestWriteReceiptLabel:
+    """Test that a label is only written when its content changes."""
+
+    def test_write_once_and_verify(self, temp_finance_root, tmp_path):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        receipt = load_receipts_from_dir(config=config)[0]
+        label_filepath = str(tmp_path / "receipt_image_to_obj_label.json")
+
+        assert store_receipt_label(
+            config=config, receipt=receipt, label_filepath=label_filepath
+        )
+        assert not store_receipt_label(
+            config=config, receipt=receipt, label_filepath=label_filepath
+        )
+        assert [p.name for p in tmp_path.iterdir()] == [
+            "receipt_image_to_obj_label.json"
+        ]
+
+        updated_receipt = dataclasses.replace(
+            receipt, the_date=datetime(2025, 1, 16, 12, 30)
+        )
+        assert store_receipt_label(
+            config=config,
+            receipt=updated_receipt,
+            label_filepath=label_filepath,
+        )
+        assert read_label_hash(
+            label_filepath=label_filepath
+        ) == get_canonical_label_hash(
+            label_dict=receipt_to_label_dict(receipt=updated_receipt)
+        )
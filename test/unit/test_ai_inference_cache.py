@@ -0,0 +1,142 @@
+"""Unit tests for the cache of the json that AI models infer from images."""
+
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+
+from hledger_preprocessor.receipts_to_objects.AiInferenceCache import (
+    AI_INFERENCE_CACHE_DIRNAME,
+)
+from hledger_preprocessor.receipts_to_objects.receipt_image_converter import (
+    receipt_images_to_receipt_objects,
+)
+
+RECEIPT_IMAGE: str = "test/fixtures/receipts/dummy_receipt.jpg"
+
+
+class CountingModel:
+    """Returns a fixed json per image and counts the inferred images."""
+
+    def __init__(self, *, revision: str):
+        self.name: str = "Counting"
+        self.revision: str = revision
+        self.inferred_filepaths: List[str] = []
+
+    def image_path_to_receipt(self, receipt_filepath: str) -> Tuple[Any, Any]:
+        self.inferred_filepaths.append(receipt_filepath)
+        return {"total": {"total_price": "12.50"}}, None
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_cache_params(self) -> Dict[str, Any]:
+        return {"name": self.name, "revision": self.revision}
+
+
+class CrashingBatchModel(CountingModel):
+    """Infers the images in batches, and crashes after the first image."""
+
+    def images_to_receipts(
+        self, *, receipt_filepaths: List[str]
+    ) -> Iterator[Tuple[Any, Any]]:
+        yield self.image_path_to_receipt(receipt_filepaths[0])
+        raise RuntimeError("Crashed after the first image.")
+
+
+def make_receipt_images(*, tmp_path, nr_of_images: int) -> List[str]:
+    """Returns copies of the receipt image, with distinct content."""
+    receipt_filepaths: List[str] = []
+    for i in range(nr_of_images):
+        receipt_filepath = str(tmp_path / f"receipt_{i}.jpg")
+        shutil.copy(RECEIPT_IMAGE, receipt_filepath)
+        with open(receipt_filepath, "ab") as f:
+            f.write(bytes([i]))
+        receipt_filepaths.append(receipt_filepath)
+    return receipt_filepaths
+
+
+class TestAiInferenceCache:
+    """Test that an image is only inferred again for another model revision."""
+
+    def test_renamed_images_hit_and_new_revisions_miss(self, tmp_path):
+        receipt_filepath = str(tmp_path / "receipt.jpg")
+        shutil.copy(RECEIPT_IMAGE, receipt_filepath)
+        dataset_path = str(tmp_path / "dataset")
+
+        model = CountingModel(revision="a")
+        for _ in range(2):
+            receipt_images_to_receipt_objects(
+                receipt_filepaths=[receipt_filepath],
+                dataset_path=dataset_path,
+                ai_models_receipt_parsing=[model],
+            )
+        assert model.inferred_filepaths == [receipt_filepath]
+
+        renamed_filepath = str(tmp_path / "renamed.jpg")
+        shutil.move(receipt_filepath, renamed_filepath)
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=[renamed_filepath],
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[model],
+        )
+        assert model.inferred_filepaths == [receipt_filepath]
+
+        new_model = CountingModel(revision="b")
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=[renamed_filepath],
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[new_model],
+        )
+        assert new_model.inferred_filepaths == [renamed_filepath]
+
+    def test_interrupted_run_keeps_inferred_jsons(self, tmp_path):
+        receipt_filepaths = make_receipt_images(
+            tmp_path=tmp_path, nr_of_images=2
+        )
+        dataset_path = str(tmp_path / "dataset")
+
+        with pytest.raises(RuntimeError):
+            receipt_images_to_receipt_objects(
+                receipt_filepaths=receipt_filepaths,
+                dataset_path=dataset_path,
+                ai_models_receipt_parsing=[CrashingBatchModel(revision="a")],
+            )
+        model = CountingModel(revision="a")
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=receipt_filepaths,
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[model],
+        )
+        assert model.inferred_filepaths == receipt_filepaths[1:]
+
+    def test_first_run_imports_the_exported_jsons(self, tmp_path):
+        receipt_filepaths = make_receipt_images(
+            tmp_path=tmp_path, nr_of_images=2
+        )
+        dataset_path = str(tmp_path / "dataset")
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=receipt_filepaths,
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[CountingModel(revision="a")],
+        )
+        # As exported by the runs before the cache, which skipped the images
+        # that had a json.
+        shutil.rmtree(os.path.join(dataset_path, AI_INFERENCE_CACHE_DIRNAME))
+
+        model = CountingModel(revision="a")
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=receipt_filepaths,
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[model],
+        )
+        assert model.inferred_filepaths == []
+        # Once the cache exists, another revision infers them again.
+        new_model = CountingModel(revision="b")
+        receipt_images_to_receipt_objects(
+            receipt_filepaths=receipt_filepaths,
+            dataset_path=dataset_path,
+            ai_models_receipt_parsing=[new_model],
+        )
+        assert new_model.inferred_filepaths == receipt_filepaths
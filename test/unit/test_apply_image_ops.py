@@ -0,0 +1,151 @@
+"""Unit tests for applying the recorded image operations in batch."""
+
+import json
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from hledger_preprocessor.file_reading_and_writing import get_file_hash
+from hledger_preprocessor.receipts_to_objects.edit_images.apply_image_ops import (
+    ImageOpsTask,
+    apply_image_ops,
+)
+from hledger_preprocessor.receipts_to_objects.edit_images.crop_image import (
+    crop_and_save_image,
+)
+from hledger_preprocessor.receipts_to_objects.edit_images.rotate_all_images import (
+    rotate_and_save_image,
+)
+
+
+def make_task(*, tmp_path, name: str, operations) -> ImageOpsTask:
+    raw_img_filepath = tmp_path / f"{name}.png"
+    Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(raw_img_filepath)
+    metadata_path = tmp_path / f"{name}.json"
+    metadata_path.write_text(
+        json.dumps(
+            {
+                "operations": operations,
+                "original_path": "/moved/away.png",
+            }
+        )
+    )
+    return ImageOpsTask(
+        metadata_path=str(metadata_path),
+        raw_img_filepath=str(raw_img_filepath),
+        rotated_path=str(tmp_path / f"{name}_rotated.jpg"),
+        cropped_path=str(tmp_path / f"{name}_cropped.jpg"),
+    )
+
+
+class TestApplyImageOps:
+    """Test that the operations are applied in order by the process pool, to
+    the same bytes as the interactive rotation and crop."""
+
+    def test_rotate_then_crop(self, tmp_path):
+        tasks = [
+            make_task(
+                tmp_path=tmp_path,
+                name=f"receipt_{i}",
+                operations=[
+                    {"type": "rotate", "applied": True, "angle_degrees": 90},
+                    {
+                        "type": "crop",
+                        "applied": True,
+                        "coordinates": {
+                            "x1": 0.0,
+                            "y1": 0.5,
+                            "x2": 0.5,
+                            "y2": 1.0,
+                        },
+                    },
+                ],
+            )
+            for i in range(2)
+        ]
+        apply_image_ops(tasks=tasks, max_workers=2)
+
+        for task in tasks:
+            with Image.open(task.rotated_path) as rotated:
+                assert rotated.size == (20, 40)
+            with Image.open(task.cropped_path) as cropped:
+                assert cropped.size == (10, 20)
+            with open(task.metadata_path) as f:
+                metadata = json.load(f)
+            assert metadata["original_path"] == task.raw_img_filepath
+            assert metadata["cropped_path"] == task.cropped_path
+
+    def test_errors_are_grouped_per_image(self, tmp_path):
+        tasks = [
+            make_task(
+                tmp_path=tmp_path,
+                name="unknown_operation",
+                operations=[{"type": "blur", "applied": True}],
+            ),
+            make_task(tmp_path=tmp_path, name="no_operations", operations=[]),
+        ]
+        with pytest.raises(ValueError) as error_info:
+            apply_image_ops(tasks=tasks, max_workers=1)
+        assert (
+            str(error_info.value)
+            .splitlines()[1]
+            .startswith(tasks[0].metadata_path)
+        )
+
+    def test_same_hash_as_the_interactive_flow(self, tmp_path, monkeypatch):
+        # Press Enter in the windows at once, without showing them.
+        for name in ["namedWindow", "resizeWindow", "imshow"]:
+            monkeypatch.setattr(cv2, name, lambda *args: None)
+        monkeypatch.setattr(cv2, "destroyAllWindows", lambda: None)
+        monkeypatch.setattr(cv2, "waitKey", lambda delay: 13)
+        monkeypatch.setattr(cv2, "waitKeyEx", lambda delay: 13)
+
+        crop_coords = [0.1, 0.2, 0.7, 0.9]
+        task = make_task(
+            tmp_path=tmp_path,
+            name="receipt",
+            operations=[
+                {"type": "rotate", "applied": True, "angle_degrees": 90},
+                {
+                    "type": "crop",
+                    "applied": True,
+                    "coordinates": dict(
+                        zip(["x1", "y1", "x2", "y2"], crop_coords)
+                    ),
+                },
+            ],
+        )
+        # A noisy photo, whose JPEG re-encoding changes its bytes.
+        Image.fromarray(
+            np.random.default_rng(0).integers(0, 256, (60, 80, 3), np.uint8)
+        ).save(task.raw_img_filepath, "JPEG")
+
+        interactive_rotated_path = str(tmp_path / "interactive_rotated.jpg")
+        interactive_cropped_path = str(tmp_path / "interactive_cropped.jpg")
+        assert (
+            rotate_and_save_image(
+                image_path=task.raw_img_filepath,
+                output_path=interactive_rotated_path,
+                initial_angle=90,
+            )
+            == 90
+        )
+        assert (
+            crop_and_save_image(
+                image_path=interactive_rotated_path,
+                output_path=interactive_cropped_path,
+                initial_crop_coords=crop_coords,
+            )
+            == crop_coords
+        )
+        apply_image_ops(tasks=[task], max_workers=1)
+
+        assert get_file_hash(filepath=task.rotated_path) == get_file_hash(
+            filepath=interactive_rotated_path
+        )
+        # The receipt labels are stored under the hash of the cropped image.
+        assert get_file_hash(filepath=task.cropped_path) == get_file_hash(
+            filepath=interactive_cropped_path
+        )
@@ -0,0 +1,75 @@
+"""Unit tests for the incremental build manifest."""
+
+import os
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.incremental.BuildManifest import (
+    BuildManifest,
+    BuildTarget,
+)
+
+
+class TestBuildManifest:
+    """Test that targets are only rebuilt when their inputs change."""
+
+    def _get_target(self, tmp_path):
+        input_file = tmp_path / "bank.csv"
+        input_file.write_text("15-01-2025,NL123,-42.17\n")
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+        return input_file, BuildTarget(
+            name="new_setup:at:triodos:checking",
+            input_filepaths=[str(input_file)],
+            output_paths=[str(output_dir)],
+        )
+
+    def test_unrecorded_target_is_not_up_to_date(self, tmp_path):
+        _, build_target = self._get_target(tmp_path)
+        build_manifest = BuildManifest(
+            config_filepath=str(tmp_path / "config.yaml"),
+            manifest_filepath=str(tmp_path / "manifest.json"),
+        )
+        assert not build_manifest.is_up_to_date(build_target=build_target)
+
+    def test_recorded_target_survives_reload(self, tmp_path, temp_finance_root):
+        _, build_target = self._get_target(tmp_path)
+        config_path = str(temp_finance_root["config_path"])
+        config = load_config(
+            config_path=config_path, pre_processed_output_dir=None
+        )
+        build_manifest = BuildManifest.load(
+            config=config, config_filepath=config_path
+        )
+        try:
+            assert not build_manifest.is_up_to_date(build_target=build_target)
+            build_manifest.record(build_target=build_target)
+
+            reloaded_manifest = BuildManifest.load(
+                config=config, config_filepath=config_path
+            )
+            assert reloaded_manifest.is_up_to_date(build_target=build_target)
+        finally:
+            # The finance root is shared by the tests of the session.
+            os.remove(build_manifest.manifest_filepath)
+
+    def test_changed_input_invalidates_target(self, tmp_path):
+        input_file, build_target = self._get_target(tmp_path)
+        build_manifest = BuildManifest(
+            config_filepath=str(tmp_path / "config.yaml"),
+            manifest_filepath=str(tmp_path / "manifest.json"),
+        )
+        build_manifest.record(build_target=build_target)
+
+        input_file.write_text("16-01-2025,NL123,-1.00\n")
+        assert not build_manifest.is_up_to_date(build_target=build_target)
+
+    def test_missing_output_invalidates_target(self, tmp_path):
+        _, build_target = self._get_target(tmp_path)
+        build_manifest = BuildManifest(
+            config_filepath=str(tmp_path / "config.yaml"),
+            manifest_filepath=str(tmp_path / "manifest.json"),
+        )
+        build_manifest.record(build_target=build_target)
+
+        (tmp_path / "output").rmdir()
+        assert not build_manifest.is_up_to_date(build_target=build_target)
@@ -0,0 +1,50 @@
+"""Unit tests for the compiled trie of interned categories."""
+
+import copy
+import pickle
+
+import pytest
+
+from hledger_preprocessor.categorisation.Categories import (
+    Category,
+    CategoryNamespace,
+)
+
+HIERARCHY = {
+    "house": {"furniture": {"ikea": {}, "second_hand": None}},
+    "groceries": {"ekoplaza": {}},
+}
+
+
+class TestCategories:
+    """Test that categories resolve to the same interned nodes, and that
+    invalid categories are still rejected."""
+
+    def test_nodes_are_interned(self):
+        category_namespace = CategoryNamespace(HIERARCHY)
+        ikea = category_namespace.house.furniture.ikea
+        assert str(ikea) == "house:furniture:ikea"
+        assert ikea.name == "ikea"
+        assert ikea.root == "house"
+        assert ikea.depth == 3
+        assert ikea.parent is category_namespace.house.furniture
+        assert ikea.parent.parent.parent is None
+        assert category_namespace.House.FURNITURE / "IKEA" is ikea
+        assert Category("house : furniture:ikea", HIERARCHY) is ikea
+        assert CategoryNamespace(HIERARCHY).house.furniture.ikea is ikea
+        assert dir(category_namespace.house.furniture) == ["ikea"]
+        assert copy.deepcopy(ikea) is ikea
+        assert pickle.loads(pickle.dumps(ikea)) == ikea
+        with pytest.raises(AttributeError):
+            ikea._path = ("other",)
+
+    def test_invalid_categories(self):
+        category_namespace = CategoryNamespace(HIERARCHY)
+        with pytest.raises(ValueError, match="Allowed: furniture"):
+            category_namespace.house.kitchen
+        with pytest.raises(ValueError, match="Allowed: groceries, house"):
+            category_namespace.car
+        with pytest.raises(ValueError, match="Allowed: none"):
+            category_namespace.house.furniture.second_hand.chair
+        with pytest.raises(ValueError, match="cannot be empty"):
+            Category(" : ", HIERARCHY)
@@ -0,0 +1,65 @@
+"""Unit tests for the request handling of the daemon."""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from hledger_preprocessor.daemon.client import request_daemon
+from hledger_preprocessor.daemon.protocol import receive_message
+from hledger_preprocessor.daemon.server import DaemonServer
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to about 100 characters.
+    socket_dir = tempfile.mkdtemp(prefix="hp_daemon_")
+    yield os.path.join(socket_dir, "daemon.sock")
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def send_raw(*, socket_path: str, data: bytes):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socket_path)
+    with connection:
+        connection.sendall(data)
+        connection.shutdown(socket.SHUT_WR)
+        return receive_message(connection=connection)
+
+
+class TestDaemonServer:
+    """Test that malformed requests are answered with an error, and do not
+    stop the daemon."""
+
+    def test_malformed_requests_keep_the_daemon_serving(self, socket_path):
+        server = DaemonServer(socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                threading.Event().wait(0.05)
+
+            for data in [b"not json\n", b'{"action": ', b"[1, 2]\n", b"{}\n"]:
+                response = send_raw(socket_path=socket_path, data=data)
+                assert response["exit_code"] == 1
+                assert "Invalid daemon request" in response["output"]
+
+            response = request_daemon(
+                socket_path=socket_path, message={"action": "unknown"}
+            )
+            assert response == {
+                "exit_code": 1,
+                "output": "Unknown action:unknown\n",
+            }
+        finally:
+            response = request_daemon(
+                socket_path=socket_path, message={"action": "shutdown"}
+            )
+            thread.join(timeout=5)
+        assert response == {"exit_code": 0, "output": ""}
+        assert not thread.is_alive()
@@ -0,0 +1,64 @@
+"""Unit tests for the display copies of the rotate and crop windows."""
+
+import numpy as np
+from PIL import Image
+
+from hledger_preprocessor.receipts_to_objects.edit_images.display_images import (
+    DisplayImagePrefetcher,
+    load_display_image,
+    rotate_display_image,
+)
+
+
+def make_image(*, image_path: str, size) -> None:
+    pixels = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    pixels[: size[1] // 2, :, 0] = 255  # Red top half.
+    Image.fromarray(pixels).save(image_path, quality=95)
+
+
+class TestDisplayImages:
+    """Test that the display copies are downscaled BGR copies, that rotate
+    like the full resolution images."""
+
+    def test_display_copy_is_downscaled_bgr(self, tmp_path):
+        image_path = str(tmp_path / "photo.jpg")
+        make_image(image_path=image_path, size=(4000, 3000))
+        display_image = load_display_image(
+            image_path=image_path, display_size=800
+        )
+        assert display_image.shape == (600, 800, 3)
+        # The red top half is the last channel in BGR.
+        assert display_image[10, 10, 2] > 200
+        assert display_image[10, 10, 0] < 50
+
+    def test_rotation_matches_full_resolution(self, tmp_path):
+        image_path = str(tmp_path / "photo.png")
+        make_image(image_path=image_path, size=(40, 20))
+        display_image = load_display_image(image_path=image_path)
+        with Image.open(image_path) as image:
+            for angle_degrees in [90, 180, 270, 5]:
+                expected = np.asarray(
+                    image.rotate(-angle_degrees, expand=True)
+                )[:, :, ::-1]
+                rotated = rotate_display_image(
+                    display_image=display_image, angle_degrees=angle_degrees
+                )
+                assert rotated.shape == expected.shape
+                assert np.array_equal(rotated, expected)
+
+    def test_prefetcher_returns_and_evicts(self, tmp_path):
+        image_paths = []
+        for i in range(6):
+            image_paths.append(str(tmp_path / f"photo_{i}.png"))
+            make_image(image_path=image_paths[-1], size=(40 + i, 20))
+        prefetcher = DisplayImagePrefetcher(prefetch_count=1)
+        try:
+            for index, image_path in enumerate(image_paths):
+                display_image = prefetcher.get(
+                    image_path=image_path,
+                    next_image_paths=image_paths[index + 1 :],
+                )
+                assert display_image.shape == (20, 40 + index, 3)
+            assert len(prefetcher.display_images) <= 3
+        finally:
+            prefetcher.close()
@@ -0,0 +1,79 @@
+"""Unit tests for the offline exchange rate store."""
+
+from datetime import date
+
+import pytest
+
+from hledger_preprocessor.Currencies.ExchangeRateStore import (
+    ExchangeRateStore,
+)
+from hledger_preprocessor.Currencies.fetch_rates import (
+    StaticRateFetcher,
+    fetch_exchange_rates,
+)
+
+
+class TestExchangeRateStore:
+    """Test the as-of lookups, the csv import and the fetching with a local
+    fetcher."""
+
+    def test_as_of_lookup_and_csv_import(self, tmp_path):
+        csv_filepath = tmp_path / "exchange_rates.csv"
+        csv_filepath.write_text(
+            "datetime,source,currency,rate_to_base\n"
+            "2025-01-02T09:00:00,https://api.frankfurter.app/latest,USD,1.25\n"
+            "2025-01-02T18:00:00,https://api.frankfurter.app/latest,USD,1.0\n"
+            "2025-01-03T09:00:00,https://api.frankfurter.app,GBP,1.2\n"
+            "2025-01-05T09:00:00,https://api.coingecko.com,BTC,90000\n"
+            "2025-01-05T09:00:00,Base,EUR,1.0\n"
+        )
+        store = ExchangeRateStore.open(
+            db_filepath=str(tmp_path / "rates.sqlite")
+        )
+        try:
+            assert store.import_csv(csv_filepath=str(csv_filepath)) == 5
+            # The last rate of the day is kept, in EUR per USD.
+            assert store.get_rate(
+                currency="USD", the_date=date(2025, 1, 2)
+            ) == pytest.approx(1.0)
+            assert store.get_rate(
+                currency="USD", the_date=date(2025, 3, 1)
+            ) == pytest.approx(1.0)
+            assert (
+                store.get_rate(currency="USD", the_date=date(2025, 1, 1))
+                is None
+            )
+            # Stored by FrankfurterFetcher, so already in EUR per GBP.
+            assert store.get_rate(
+                currency="GBP", the_date=date(2025, 1, 3)
+            ) == pytest.approx(1.2)
+            assert store.get_conversion_ratio(
+                from_currency="BTC",
+                to_currency="USD",
+                the_date=date(2025, 1, 6),
+            ) == pytest.approx(90000)
+            assert store.get_latest_rates() == {
+                "USD": pytest.approx(1.0),
+                "GBP": pytest.approx(1.2),
+                "BTC": 90000,
+                "EUR": 1.0,
+            }
+        finally:
+            store.close()
+
+    def test_fetch_with_local_fetchers(self, tmp_path):
+        store = ExchangeRateStore.open(
+            db_filepath=str(tmp_path / "rates.sqlite")
+        )
+        try:
+            rates = fetch_exchange_rates(
+                store=store,
+                the_date=date(2025, 6, 1),
+                fetchers=[StaticRateFetcher(rates={"USD": 0.9, "EUR": 1.0})],
+            )
+            assert rates == {"USD": 0.9, "EUR": 1.0}
+            assert store.get_rate(
+                currency="USD", the_date=date(2025, 6, 2)
+            ) == pytest.approx(0.9)
+        finally:
+            store.close()
@@ -0,0 +1,66 @@
+"""Unit tests for the file watcher of the --watch mode."""
+
+import dataclasses
+import os
+
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.watch.FileWatcher import FileWatcher
+from hledger_preprocessor.watch.watch_manager import has_receipt_label
+
+
+class TestFileWatcher:
+    """Test that added, modified and removed files are detected, and which
+    receipt images already have a label."""
+
+    def test_detects_added_modified_and_removed_files(self, tmp_path):
+        images_dir = tmp_path / "receipt_images_input"
+        images_dir.mkdir()
+        bank_csv = tmp_path / "bank.csv"
+        bank_csv.write_text("15-01-2025,NL123,-42.17\n")
+        file_watcher = FileWatcher(
+            watched_paths=[str(images_dir), str(bank_csv)]
+        )
+        assert file_watcher.get_changed_filepaths() == set()
+
+        new_image = images_dir / "receipt.jpg"
+        new_image.write_bytes(b"jpg")
+        bank_csv.write_text("15-01-2025,NL123,-42.17\n16-01-2025,NL1,-1\n")
+        assert file_watcher.get_changed_filepaths() == {
+            str(new_image),
+            str(bank_csv),
+        }
+
+        os.remove(new_image)
+        assert file_watcher.get_changed_filepaths() == {str(new_image)}
+
+    def test_wait_for_changes_debounces(self, tmp_path):
+        bank_csv = tmp_path / "bank.csv"
+        file_watcher = FileWatcher(
+            watched_paths=[str(bank_csv)],
+            poll_interval=0.01,
+            debounce_seconds=0.05,
+        )
+        bank_csv.write_text("15-01-2025,NL123,-42.17\n")
+        assert file_watcher.wait_for_changes() == {str(bank_csv)}
+
+    def test_receipt_label_uses_the_configured_label_filename(
+        self, temp_finance_root
+    ):
+        config = load_config(
+            config_path=str(temp_finance_root["config_path"]),
+            pre_processed_output_dir=None,
+        )
+        raw_receipt_img_filepath = str(temp_finance_root["receipt_image"])
+        assert has_receipt_label(
+            config=config, raw_receipt_img_filepath=raw_receipt_img_filepath
+        )
+        other_config = dataclasses.replace(
+            config,
+            file_names=dataclasses.replace(
+                config.file_names, tui_label_filename="other_label"
+            ),
+        )
+        assert not has_receipt_label(
+            config=other_config,
+            raw_receipt_img_filepath=raw_receipt_img_filepath,
+        )
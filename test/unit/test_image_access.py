@@ -0,0 +1,59 @@
+"""Unit tests for the full resolution and preview access to receipt images."""
+
+import os
+import shutil
+
+import numpy as np
+from PIL import Image
+
+from hledger_preprocessor.image_access import (
+    is_image_file,
+    open_full_image,
+    open_preview_image,
+    set_thumbnail_cache_dir,
+)
+
+
+def make_image(*, image_path: str) -> None:
+    pixels = np.random.default_rng(0).integers(
+        0, 255, (3000, 4000, 3), dtype=np.uint8
+    )
+    Image.fromarray(pixels).save(image_path, quality=90)
+
+
+class TestImageAccess:
+    """Test that the previews are downscaled, and reused from the thumbnail
+    cache by image content."""
+
+    def test_full_and_preview_sizes(self, tmp_path):
+        image_path = str(tmp_path / "receipt.jpg")
+        make_image(image_path=image_path)
+        not_an_image = tmp_path / "notes.txt"
+        not_an_image.write_text("not an image")
+
+        assert is_image_file(filepath=image_path)
+        assert not is_image_file(filepath=str(not_an_image))
+        assert open_full_image(image_path=image_path).size == (4000, 3000)
+        preview = open_preview_image(image_path=image_path, max_size=800)
+        assert preview.size == (800, 600)
+        assert preview.mode == "RGB"
+
+    def test_preview_cache_survives_rename(self, tmp_path):
+        image_path = str(tmp_path / "receipt.jpg")
+        make_image(image_path=image_path)
+        cache_dir = str(tmp_path / "thumbnails")
+        set_thumbnail_cache_dir(cache_dir=cache_dir)
+        try:
+            open_preview_image(image_path=image_path, max_size=800)
+            assert len(os.listdir(cache_dir)) == 1
+
+            moved_path = str(tmp_path / "moved.jpg")
+            shutil.move(image_path, moved_path)
+            cached = open_preview_image(image_path=moved_path, max_size=800)
+            assert cached.size == (800, 600)
+            assert len(os.listdir(cache_dir)) == 1
+
+            open_preview_image(image_path=moved_path, max_size=400)
+            assert len(os.listdir(cache_dir)) == 2
+        finally:
+            set_thumbnail_cache_dir(cache_dir=None)
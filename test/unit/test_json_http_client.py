@@ -0,0 +1,107 @@
+"""Unit tests for the timeouts, retries and cache of the exchange rate
+fetching, against a local stub HTTP server."""
+
+import json
+import threading
+import time
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hledger_preprocessor.Currencies.ExchangeRateStore import (
+    ExchangeRateStore,
+)
+from hledger_preprocessor.Currencies.fetch_rates import (
+    FrankfurterFetcher,
+    fetch_exchange_rates,
+)
+from hledger_preprocessor.Currencies.JsonHttpClient import JsonHttpClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Hangs on /slow paths, fails once on /flaky paths, and otherwise
+    returns Frankfurter rates."""
+
+    requests_per_path: Counter = Counter()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.requests_per_path[path] += 1
+        if path.startswith("/slow"):
+            time.sleep(2)
+        if path.startswith("/flaky") and self.requests_per_path[path] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({"rates": {"USD": 1.25}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    StubHandler.requests_per_path = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.block_on_close = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestJsonHttpClient:
+    """Test that a hanging endpoint times out without stalling the others,
+    and that failed requests are retried and responses cached."""
+
+    def test_hanging_endpoint_does_not_stall(self, tmp_path, stub_url):
+        client = JsonHttpClient(
+            timeout_seconds=0.3, retries=1, backoff_seconds=0.01
+        )
+        store = ExchangeRateStore.open(
+            db_filepath=str(tmp_path / "rates.sqlite")
+        )
+        try:
+            start = time.monotonic()
+            rates = fetch_exchange_rates(
+                store=store,
+                the_date=date(2025, 1, 2),
+                fetchers=[
+                    FrankfurterFetcher(client=client, api_url=stub_url),
+                    FrankfurterFetcher(
+                        client=client, api_url=f"{stub_url}/slow"
+                    ),
+                ],
+            )
+            assert time.monotonic() - start < 1.5
+            assert rates == {"USD": pytest.approx(0.8), "EUR": 1.0}
+            assert StubHandler.requests_per_path["/slow/2025-01-02"] == 2
+        finally:
+            store.close()
+
+    def test_retry_and_cache(self, tmp_path, stub_url):
+        client = JsonHttpClient(
+            backoff_seconds=0.01, cache_dir=str(tmp_path / "cache")
+        )
+        url = f"{stub_url}/flaky/latest"
+        for _ in range(2):
+            assert client.get_json(url=url, params={"base": "EUR"}) == {
+                "rates": {"USD": 1.25}
+            }
+        # The first request failed, the second one is cached.
+        assert StubHandler.requests_per_path["/flaky/latest"] == 2
+
+        expired_client = JsonHttpClient(
+            cache_dir=str(tmp_path / "cache"), ttl_seconds=0
+        )
+        expired_client.get_json(url=url, params={"base": "EUR"})
+        assert StubHandler.requests_per_path["/flaky/latest"] == 3
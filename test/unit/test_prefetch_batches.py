@@ -0,0 +1,67 @@
+"""Unit tests for the background preparation of the Donut image batches."""
+
+import threading
+from typing import Iterator, List
+
+import pytest
+
+from hledger_preprocessor.receipts_to_objects.ai_based.donut import (
+    _prefetch_batches,
+)
+
+
+def count_batches(*, nr_of_batches: int) -> Iterator[List[str]]:
+    for i in range(nr_of_batches):
+        yield [f"receipt_{i}.jpg"]
+
+
+class TestPrefetchBatches:
+    """Test that the prepared batches are yielded in order, that errors of
+    the worker thread are raised to the consumer, and that the worker thread
+    stops if the consumer stops early."""
+
+    def test_yields_the_prepared_batches_in_order(self):
+        prepared = _prefetch_batches(
+            batches=count_batches(nr_of_batches=10),
+            prepare_batch=lambda batch: [name.upper() for name in batch],
+        )
+        assert list(prepared) == [[f"RECEIPT_{i}.JPG"] for i in range(10)]
+
+    def test_raises_the_error_of_the_worker(self):
+        def prepare_batch(batch: List[str]) -> List[str]:
+            if batch == ["receipt_2.jpg"]:
+                raise OSError("Unreadable image.")
+            return batch
+
+        prepared = _prefetch_batches(
+            batches=count_batches(nr_of_batches=5),
+            prepare_batch=prepare_batch,
+        )
+        assert next(prepared) == ["receipt_0.jpg"]
+        assert next(prepared) == ["receipt_1.jpg"]
+        with pytest.raises(OSError, match="Unreadable image."):
+            next(prepared)
+
+    def test_worker_stops_if_the_consumer_stops_early(self):
+        prepared_batches: List[List[str]] = []
+
+        def prepare_batch(batch: List[str]) -> List[str]:
+            prepared_batches.append(batch)
+            return batch
+
+        threads_before = set(threading.enumerate())
+        prepared = _prefetch_batches(
+            batches=count_batches(nr_of_batches=1000),
+            prepare_batch=prepare_batch,
+            queue_size=2,
+        )
+        assert next(prepared) == ["receipt_0.jpg"]
+        workers = set(threading.enumerate()) - threads_before
+        assert len(workers) == 1
+        prepared.close()
+
+        (worker,) = workers
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+        # The worker stopped after at most the queued and one more batch.
+        assert len(prepared_batches) < 10
@@ -0,0 +1,60 @@
+"""Unit tests for the --profile instrumentation."""
+
+import json
+
+from hledger_preprocessor.profiling.Profiler import (
+    count,
+    get_profiler,
+    profile_run,
+    profiled,
+    span,
+)
+
+
+@profiled("double")
+def double(value):
+    return 2 * value
+
+
+class TestProfiler:
+    """Test that spans and counters are only collected when enabled."""
+
+    def test_disabled_profiling_records_nothing(self):
+        assert get_profiler() is None
+        with span("parse"):
+            count("csv_rows_parsed", 3)
+        assert double(2) == 4
+        assert get_profiler() is None
+
+    def test_report_contains_spans_and_counters(self, tmp_path):
+        output_filepath = tmp_path / "profile.json"
+        with profile_run(
+            enabled=True,
+            output_format="json",
+            output_filepath=str(output_filepath),
+        ):
+            with span("parse"):
+                count("csv_rows_parsed", 3)
+                count("csv_rows_parsed")
+            assert double(2) == 4
+            assert double(3) == 6
+        assert get_profiler() is None
+
+        report = json.loads(output_filepath.read_text())
+        assert report["counters"] == {"csv_rows_parsed": 4}
+        assert report["spans"]["double"]["calls"] == 2
+        assert set(report["spans"]) == {"total", "parse", "double"}
+
+    def test_chrome_trace_has_complete_events(self, tmp_path):
+        output_filepath = tmp_path / "trace.json"
+        with profile_run(
+            enabled=True,
+            output_format="chrome-trace",
+            output_filepath=str(output_filepath),
+        ):
+            with span("parse"):
+                count("receipts_loaded", 2)
+
+        trace = json.loads(output_filepath.read_text())
+        phases = {event["name"]: event["ph"] for event in trace["traceEvents"]}
+        assert phases == {"total": "X", "parse": "X", "receipts_loaded": "C"}
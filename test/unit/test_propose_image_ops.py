@@ -0,0 +1,68 @@
+"""Unit tests for the proposed rotation and crop of receipt images."""
+
+import pytest
+from PIL import Image, ImageDraw
+
+from hledger_preprocessor.receipts_to_objects.edit_images.propose_image_ops import (
+    ImageOpsProposals,
+    propose_image_ops,
+)
+
+BACKGROUND: int = 40
+
+
+def make_photo() -> Image.Image:
+    """Returns an upright receipt with text lines on a dark table, at
+    x=150-350 and y=120-620."""
+    receipt = Image.new("L", (200, 500), 240)
+    draw = ImageDraw.Draw(receipt)
+    for y in range(30, 470, 20):
+        draw.rectangle((20, y, 170 - (y % 60), y + 6), fill=30)
+    photo = Image.new("L", (600, 800), BACKGROUND)
+    photo.paste(receipt, (150, 120))
+    return photo
+
+
+class TestProposeImageOps:
+    """Test that the skew and quarter turns of photographed receipts are
+    undone, and that the crop fits the receipt."""
+
+    @pytest.mark.parametrize("skew", [0, 5, -7, 93])
+    def test_rotation_undoes_skew(self, tmp_path, skew):
+        image_filepath = str(tmp_path / "receipt.png")
+        make_photo().rotate(skew, expand=True, fillcolor=BACKGROUND).save(
+            image_filepath
+        )
+        proposal = propose_image_ops(image_filepath=image_filepath)
+        # A quarter turn is proposed as 270 or 90 degrees, as the top of the
+        # receipt is not detected.
+        assert proposal.angle_degrees % 180 == skew % 180
+
+    def test_exif_orientation_and_crop(self, tmp_path):
+        image_filepath = str(tmp_path / "receipt.jpg")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 degrees clockwise to display.
+        make_photo().rotate(90, expand=True).convert("RGB").save(
+            image_filepath, exif=exif
+        )
+        proposal = propose_image_ops(image_filepath=image_filepath)
+        assert proposal.angle_degrees == 90
+        assert proposal.crop_coords == pytest.approx(
+            (150 / 600 - 0.01, 120 / 800 - 0.01, 350 / 600 + 0.01, 0.785),
+            abs=0.01,
+        )
+
+    def test_proposal_workers_use_the_thumbnail_cache(self, tmp_path):
+        image_filepath = str(tmp_path / "receipt.png")
+        make_photo().save(image_filepath)
+        thumbnail_cache_dir = tmp_path / "thumbnails"
+        proposals = ImageOpsProposals(
+            image_filepaths=[image_filepath],
+            max_workers=1,
+            thumbnail_cache_dir=str(thumbnail_cache_dir),
+        )
+        try:
+            assert proposals.get(image_filepath=image_filepath) is not None
+        finally:
+            proposals.close()
+        assert len(list(thumbnail_cache_dir.iterdir())) == 1
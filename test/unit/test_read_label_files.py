@@ -0,0 +1,50 @@
+"""Unit tests for the parallel reading of the receipt label files."""
+
+import json
+
+import pytest
+
+from hledger_preprocessor.reading_history.read_label_files import (
+    read_label_files,
+)
+
+
+class TestReadLabelFiles:
+    """Test that the labels are returned in order, and errors per file."""
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_results_keep_file_order(self, tmp_path, executor):
+        label_filepaths = []
+        for i in range(20):
+            label_filepath = tmp_path / f"label_{i}.json"
+            label_filepath.write_text(json.dumps({"receipt_nr": i}))
+            label_filepaths.append(str(label_filepath))
+
+        labels = read_label_files(
+            label_filepaths=label_filepaths, max_workers=4, executor=executor
+        )
+        assert [label["receipt_nr"] for label in labels] == list(range(20))
+
+    def test_errors_are_grouped_per_file(self, tmp_path):
+        (tmp_path / "valid.json").write_text("{}")
+        (tmp_path / "broken.json").write_text("{")
+        (tmp_path / "list.json").write_text("[]")
+        label_filepaths = [
+            str(tmp_path / name)
+            for name in [
+                "broken.json",
+                "valid.json",
+                "missing.json",
+                "list.json",
+            ]
+        ]
+
+        with pytest.raises(ValueError) as error_info:
+            read_label_files(label_filepaths=label_filepaths, max_workers=2)
+        message_lines = str(error_info.value).splitlines()
+        assert message_lines[0] == "Could not read 3 of the 4 receipt labels:"
+        assert [line.split(":")[0] for line in message_lines[1:]] == [
+            label_filepaths[0],
+            label_filepaths[2],
+            label_filepaths[3],
+        ]
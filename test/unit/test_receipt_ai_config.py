@@ -0,0 +1,103 @@
+"""Unit tests for the receipt_ai section of the config."""
+
+import dataclasses
+
+import pytest
+
+from hledger_preprocessor import get_models
+from hledger_preprocessor.config.load_config import load_config
+from hledger_preprocessor.config.ReceiptAiConfig import ReceiptAiConfig
+from hledger_preprocessor.daemon import server
+from hledger_preprocessor.daemon.server import DaemonServer
+from hledger_preprocessor.generics.enums import ClassifierType, LogicType
+
+
+class RecordingDonutAI:
+    """Records the arguments that the Donut model is set up with."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def get_config(*, temp_finance_root, receipt_ai: ReceiptAiConfig):
+    config = load_config(
+        config_path=str(temp_finance_root["config_path"]),
+        pre_processed_output_dir=None,
+    )
+    return dataclasses.replace(config, receipt_ai=receipt_ai)
+
+
+class TestReceiptAiConfig:
+    """Test the validation of the receipt_ai section, and that it selects
+    the backend and model dir of the Donut model."""
+
+    def test_defaults(self):
+        receipt_ai = ReceiptAiConfig()
+        assert receipt_ai.backend == "torch"
+        assert receipt_ai.model_dir is None
+        assert receipt_ai.greedy is False
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"backend": "tensorrt"}, {"backend": "onnx"}],
+    )
+    def test_invalid_backend_or_missing_onnx_model_dir(self, kwargs):
+        with pytest.raises(ValueError, match="receipt_ai"):
+            ReceiptAiConfig(**kwargs)
+
+    @pytest.mark.parametrize(
+        "receipt_ai",
+        [
+            ReceiptAiConfig(backend="quantized", greedy=True),
+            ReceiptAiConfig(backend="onnx", model_dir="models/donut_onnx"),
+        ],
+    )
+    def test_selects_the_backend_and_model_dir(
+        self, temp_finance_root, monkeypatch, receipt_ai
+    ):
+        monkeypatch.setattr(get_models, "DonutAI", RecordingDonutAI)
+        config = get_config(
+            temp_finance_root=temp_finance_root, receipt_ai=receipt_ai
+        )
+        (donut,) = get_models.get_receipt_image_to_obj_models(config=config)[
+            LogicType.AI
+        ]
+        assert donut.kwargs == {
+            "greedy": receipt_ai.greedy,
+            "backend": receipt_ai.backend,
+            "model_dir": receipt_ai.get_model_dir(dir_paths=config.dir_paths),
+        }
+        if receipt_ai.model_dir is not None:
+            assert donut.kwargs["model_dir"] == str(
+                temp_finance_root["root"] / receipt_ai.model_dir
+            )
+
+    def test_daemon_identifies_the_models_by_the_absolute_model_dir(
+        self, temp_finance_root, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(
+            server,
+            "get_models",
+            lambda *, quick_categorisation, config: {
+                ClassifierType.RECEIPT_IMAGE_TO_OBJ: {}
+            },
+        )
+        daemon_server = DaemonServer(socket_path=str(tmp_path / "daemon.sock"))
+
+        def load_models(*, model_dir: str):
+            return daemon_server.get_models(
+                quick_categorisation=True,
+                config=get_config(
+                    temp_finance_root=temp_finance_root,
+                    receipt_ai=ReceiptAiConfig(
+                        backend="onnx", model_dir=model_dir
+                    ),
+                ),
+            )
+
+        models = load_models(model_dir="donut")
+        assert (
+            load_models(model_dir=str(temp_finance_root["root"] / "donut"))
+            is models
+        )
+        assert load_models(model_dir="other_donut") is not models
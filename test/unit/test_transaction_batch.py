@@ -0,0 +1,94 @@
+"""Unit tests for the compact transaction representation."""
+
+from datetime import datetime
+
+from hledger_preprocessor.Currency import Currency
+from hledger_preprocessor.generics.GenericTransactionWithCsv import (
+    GenericCsvTransaction,
+)
+from hledger_preprocessor.generics.Transaction import Transaction
+from hledger_preprocessor.generics.TransactionBatch import TransactionBatch
+from hledger_preprocessor.TransactionObjects.Account import (
+    Account,
+    intern_account,
+)
+from hledger_preprocessor.TransactionObjects.AccountTransaction import (
+    AccountTransaction,
+)
+from hledger_preprocessor.TransactionObjects.Posting import TransactionCode
+
+
+def get_account() -> Account:
+    return Account(
+        base_currency=Currency.EUR,
+        account_holder="at",
+        bank="triodos",
+        account_type="checking",
+    )
+
+
+class TestTransactionBatch:
+    """Test that the batch returns the transactions it stores."""
+
+    def test_round_trip_and_date_range(self):
+        transactions = [
+            GenericCsvTransaction(
+                account=get_account(),
+                the_date=datetime(2025, 1, day),
+                tendered_amount_out=10.0 + day,
+                change_returned=0.0,
+                balance_after=None if day % 2 else 100.0,
+                description="groceries:ekoplaza",
+                other_party_name="Eko Plaza",
+                transaction_code=TransactionCode.DEBIT,
+            )
+            # Not sorted by date, as in a bank csv.
+            for day in [3, 1, 2, 5, 4]
+        ]
+        batch = TransactionBatch.from_transactions(transactions=transactions)
+
+        assert len(batch) == 5
+        for stored, original in zip(batch.to_transactions(), transactions):
+            assert stored.get_hash() == original.get_hash()
+            assert stored.balance_after == original.balance_after
+            assert stored.transaction_code == original.transaction_code
+        in_range = batch.get_transactions_in_date_range(
+            start_date=datetime(2025, 1, 2), end_date=datetime(2025, 1, 4)
+        )
+        assert [t.the_date.day for t in in_range] == [2, 3, 4]
+
+    def test_transactions_are_slotted_and_share_accounts(self):
+        account_transaction = AccountTransaction(
+            account=intern_account(account=get_account()),
+            the_date=datetime(2025, 1, 1),
+            tendered_amount_out=12.5,
+        )
+        assert not hasattr(account_transaction, "__dict__")
+        assert account_transaction.account_holder == "at"
+        assert account_transaction.account is intern_account(
+            account=get_account()
+        )
+
+    def test_hashes_are_cached_and_dedupe_equal_transactions(self):
+        transactions = [
+            GenericCsvTransaction(
+                account=get_account(),
+                the_date=datetime(2025, 1, 1),
+                tendered_amount_out=12.5,
+                change_returned=0.0,
+                description="groceries:ekoplaza",
+            )
+            for _ in range(2)
+        ]
+        first_hash = transactions[0].get_hash()
+        assert transactions[0].get_hash() is first_hash
+        assert transactions[0] == transactions[1]
+        assert len(set(transactions)) == 1
+        # The base hash compares transactions of different types.
+        assert Transaction.get_hash(transactions[0]) == Transaction.get_hash(
+            AccountTransaction(
+                account=get_account(),
+                the_date=datetime(2025, 1, 1),
+                tendered_amount_out=12.5,
+            )
+        )